@@ -0,0 +1,198 @@
+"""Download the artifacts of a run concurrently and check the book links to them.
+
+``download`` lists the artifacts of the current workflow run through the GitHub
+REST API, keeps those whose name matches one of the given globs, and downloads
+and unpacks them into ``<path>/<name>`` with a pool of threads, the layout
+``actions/download-artifact`` uses.
+
+``check`` compares the artifact folders with the links of the book and warns
+about every artifact no link points into, as it is deployed for nothing.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+
+def pattern_list(text):
+    """Split a list of globs separated by commas or newlines."""
+    items = [item.strip() for line in text.splitlines() for item in line.split(",")]
+    return [item for item in items if item]
+
+
+def select(artifacts, patterns):
+    """Return the unexpired artifacts whose name matches a glob (all if none given)."""
+    return [
+        artifact
+        for artifact in artifacts
+        if not artifact.get("expired")
+        and (
+            not patterns
+            or any(fnmatch.fnmatchcase(artifact["name"], p) for p in patterns)
+        )
+    ]
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Hand redirects back instead of following them with the same headers."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        """Do not follow the redirect; urllib then raises the 3xx as an HTTPError."""
+
+
+def api_request(url, token, follow=True):
+    """Send an authenticated GET to the GitHub API and return the response.
+
+    Artifact downloads redirect to a signed storage URL, which must be fetched
+    without the token: with ``follow`` the redirect is followed that way.
+    """
+    request = urllib.request.Request(
+        url,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        },
+    )
+    opener = urllib.request.build_opener(NoRedirect)
+    try:
+        return opener.open(request, timeout=60)
+    except urllib.error.HTTPError as error:
+        if follow and error.code in (301, 302, 303, 307, 308):
+            location = error.headers["Location"]
+            return urllib.request.urlopen(location, timeout=600)  # nosec B310
+        raise
+
+
+def list_artifacts(api, repository, run_id, token):
+    """Return all artifacts of a workflow run."""
+    artifacts, page = [], 1
+    while True:
+        url = f"{api}/repos/{repository}/actions/runs/{run_id}/artifacts?per_page=100&page={page}"
+        with api_request(url, token) as response:
+            batch = json.load(response)["artifacts"]
+        artifacts += batch
+        if len(batch) < 100:
+            return artifacts
+        page += 1
+
+
+def download(api, repository, artifact, token, path):
+    """Download one artifact and unpack it into ``path/<name>``.
+
+    The zip file is streamed to a temporary file rather than held in memory, as
+    several large artifacts may be downloaded at the same time.
+    """
+    start = time.monotonic()
+    url = f"{api}/repos/{repository}/actions/artifacts/{artifact['id']}/zip"
+    with tempfile.TemporaryFile() as f:
+        with api_request(url, token) as response:
+            shutil.copyfileobj(response, f)
+        size = f.tell()
+        with zipfile.ZipFile(f) as archive:
+            archive.extractall(os.path.join(path, artifact["name"]))  # nosec B202
+    return {
+        "name": artifact["name"],
+        "bytes": size,
+        "seconds": round(time.monotonic() - start, 1),
+    }
+
+
+def download_all(api, repository, run_id, token, patterns, path, concurrency):
+    """Download the matching artifacts of a run, ``concurrency`` at a time."""
+    chosen = select(list_artifacts(api, repository, run_id, token), patterns)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(
+            pool.map(lambda a: download(api, repository, a, token, path), chosen)
+        )
+
+
+def link_targets(links):
+    """Return the URLs of the book links, in any of the formats minibook takes."""
+    data = json.loads(links) if isinstance(links, str) else links
+    if isinstance(data, dict):
+        return list(data.values())
+    urls = []
+    for item in data:
+        if isinstance(item, dict):
+            urls.append(item.get("url", ""))
+        elif isinstance(item, (list, tuple)) and len(item) > 1:
+            urls.append(item[1])
+    return urls
+
+
+def unreferenced(folders, links):
+    """Return the artifact folders no relative link of the book points into."""
+    prefixes = set()
+    for url in link_targets(links):
+        if "://" in url or url.startswith(("/", "#", "mailto:")):
+            continue
+        relative = url.removeprefix("./")
+        prefixes.add(relative.split("/", 1)[0])
+    return sorted(folder for folder in folders if folder not in prefixes)
+
+
+def main(argv=None):
+    """Download the artifacts of the run, or check the links to them."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("download", help="download artifacts concurrently")
+    fetch.add_argument("--patterns", default="")
+    fetch.add_argument("--concurrency", type=int, default=4)
+
+    check = commands.add_parser("check", help="warn about unreferenced artifacts")
+    check.add_argument("--links", default=os.environ.get("BOOK_LINKS", "{}"))
+
+    args = parser.parse_args(argv)
+    if args.command == "check":
+        folders = (
+            [
+                name
+                for name in sorted(os.listdir(args.path))
+                if os.path.isdir(os.path.join(args.path, name))
+            ]
+            if os.path.isdir(args.path)
+            else []
+        )
+        try:
+            folders = unreferenced(folders, args.links)
+        except json.JSONDecodeError as error:
+            print(
+                f"::warning::Cannot check the artifacts, the links are no JSON: {error}"
+            )
+            return 0
+        for folder in folders:
+            print(
+                f"::warning::Artifact '{folder}' is downloaded but no link of the "
+                f"book points into it; leave it out with the artifacts input"
+            )
+        return 0
+
+    results = download_all(
+        os.environ.get("GITHUB_API_URL", "https://api.github.com"),
+        os.environ["GITHUB_REPOSITORY"],
+        os.environ["GITHUB_RUN_ID"],
+        os.environ["GITHUB_TOKEN"],
+        pattern_list(args.patterns),
+        args.path,
+        args.concurrency,
+    )
+    for result in results:
+        print(f"{result['name']}: {result['bytes']} bytes in {result['seconds']} s")
+    print(f"Downloaded {len(results)} artifact(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Compare the book with the site deployed by the last run of the book action.
+
+GitHub Pages always deploys a full artifact. This helper makes that cheaper:
+it writes a manifest with the SHA-256 and size of every file of the site to
+``.cradle-manifest.json``, which is deployed with the site. On the next run the
+manifest of the deployed site is fetched and compared with the new one. When
+nothing changed, the action skips the upload and the deployment altogether.
+Otherwise the step summary shows which files changed and how many bytes of the
+site are unchanged.
+
+The book page itself carries a generation timestamp, so it is not hashed.
+Instead the manifest holds a fingerprint of what the page is made from (the
+inputs of the action and the template).
+
+The manifest also holds the commit it was built for. The Pages CDN caches
+responses, so the manifest is fetched with a cache-busting query and
+``Cache-Control: no-cache``, and a deployment is only skipped when the fetched
+manifest belongs to the live deployment (``--deployed-commit``, the commit of
+the latest successful Pages deployment). A stale manifest, e.g. after a quick
+revert and redeploy, never skips the deployment.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Name of the manifest, at the root of the site
+MANIFEST = ".cradle-manifest.json"
+
+
+def file_hash(path):
+    """Return the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest(folder, fingerprint="", commit=""):
+    """Return the manifest of a site: the hash and size of every file.
+
+    Args:
+        folder: Root folder of the site.
+        fingerprint: Text that identifies the book page (inputs and template).
+        commit: The commit the site is built for.
+    """
+    files = {}
+    for root, dirs, names in os.walk(folder):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, folder).replace(os.sep, "/")
+            if relative == MANIFEST:
+                continue
+            files[relative] = {"sha256": file_hash(path), "size": os.path.getsize(path)}
+    return {
+        "fingerprint": hashlib.sha256(fingerprint.encode()).hexdigest(),
+        "commit": commit,
+        "files": files,
+    }
+
+
+def fetch(url, timeout=30):
+    """Return the manifest of the deployed site, or None if there is none."""
+    if not url:
+        return None
+    # Bypass the CDN cache, which would serve the manifest of an older deployment
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/{MANIFEST}?nocache={time.time_ns()}",
+        headers={"Cache-Control": "no-cache", "Pragma": "no-cache"},
+    )
+    try:
+        with urllib.request.urlopen(  # nosec B310 - the URL of the Pages site
+            request, timeout=timeout
+        ) as response:
+            return json.load(response)
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def compare(old, new):
+    """Compare two manifests.
+
+    Returns:
+        A dict with the ``added``, ``changed``, ``removed`` and ``unchanged``
+        file names, the bytes of the changed and unchanged files, and whether
+        the book page (its fingerprint) changed.
+    """
+    old_files = (old or {}).get("files", {})
+    new_files = new["files"]
+    diff = {"added": [], "changed": [], "removed": [], "unchanged": []}
+    for name, entry in new_files.items():
+        if name not in old_files:
+            diff["added"].append(name)
+        elif old_files[name]["sha256"] != entry["sha256"]:
+            diff["changed"].append(name)
+        else:
+            diff["unchanged"].append(name)
+    diff["removed"] = sorted(set(old_files) - set(new_files))
+    diff["changed_bytes"] = sum(
+        new_files[name]["size"] for name in diff["added"] + diff["changed"]
+    )
+    diff["unchanged_bytes"] = sum(new_files[name]["size"] for name in diff["unchanged"])
+    diff["page_changed"] = (old or {}).get("fingerprint") != new["fingerprint"]
+    return diff
+
+
+def is_unchanged(diff):
+    """Return whether the site is the same as the deployed one."""
+    return not (
+        diff["added"] or diff["changed"] or diff["removed"] or diff["page_changed"]
+    )
+
+
+def is_live(deployed, commit):
+    """Return whether a fetched manifest belongs to the live deployment.
+
+    Args:
+        deployed: The fetched manifest, or None.
+        commit: The commit of the live Pages deployment (empty if unknown).
+    """
+    return bool(deployed and commit and deployed.get("commit") == commit)
+
+
+def markdown(diff, skipped):
+    """Render the comparison with the deployed site as markdown."""
+    total = diff["changed_bytes"] + diff["unchanged_bytes"]
+    lines = ["### 📚 Pages deployment", ""]
+    if skipped:
+        lines.append(
+            f"Nothing changed since the last deployment: skipped uploading and "
+            f"deploying **{total / 1e6:.1f} MB**."
+        )
+    else:
+        lines.append(
+            f"**{diff['changed_bytes'] / 1e6:.1f} MB** of **{total / 1e6:.1f} MB** "
+            f"changed since the last deployment "
+            f"({len(diff['added'])} added, {len(diff['changed'])} changed, "
+            f"{len(diff['removed'])} removed, {len(diff['unchanged'])} unchanged files)."
+        )
+        if diff["page_changed"]:
+            lines.append("")
+            lines.append("The book page changed.")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    """Write the manifest, compare it with the deployed one and report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--site", default="artifacts")
+    parser.add_argument("--url", default="")
+    parser.add_argument("--fingerprint", default="")
+    parser.add_argument("--commit", default=os.environ.get("GITHUB_SHA", ""))
+    parser.add_argument("--deployed-commit", default="")
+    parser.add_argument("--skip-unchanged", action="store_true")
+    parser.add_argument("--summary", default=os.environ.get("GITHUB_STEP_SUMMARY"))
+    parser.add_argument("--output", default=os.environ.get("GITHUB_OUTPUT"))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.site, exist_ok=True)
+    new = manifest(args.site, args.fingerprint, args.commit)
+    deployed = fetch(args.url)
+    diff = compare(deployed, new)
+    with open(os.path.join(args.site, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(new, f, indent=1, sort_keys=True)
+
+    skipped = args.skip_unchanged and is_unchanged(diff)
+    if skipped and not is_live(deployed, args.deployed_commit):
+        print(
+            "The fetched manifest is not that of the live deployment "
+            f"({args.deployed_commit or 'unknown'}): deploying anyway"
+        )
+        skipped = False
+    report = markdown(diff, skipped)
+    print(report)
+    if args.summary:
+        with open(args.summary, "a", encoding="utf-8") as f:
+            f.write(report)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(f"changed={'false' if skipped else 'true'}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
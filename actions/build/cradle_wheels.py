@@ -0,0 +1,200 @@
+"""Build wheels for several Python versions in parallel for the build action.
+
+An sdist is built once (or taken from the output folder), then one wheel per target Python version is built from
+it concurrently with ``uv build --wheel --python <version>``. Building from the
+sdist gives every build its own unpacked source tree, so builds that write into
+the source folder (e.g. ``build/`` for compiled extensions) cannot collide.
+Interpreters are installed up front by uv in a single ``uv python install``.
+
+The wheels are collected in the output folder. A ``manifest.json`` listing the
+SHA-256 and size of every file in it is written outside that folder (``--manifest``),
+so that uploads of ``dist/*`` only see distributions, and the wall time of the
+parallel build is reported against the serial equivalent (the sum of the
+individual build times).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_versions(text):
+    """Split a list of Python versions separated by commas, spaces or newlines."""
+    versions = []
+    for version in text.replace(",", " ").split():
+        if version not in versions:
+            versions.append(version)
+    return versions
+
+
+def run(command):
+    """Run a command, failing with its output if it does not succeed."""
+    result = subprocess.run(  # nosec B603
+        command, check=False, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"{' '.join(command)} failed:\n{result.stdout}\n{result.stderr}"
+        )
+    return result
+
+
+def find_sdist(folder):
+    """Return the path of the sdist in a folder, or None if there is none."""
+    if not os.path.isdir(folder):
+        return None
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".tar.gz"):
+            return os.path.join(folder, name)
+    return None
+
+
+def uv_build_wheel(sdist, version, out_dir):
+    """Build the wheel for one Python version from the sdist with uv."""
+    run(["uv", "build", "--wheel", "--python", version, "--out-dir", out_dir, sdist])
+
+
+def build_wheels(sdist, versions, out_dir, builder=uv_build_wheel, workers=None):
+    """Build the wheels for all versions concurrently.
+
+    Args:
+        sdist: Path to the sdist the wheels are built from.
+        versions: The target Python versions.
+        out_dir: Folder the wheels are collected in.
+        builder: Function ``(sdist, version, folder)`` that builds one wheel.
+        workers: Maximum number of concurrent builds (default: one per version).
+
+    Returns:
+        A dict with the per-version ``durations`` and the ``wall`` time, in seconds.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as scratch:
+
+        def build(version):
+            folder = os.path.join(scratch, version)
+            start = time.monotonic()
+            builder(sdist, version, folder)
+            return version, folder, time.monotonic() - start
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers or len(versions)) as pool:
+            results = list(pool.map(build, versions))
+        wall = time.monotonic() - start
+
+        for _, folder, _ in results:
+            for name in sorted(os.listdir(folder)):
+                # Pure-Python wheels have the same name for every version: keep one
+                if name.endswith(".whl") and not os.path.exists(
+                    os.path.join(out_dir, name)
+                ):
+                    shutil.move(os.path.join(folder, name), os.path.join(out_dir, name))
+
+    return {
+        "durations": {version: duration for version, _, duration in results},
+        "wall": wall,
+    }
+
+
+def manifest(folder):
+    """List the SHA-256 and size of every distribution file in a folder."""
+    entries = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            continue
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        entries.append(
+            {"file": name, "sha256": digest.hexdigest(), "size": os.path.getsize(path)}
+        )
+    return entries
+
+
+def markdown(timing, files):
+    """Render the build times and the manifest as markdown."""
+    serial = sum(timing["durations"].values())
+    lines = [
+        "### 🛞 Wheel builds",
+        "",
+        "| Python | Build time |",
+        "|--------|-----------:|",
+    ]
+    lines += [
+        f"| {version} | {duration:.1f} s |"
+        for version, duration in timing["durations"].items()
+    ]
+    speedup = serial / timing["wall"] if timing["wall"] else 1.0
+    lines += [
+        "",
+        f"Wall time **{timing['wall']:.1f} s** against **{serial:.1f} s** built one after another ({speedup:.1f}x).",
+        "",
+        "| File | Size | SHA-256 |",
+        "|------|-----:|---------|",
+    ]
+    lines += [
+        f"| {entry['file']} | {entry['size']} | `{entry['sha256']}` |"
+        for entry in files
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    """Build the wheels, write the manifest and report the timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--python-versions", required=True)
+    parser.add_argument("--out-dir", default="dist")
+    parser.add_argument("--manifest", default="artifacts/build/manifest.json")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--summary", default=os.environ.get("GITHUB_STEP_SUMMARY"))
+    args = parser.parse_args(argv)
+
+    versions = parse_versions(args.python_versions)
+    if not versions:
+        parser.error("--python-versions lists no version")
+
+    # Fetch all interpreters at once rather than racing from the parallel builds
+    run(["uv", "python", "install", *versions])
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # Reuse the sdist already in the output folder, else build a throwaway one
+        sdist = find_sdist(args.out_dir)
+        if sdist is None:
+            run(["uv", "build", "--sdist", "--out-dir", scratch])
+            sdist = find_sdist(scratch)
+        timing = build_wheels(sdist, versions, args.out_dir, workers=args.workers)
+
+    files = manifest(args.out_dir)
+    folder = os.path.dirname(args.manifest)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "files": files,
+                "build_seconds": timing["durations"],
+                "wall_seconds": timing["wall"],
+                "serial_seconds": sum(timing["durations"].values()),
+            },
+            f,
+            indent=2,
+        )
+
+    report = markdown(timing, files)
+    print(report)
+    if args.summary:
+        with open(args.summary, "a", encoding="utf-8") as f:
+            f.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
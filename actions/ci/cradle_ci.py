@@ -0,0 +1,243 @@
+"""Run the stages of the ci action on one checkout and one environment.
+
+Each stage runs the same command as its own action (test, coverage, pdoc,
+deptry, pre-commit), in the environment the ci action created once. The
+pre-commit stage runs first and alone, as its hooks may rewrite files; the
+other stages are independent and run at the same time, at most ``--jobs`` at
+once. The output of every stage is kept in ``<logs>/<stage>.log``.
+
+Every stage gets a step output with its status (``success`` or ``failure``).
+A failing stage does not stop the others: once all are done, the failures are
+reported (as GitHub error annotations, with the end of their log) and the
+command exits with status 1.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shlex
+import subprocess  # nosec B404
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# The stages, in the order they are reported
+STAGES = ("pre-commit", "test", "coverage", "pdoc", "deptry")
+
+# Stages that may change the checkout, run before all others
+EXCLUSIVE = ("pre-commit",)
+
+# Lines of the log shown for a failed stage
+LOG_TAIL = 30
+
+# The pytest options of every report format of the coverage action
+REPORTS = {
+    "term": ["--cov-report=term"],
+    "xml": ["--cov-report=xml:artifacts/tests/coverage/coverage.xml"],
+    "json": ["--cov-report=json:artifacts/tests/coverage/coverage.json"],
+    "lcov": ["--cov-report=lcov:artifacts/tests/coverage/coverage.info"],
+    "html": ["--cov-report=html:artifacts/tests/html-coverage"],
+    "pytest-html": ["--html=artifacts/tests/html-report/report.html"],
+}
+
+
+def stage_list(text):
+    """Return the stages named in a comma or newline separated list, in order."""
+    names = [item.strip() for line in text.splitlines() for item in line.split(",")]
+    unknown = [name for name in names if name and name not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+    return [stage for stage in STAGES if stage in names]
+
+
+def report_options(text):
+    """Return the pytest options of a comma separated list of report formats."""
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in REPORTS]
+    if unknown:
+        raise ValueError(f"Unknown report(s): {', '.join(unknown)}")
+    return [option for name in names for option in REPORTS[name]]
+
+
+def command(stage, args):
+    """Return the command of a stage and the extra environment it needs."""
+    if stage == "pre-commit":
+        return ["uvx", "pre-commit", "run", "--all-files", "--show-diff-on-failure"], {}
+    if stage == "test":
+        # No cache provider: test and coverage may run pytest at the same time
+        return ["uv", "run", "pytest", "-p", "no:cacheprovider", args.tests_folder], {}
+    if stage == "coverage":
+        return [
+            "uv",
+            "run",
+            "pytest",
+            "-p",
+            "no:cacheprovider",
+            f"--cov={args.source_folder}",
+            *report_options(args.coverage_reports),
+            args.tests_folder,
+        ], {"COVERAGE_FILE": "artifacts/tests/coverage/.coverage"}
+    if stage == "pdoc":
+        return [
+            "uv",
+            "run",
+            "pdoc",
+            "-o",
+            "artifacts/pdoc",
+            *shlex.split(args.pdoc_arguments),
+            args.source_folder,
+        ], {}
+    if stage == "deptry":
+        return [
+            "uvx",
+            "deptry",
+            args.source_folder,
+            *shlex.split(args.deptry_options),
+            "--json-output",
+            "artifacts/deptry/deptry.json",
+        ], {}
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def run_command(argv, env, log):
+    """Run a command, writing its output to the log, and return its exit status."""
+    with open(log, "w", encoding="utf-8") as f:
+        try:
+            result = subprocess.run(  # nosec B603
+                argv,
+                check=False,
+                env={**os.environ, **env},
+                stdout=f,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+        except OSError as error:
+            f.write(f"{error}\n")
+            return 127
+    return result.returncode
+
+
+def run_stage(stage, args, logs, runner=None):
+    """Run one stage and return its ``stage``, ``status``, ``seconds`` and ``log``."""
+    runner = runner or run_command
+    argv, env = command(stage, args)
+    log = os.path.join(logs, f"{stage}.log")
+    start = time.monotonic()
+    status = runner(argv, env, log)
+    if stage == "coverage":
+        # As in the coverage action: the html report must not be ignored by git
+        with contextlib.suppress(FileNotFoundError):
+            os.remove("artifacts/tests/html-coverage/.gitignore")
+    return {
+        "stage": stage,
+        "status": "success" if status == 0 else "failure",
+        "seconds": round(time.monotonic() - start, 1),
+        "log": log,
+    }
+
+
+def run_all(stages, args, logs, jobs=0, runner=None):
+    """Run the exclusive stages one by one, then the others concurrently."""
+    for folder in (
+        logs,
+        "artifacts/tests/coverage",
+        "artifacts/tests/html-report",
+        "artifacts/deptry",
+    ):
+        os.makedirs(folder, exist_ok=True)
+    results = [
+        run_stage(stage, args, logs, runner) for stage in stages if stage in EXCLUSIVE
+    ]
+    rest = [stage for stage in stages if stage not in EXCLUSIVE]
+    if rest:
+        workers = min(jobs or len(rest), len(rest))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results += list(
+                pool.map(lambda stage: run_stage(stage, args, logs, runner), rest)
+            )
+    return results
+
+
+def tail(path, lines=LOG_TAIL):
+    """Return the last lines of a log file."""
+    if not path or not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def markdown(results, seconds):
+    """Render the status and wall time of every stage as markdown."""
+    icons = {"success": "✅", "failure": "❌"}
+    lines = [
+        "### 🔄 CI stages",
+        "",
+        "| Stage | Status | Time |",
+        "|-------|--------|-----:|",
+    ]
+    for result in results:
+        lines.append(
+            f"| {result['stage']} | {icons[result['status']]} {result['status']} "
+            f"| {result['seconds']:.1f} s |"
+        )
+    serial = sum(result["seconds"] for result in results)
+    lines += [
+        "",
+        f"Wall time {seconds:.1f} s (the stages took {serial:.1f} s in total)",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    """Run the stages and fail with a summary of the failed ones."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", required=True)
+    parser.add_argument("--source-folder", default="src")
+    parser.add_argument("--tests-folder", default="tests")
+    parser.add_argument("--pdoc-arguments", default="")
+    parser.add_argument("--deptry-options", default="")
+    parser.add_argument("--coverage-reports", default=",".join(REPORTS))
+    parser.add_argument("--jobs", type=int, default=0)
+    parser.add_argument("--logs", default="artifacts/ci-logs")
+    parser.add_argument("--output", default=os.environ.get("GITHUB_OUTPUT"))
+    parser.add_argument("--summary", default=os.environ.get("GITHUB_STEP_SUMMARY"))
+    args = parser.parse_args(argv)
+
+    try:
+        stages = stage_list(args.stages)
+        report_options(args.coverage_reports)
+    except ValueError as error:
+        parser.error(str(error))
+    if not stages:
+        parser.error("--stages names no stage")
+
+    start = time.monotonic()
+    results = run_all(stages, args, args.logs, args.jobs)
+    report = markdown(results, time.monotonic() - start)
+    print(report)
+    if args.summary:
+        with open(args.summary, "a", encoding="utf-8") as f:
+            f.write(report)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.writelines(
+                f"{result['stage']}={result['status']}\n" for result in results
+            )
+            statuses = {result["stage"]: result["status"] for result in results}
+            f.write(f"results={json.dumps(statuses)}\n")
+
+    failed = [result for result in results if result["status"] == "failure"]
+    for result in failed:
+        print(f"::error::Stage {result['stage']} failed")
+        print(f"::group::End of {result['log']}")
+        print(tail(result["log"]))
+        print("::endgroup::")
+    if failed:
+        print(f"{len(failed)} of {len(results)} stage(s) failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
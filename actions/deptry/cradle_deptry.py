@@ -0,0 +1,174 @@
+"""Run deptry with a per-file cache of the imports it extracts.
+
+deptry parses every Python file and notebook of the project on each run. This
+wrapper runs the deptry command line in deptry's own environment, e.g.
+``uvx --from deptry python cradle_deptry.py --cache-dir DIR src``, with its
+import extraction replaced: the imports of each file are cached under the hash
+of the file's content (and the deptry version), only the files missing from the
+cache are handed to deptry's extractor, and the cached imports are merged back
+in. The analysis itself runs on all imports, as usual, so the report is the
+same as that of ``deptry``.
+
+Every field of deptry's import locations is kept in the cache, including the
+rule codes a ``# deptry: ignore[...]`` comment suppresses on that line.
+
+Entries no file used in this run are removed from the cache afterwards. If the
+installed deptry has no such extraction function, deptry runs unchanged.
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import importlib.metadata
+import json
+import os
+import runpy
+import sys
+
+# Version of the layout of the cache entries, part of every key
+CACHE_FORMAT = "2"
+
+# Collections JSON has no type for, stored with their type name
+COLLECTIONS = {"tuple": tuple, "set": set, "frozenset": frozenset}
+
+
+def file_key(path, version):
+    """Return the cache key of a file: hash of the deptry version and its content."""
+    digest = hashlib.sha256(f"{CACHE_FORMAT}:{version}".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def encode(value):
+    """Return a field of a location as JSON, keeping the type of collections."""
+    for name, kind in COLLECTIONS.items():
+        if type(value) is kind:
+            return {name: list(value) if kind is tuple else sorted(value, key=str)}
+    return value
+
+
+def decode(value):
+    """Return a field of a location from its JSON form, see ``encode``."""
+    if isinstance(value, dict) and len(value) == 1:
+        name, items = next(iter(value.items()))
+        if name in COLLECTIONS:
+            return COLLECTIONS[name](items)
+    return value
+
+
+def split_by_file(modules):
+    """Split extracted imports into the imports of every file.
+
+    Args:
+        modules: Maps each module to the locations (file, line, column, ...)
+            importing it.
+
+    Returns:
+        A dict mapping each file to ``{module: [{field: value}, ...]}``, with all
+        fields of the location but the file.
+    """
+    files = {}
+    for module, locations in modules.items():
+        for location in locations:
+            found = files.setdefault(str(location.file), {})
+            fields = {
+                field.name: encode(getattr(location, field.name))
+                for field in dataclasses.fields(location)
+                if field.name != "file"
+            }
+            found.setdefault(module, []).append(fields)
+    return files
+
+
+def merge(modules, entry, path, location):
+    """Add the cached imports of one file to the imports of all files."""
+    for module, places in entry.items():
+        modules.setdefault(module, []).extend(
+            location(path, **{name: decode(value) for name, value in fields.items()})
+            for fields in places
+        )
+
+
+def cached_extractor(extract, location, cache_dir, version, used):
+    """Wrap deptry's extraction of imports with the per-file cache.
+
+    Args:
+        extract: deptry's function from a list of files to their imports.
+        location: deptry's location dataclass, made from the file and the other
+            fields.
+        cache_dir: Folder of the cached imports, one JSON file per key.
+        version: The deptry version, part of every key.
+        used: Set the keys used in this run are added to.
+    """
+
+    def extract_with_cache(files):
+        modules, missing = {}, []
+        for path in files:
+            key = file_key(path, version)
+            used.add(key)
+            cached = os.path.join(cache_dir, f"{key}.json")
+            if os.path.exists(cached):
+                with open(cached, encoding="utf-8") as f:
+                    merge(modules, json.load(f), path, location)
+            else:
+                missing.append((path, key))
+
+        print(
+            f"deptry: {len(files) - len(missing)} file(s) cached, {len(missing)} parsed"
+        )
+        if missing:
+            found = split_by_file(extract([path for path, _ in missing]))
+            for path, key in missing:
+                entry = found.get(str(path), {})
+                with open(
+                    os.path.join(cache_dir, f"{key}.json"), "w", encoding="utf-8"
+                ) as f:
+                    json.dump(entry, f)
+                merge(modules, entry, path, location)
+        return modules
+
+    return extract_with_cache
+
+
+def prune(cache_dir, used):
+    """Remove the cache entries of files that changed or are gone."""
+    for name in os.listdir(cache_dir):
+        if name.endswith(".json") and name[: -len(".json")] not in used:
+            os.remove(os.path.join(cache_dir, name))
+
+
+def main(argv=None):
+    """Run the deptry command line with the cached import extraction."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache-dir", required=True)
+    args, deptry_args = parser.parse_known_args(argv)
+
+    import deptry.core
+    from deptry.imports.location import Location
+
+    used = set()
+    extract = getattr(deptry.core, "get_imported_modules_from_list_of_files", None)
+    if extract is None:
+        print("deptry: no per-file cache for this deptry version")
+    else:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        deptry.core.get_imported_modules_from_list_of_files = cached_extractor(
+            extract,
+            Location,
+            args.cache_dir,
+            importlib.metadata.version("deptry"),
+            used,
+        )
+
+    sys.argv = ["deptry", *deptry_args]
+    try:
+        runpy.run_module("deptry", run_name="__main__", alter_sys=True)
+    finally:
+        if used:
+            prune(args.cache_dir, used)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,525 @@
+"""Parallel builds, pushes and layer cache statistics for the docker action.
+
+``build`` builds one image per Dockerfile, concurrently, and pushes each image
+as soon as its own build is done. Stages that several Dockerfiles share (the
+same instructions on the same base) are built once up front; the parallel
+builds then take their layers from buildah's layer cache instead of repeating
+them. The digest, size and build and push times of every image are written to
+``$GITHUB_OUTPUT`` as a JSON map.
+
+``push`` pushes a single image built by the build step. Both ``build`` and
+``push`` can compress the layers with zstd, upload several layers at once and
+retry a failed push with exponential backoff. Blobs the registry already has
+are skipped. The bytes sent over the network during the push are reported.
+
+``layers`` reports which layers of an image came from the layer cache. Buildah
+reuses a cached layer together with its history entry, so the entry keeps the
+time it was first built: entries older than the start of the build were taken
+from the cache (or the base image), newer ones were built in this run. Images
+built with a fixed timestamp (``--timestamp`` or ``SOURCE_DATE_EPOCH``) carry
+no build times, so every layer of theirs shows as reused.
+
+Both commands print a markdown report and append it to ``$GITHUB_STEP_SUMMARY``.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Longest instruction shown in the summary table
+MAX_INSTRUCTION = 80
+
+
+def parse_time(text):
+    """Parse an RFC 3339 timestamp as written in image configs to epoch seconds.
+
+    Go writes up to nine fractional digits and a ``Z`` suffix, which
+    ``datetime.fromisoformat`` only accepts from Python 3.11 on.
+    """
+    match = re.match(
+        r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:\d{2})?$",
+        text.strip(),
+    )
+    if match is None:
+        raise ValueError(f"not an RFC 3339 timestamp: {text!r}")
+    base, fraction, zone = match.groups()
+    fraction = (fraction or "0")[:6].ljust(6, "0")
+    zone = "+00:00" if zone in (None, "Z") else zone
+    return datetime.fromisoformat(f"{base}.{fraction}{zone}").timestamp()
+
+
+def run(command):
+    """Run a command, failing with its output if it does not succeed."""
+    result = subprocess.run(  # nosec B603
+        command, check=False, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"{' '.join(command)} failed:\n{result.stdout}\n{result.stderr}"
+        )
+    return result.stdout
+
+
+def inspect(image):
+    """Return the podman inspection of a local image."""
+    return json.loads(run(["podman", "image", "inspect", image]))[0]
+
+
+def history(image):
+    """Return the history entries of a local image, oldest first."""
+    return inspect(image).get("History") or []
+
+
+def classify(entries, since):
+    """Mark every history entry as built in this run or reused.
+
+    Args:
+        entries: History entries of the image config, oldest first.
+        since: Epoch seconds at which the build started.
+
+    Returns:
+        One dict per entry with the ``instruction``, whether it is an
+        ``empty`` layer (metadata only) and its ``status``.
+    """
+    rows = []
+    for entry in entries:
+        created = entry.get("created")
+        if created:
+            status = "built" if parse_time(created) >= since else "reused"
+        else:
+            status = "unknown"
+        instruction = " ".join(entry.get("created_by", "").split())
+        instruction = instruction.replace("/bin/sh -c #(nop) ", "")
+        rows.append(
+            {
+                "instruction": instruction,
+                "empty": bool(entry.get("empty_layer")),
+                "status": status,
+            }
+        )
+    return rows
+
+
+def markdown(image, rows):
+    """Render the per-layer cache statistics as markdown."""
+    reused = sum(row["status"] == "reused" for row in rows)
+    lines = [
+        f"### 🐳 Layer cache for `{image}`",
+        "",
+        f"**{reused}** of **{len(rows)}** steps reused from the cache.",
+        "",
+        "| # | Instruction | Layer | Cache |",
+        "|--:|-------------|-------|-------|",
+    ]
+    for number, row in enumerate(rows, start=1):
+        instruction = row["instruction"]
+        if len(instruction) > MAX_INSTRUCTION:
+            instruction = instruction[: MAX_INSTRUCTION - 1] + "…"
+        instruction = instruction.replace("|", "\\|")
+        layer = "metadata" if row["empty"] else "files"
+        icon = {"reused": "✅ reused", "built": "🔨 built"}.get(row["status"], "❔")
+        lines.append(f"| {number} | `{instruction}` | {layer} | {icon} |")
+    return "\n".join(lines) + "\n"
+
+
+def split_list(text):
+    """Split a list separated by commas or newlines, dropping empty items."""
+    return [item.strip() for item in re.split(r"[,\n]", text) if item.strip()]
+
+
+def image_name(dockerfile, registry, repository, several):
+    """Return the registry reference (without tag) of the image of a Dockerfile.
+
+    A single Dockerfile builds ``registry/repository``. With several, each image
+    gets a suffix taken from its Dockerfile: ``Dockerfile.api`` and
+    ``api.Dockerfile`` both build ``registry/repository/api``, while
+    ``api/Dockerfile`` uses the folder name.
+    """
+    name = f"{registry}/{repository}".lower()
+    if not several:
+        return name
+    base = os.path.basename(dockerfile)
+    if base.lower().startswith("dockerfile."):
+        suffix = base[len("dockerfile.") :]
+    elif base.lower().endswith(".dockerfile"):
+        suffix = base[: -len(".dockerfile")]
+    else:
+        suffix = os.path.basename(os.path.dirname(os.path.abspath(dockerfile)))
+    return f"{name}/{re.sub(r'[^a-z0-9._-]+', '-', suffix.lower())}"
+
+
+def instructions(text):
+    """Return the instructions of a Dockerfile, one string per instruction.
+
+    Continuation lines are joined, comments and blank lines dropped and
+    whitespace normalised, so formatting does not hide a shared stage.
+    """
+    result, current = [], ""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith("#")):
+            continue
+        if stripped.endswith("\\"):
+            current += stripped[:-1] + " "
+            continue
+        current = " ".join((current + stripped).split())
+        if current:
+            keyword, _, rest = current.partition(" ")
+            result.append(f"{keyword.upper()} {rest}".strip())
+        current = ""
+    return result
+
+
+def stages(text):
+    """Return the named stages of a Dockerfile with a key for their content.
+
+    Two stages have the same key when they run the same instructions on the
+    same base, where a base that is itself a stage is compared by its key.
+
+    Returns:
+        A dict mapping each stage name to ``(key, parent)``, where ``parent``
+        is the name of the stage it builds on, or None if it starts from an image.
+    """
+    header, keys, parents, names = [], [], [], []
+    for instruction in instructions(text):
+        keyword, _, rest = instruction.partition(" ")
+        if keyword == "FROM":
+            words = rest.split()
+            options = [word for word in words if word.startswith("--")]
+            words = [word for word in words if not word.startswith("--")]
+            named = len(words) > 2 and words[1].upper() == "AS"
+            parent = words[0] if words[0] in names else None
+            # A stage base is compared by its key, which already holds the header
+            base = keys[names.index(parent)] if parent else words[0]
+            prefix = [] if parent else header
+            keys.append("\n".join([*prefix, *options, f"FROM {base}"]))
+            parents.append(parent)
+            names.append(words[2] if named else None)
+        elif keys:
+            keys[-1] += "\n" + instruction
+        else:
+            header.append(instruction)  # ARGs before the first FROM
+    return {
+        name: (key, parent)
+        for name, key, parent in zip(names, keys, parents)
+        if name is not None
+    }
+
+
+def read_text(path):
+    """Return the text of a file."""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def shared_stages(dockerfiles, read=read_text):
+    """Return the stages to build once before building the Dockerfiles.
+
+    A named stage is shared when at least two Dockerfiles contain it. Shared
+    stages that another shared stage builds on are left out, as building the
+    latter builds them too.
+
+    Args:
+        dockerfiles: Paths of the Dockerfiles.
+        read: Function returning the text of a Dockerfile.
+
+    Returns:
+        A list of ``(dockerfile, stage)`` pairs, one per distinct shared stage.
+    """
+    found, parents = {}, {}
+    for dockerfile in dockerfiles:
+        named = stages(read(dockerfile))
+        for name, (key, parent) in named.items():
+            found.setdefault(key, {}).setdefault(dockerfile, name)
+            if parent:
+                parents.setdefault(key, set()).add(named[parent][0])
+
+    shared = [key for key, files in found.items() if len(files) > 1]
+    covered = set().union(*(parents.get(key, set()) for key in shared))
+    return [next(iter(found[key].items())) for key in shared if key not in covered]
+
+
+def sent_bytes(loopback=False, path="/proc/net/dev"):
+    """Return the bytes sent over the network interfaces, or None without /proc.
+
+    The loopback interface only counts when asked for, i.e. when pushing to a
+    registry on localhost.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()[2:]
+    except OSError:
+        return None
+    total = 0
+    for line in lines:
+        interface, _, counters = line.partition(":")
+        if (interface.strip() != "lo" or loopback) and len(counters.split()) > 8:
+            total += int(counters.split()[8])
+    return total
+
+
+def push(source, destination, tags, options=(), retries=0, delay=2.0, sleep=None):
+    """Push every tag of a local image, retrying failed pushes with backoff.
+
+    Blobs the registry already has are not uploaded again: the push checks
+    for every blob first.
+
+    Args:
+        source: Local image reference, without tag.
+        destination: Registry reference, without tag.
+        tags: Tags to push.
+        options: Extra ``buildah push`` options (e.g. the compression format).
+        retries: How often a failed push is retried.
+        delay: Seconds before the first retry; doubled for every further one.
+        sleep: Function used to wait between attempts (default: time.sleep).
+
+    Returns:
+        A dict with the ``digest`` of the pushed manifest and the number of
+        ``attempts`` all pushes took.
+    """
+    sleep = sleep or time.sleep
+    digest, attempts = "", 0
+    with tempfile.TemporaryDirectory() as scratch:
+        digest_file = os.path.join(scratch, "digest")
+        for tag in tags:
+            command = ["buildah", "push", *options, "--digestfile", digest_file]
+            command += [f"{source}:{tag}", f"docker://{destination}:{tag}"]
+            for attempt in range(retries + 1):
+                attempts += 1
+                try:
+                    run(command)
+                    break
+                except RuntimeError as error:
+                    if attempt == retries:
+                        raise
+                    wait = delay * 2**attempt
+                    print(f"Push of {destination}:{tag} failed, retrying in {wait}s")
+                    print(error)
+                    sleep(wait)
+            with open(digest_file, encoding="utf-8") as f:
+                digest = f.read().strip()
+    return {"digest": digest, "attempts": attempts}
+
+
+def build_and_push(dockerfile, reference, tags, options, context, push_options):
+    """Build the image of one Dockerfile, then push it straight away."""
+    start = time.monotonic()
+    tag_args = [arg for tag in tags for arg in ("-t", f"{reference}:{tag}")]
+    run(
+        ["buildah", "build", "--layers", *options, *tag_args, "-f", dockerfile, context]
+    )
+    built = time.monotonic()
+    pushed = push(reference, reference, tags, **push_options)
+    return {
+        "dockerfile": dockerfile,
+        "digest": pushed["digest"],
+        "size": inspect(f"{reference}:{tags[0]}").get("Size"),
+        "build_seconds": round(built - start, 1),
+        "push_seconds": round(time.monotonic() - built, 1),
+    }
+
+
+def build_all(
+    dockerfiles,
+    references,
+    tags,
+    options,
+    context=".",
+    workers=None,
+    push_options=None,
+):
+    """Build the shared stages once, then build and push all images in parallel.
+
+    Args:
+        dockerfiles: Paths of the Dockerfiles.
+        references: Registry reference (without tag) of the image of each Dockerfile.
+        tags: Tags given to every image.
+        options: Extra ``buildah build`` options (labels, cache source/destination).
+        context: Build context shared by all builds.
+        workers: Maximum number of concurrent builds (default: one per Dockerfile).
+        push_options: Keyword arguments for ``push`` (options, retries, delay).
+
+    Returns:
+        A dict mapping every image reference to its digest, size and timings.
+    """
+    workers = workers or len(dockerfiles)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(
+            pool.map(
+                lambda shared: run(
+                    ["buildah", "build", "--layers", *options]
+                    + ["--target", shared[1], "-f", shared[0], context]
+                ),
+                shared_stages(dockerfiles),
+            )
+        )
+        results = pool.map(
+            lambda job: build_and_push(
+                job[0], job[1], tags, options, context, push_options or {}
+            ),
+            zip(dockerfiles, references),
+        )
+        return dict(zip(references, results))
+
+
+def images_markdown(images, sent=None):
+    """Render the digest, size and timings of the built images as markdown.
+
+    Args:
+        images: Map from image reference to its digest, size and timings.
+        sent: Bytes sent over the network meanwhile, or None if unknown.
+    """
+    lines = [
+        "### 🐳 Images",
+        "",
+        "| Image | Digest | Size | Build | Push |",
+        "|-------|--------|-----:|------:|-----:|",
+    ]
+    for reference, image in images.items():
+        size = image["size"]
+        size = f"{size / 1e6:.1f} MB" if size is not None else "n/a"
+        lines.append(
+            f"| `{reference}` | `{image['digest']}` | {size} "
+            f"| {image['build_seconds']:.1f} s | {image['push_seconds']:.1f} s |"
+        )
+    if sent is not None:
+        lines += ["", f"**{sent / 1e6:.1f} MB** sent to the registry."]
+    return "\n".join(lines) + "\n"
+
+
+def report(text, summary):
+    """Print a markdown report and append it to the step summary."""
+    print(text)
+    if summary:
+        with open(summary, "a", encoding="utf-8") as f:
+            f.write(text)
+
+
+def push_arguments(parser):
+    """Add the options that control the push to a command line parser."""
+    parser.add_argument("--compression-format", default="")
+    parser.add_argument("--jobs", type=int, default=0)
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--retry-delay", type=float, default=2.0)
+
+
+def push_options(args):
+    """Return the keyword arguments for ``push`` from the parsed options.
+
+    The number of concurrent layer uploads is a containers.conf setting, so it
+    is passed to buildah through an override file.
+    """
+    if args.jobs:
+        conf = os.path.join(tempfile.mkdtemp(), "containers.conf")
+        with open(conf, "w", encoding="utf-8") as f:
+            f.write(f"[engine]\nimage_parallel_copies = {args.jobs}\n")
+        os.environ["CONTAINERS_CONF_OVERRIDE"] = conf
+    options = []
+    if args.compression_format:
+        options = ["--compression-format", args.compression_format]
+    return {"options": options, "retries": args.retries, "delay": args.retry_delay}
+
+
+def is_local(registry):
+    """Return whether a registry runs on this machine."""
+    return registry.split("/")[0].split(":")[0] in ("localhost", "127.0.0.1")
+
+
+def main(argv=None):
+    """Build and push images, or report the layer cache hits."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--summary", default=os.environ.get("GITHUB_STEP_SUMMARY"))
+    parser.add_argument("--output", default=os.environ.get("GITHUB_OUTPUT"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build and push images in parallel")
+    build.add_argument("--dockerfiles", required=True)
+    build.add_argument("--registry", required=True)
+    build.add_argument("--repository", required=True)
+    build.add_argument("--tags", required=True)
+    build.add_argument("--labels", default="")
+    build.add_argument("--extra-args", default="")
+    build.add_argument("--context", default=".")
+    push_arguments(build)
+
+    push_image = commands.add_parser("push", help="push a local image")
+    push_image.add_argument("--image", required=True)
+    push_image.add_argument("--registry", required=True)
+    push_image.add_argument("--tags", required=True)
+    push_arguments(push_image)
+
+    layers = commands.add_parser("layers", help="report the layer cache hits")
+    layers.add_argument("--image", required=True)
+    layers.add_argument("--since", type=float, required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "layers":
+        rows = classify(history(args.image), args.since)
+        report(markdown(args.image, rows), args.summary)
+        return 0
+
+    tags = args.tags.split()
+    before = sent_bytes(loopback=is_local(args.registry))
+
+    if args.command == "push":
+        destination = f"{args.registry}/{args.image}".lower()
+        start = time.monotonic()
+        pushed = push(args.image, destination, tags, **push_options(args))
+        sent = sent_bytes(loopback=is_local(args.registry))
+        images = {
+            destination: {
+                "dockerfile": None,
+                "digest": pushed["digest"],
+                "size": inspect(f"{args.image}:{tags[0]}").get("Size"),
+                "build_seconds": 0.0,
+                "push_seconds": round(time.monotonic() - start, 1),
+            }
+        }
+        text = images_markdown(images, None if before is None else sent - before)
+        text += f"\n{pushed['attempts']} push attempt(s) for {len(tags)} tag(s).\n"
+        report(text, args.summary)
+        if args.output:
+            with open(args.output, "a", encoding="utf-8") as f:
+                f.write(f"digest={pushed['digest']}\n")
+        return 0
+
+    dockerfiles = split_list(args.dockerfiles)
+    references = [
+        image_name(dockerfile, args.registry, args.repository, len(dockerfiles) > 1)
+        for dockerfile in dockerfiles
+    ]
+    # Labels are separated by newlines only, as a label value may hold commas
+    labels = [label.strip() for label in args.labels.splitlines() if label.strip()]
+    options = [arg for label in labels for arg in ("--label", label)]
+    options += args.extra_args.split()
+    since = time.time()
+    images = build_all(
+        dockerfiles,
+        references,
+        tags,
+        options,
+        args.context,
+        push_options=push_options(args),
+    )
+    sent = sent_bytes(loopback=is_local(args.registry))
+
+    text = images_markdown(images, None if before is None else sent - before)
+    for reference in images:
+        rows = classify(history(f"{reference}:{tags[0]}"), since)
+        text += "\n" + markdown(reference, rows)
+    report(text, args.summary)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(f"images={json.dumps(images)}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Compile several LaTeX documents in parallel for the latex action.
+
+Every document is compiled with ``tectonic -X compile`` into a ``compiled``
+folder next to it, with a bounded pool of workers. The output of each run is
+kept in ``compiled/<name>.tectonic.log``. A failing document does not stop the
+others: once all are done, the failures are reported (as GitHub error
+annotations, with the end of their log) and the command exits with status 1.
+
+With ``--keep-intermediates`` the intermediates stay in ``compiled`` and a
+stamp with the hash of the document's sources is written next to the PDF. A
+document whose sources still match the stamp is not compiled again.
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import subprocess  # nosec B404
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Folders with build outputs, which are not part of the sources of a document
+OUTPUT_FOLDERS = ("compiled", "build")
+
+# Lines of the log shown for a failed document
+LOG_TAIL = 20
+
+
+def expand(patterns):
+    """Return the documents matched by globs separated by commas or newlines."""
+    documents = []
+    for pattern in pattern_list(patterns):
+        for path in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+            if path not in documents:
+                documents.append(path)
+    return documents
+
+
+def pattern_list(text):
+    """Split a list separated by commas or newlines, dropping empty items."""
+    items = [item.strip() for line in text.splitlines() for item in line.split(",")]
+    return [item for item in items if item]
+
+
+def source_hash(document):
+    """Return the SHA-256 of all files in the folder of a document.
+
+    Build outputs (``compiled`` and ``build``) are left out, so only changes to
+    the sources (text, bibliography, figures, styles) change the hash.
+    """
+    folder = os.path.dirname(os.path.abspath(document))
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if d not in OUTPUT_FOLDERS)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, folder).encode())
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def read_stamp(path):
+    """Return the source hash recorded by the last build, or an empty string."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def run_tectonic(document, outdir, keep):
+    """Compile one document with Tectonic and return its exit status and output."""
+    command = ["tectonic", "-X", "compile", os.path.basename(document)]
+    command += ["--outdir", os.path.relpath(outdir, os.path.dirname(document) or ".")]
+    if keep:
+        command += ["--keep-intermediates", "--keep-logs"]
+    result = subprocess.run(  # nosec B603 B607
+        command,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(document) or ".",
+    )
+    return result.returncode, result.stdout + result.stderr
+
+
+def compile_document(document, keep, runner=run_tectonic):
+    """Compile a document unless its sources match the stamp of the last build.
+
+    Returns:
+        A dict with the ``document``, its ``status`` (ok, failed, unchanged or
+        missing), the ``seconds`` it took and the path of its ``log``.
+    """
+    stem = os.path.splitext(os.path.basename(document))[0]
+    outdir = os.path.join(os.path.dirname(document), "compiled")
+    log = os.path.join(outdir, f"{stem}.tectonic.log")
+    stamp = os.path.join(outdir, f".{stem}.sources")
+    result = {"document": document, "status": "ok", "seconds": 0.0, "log": log}
+    if not os.path.isfile(document):
+        return {**result, "status": "missing", "log": None}
+
+    sources = source_hash(document)
+    pdf = os.path.join(outdir, f"{stem}.pdf")
+    if keep and os.path.exists(pdf) and read_stamp(stamp) == sources:
+        return {**result, "status": "unchanged"}
+
+    os.makedirs(outdir, exist_ok=True)
+    start = time.monotonic()
+    status, output = runner(document, outdir, keep)
+    result["seconds"] = round(time.monotonic() - start, 1)
+    with open(log, "w", encoding="utf-8") as f:
+        f.write(output)
+    if status != 0:
+        return {**result, "status": "failed"}
+    if keep:
+        with open(stamp, "w", encoding="utf-8") as f:
+            f.write(sources + "\n")
+    return result
+
+
+def compile_all(documents, jobs=0, keep=True, runner=None):
+    """Compile all documents with at most ``jobs`` at a time (0: one per core)."""
+    runner = runner or run_tectonic
+    workers = jobs or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, max(len(documents), 1))) as pool:
+        return list(
+            pool.map(lambda doc: compile_document(doc, keep, runner), documents)
+        )
+
+
+def tail(path, lines=LOG_TAIL):
+    """Return the last lines of a log file."""
+    if not path or not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def markdown(results):
+    """Render the status and compile time of every document as markdown."""
+    icons = {"ok": "✅", "unchanged": "💤", "failed": "❌", "missing": "❔"}
+    lines = [
+        "### 📄 LaTeX documents",
+        "",
+        "| Document | Status | Time |",
+        "|----------|--------|-----:|",
+    ]
+    for result in results:
+        lines.append(
+            f"| `{result['document']}` | {icons[result['status']]} {result['status']} "
+            f"| {result['seconds']:.1f} s |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    """Compile the documents and fail with a summary of the failed ones."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", required=True)
+    parser.add_argument("--jobs", type=int, default=0)
+    parser.add_argument("--keep-intermediates", action="store_true")
+    parser.add_argument("--summary", default=os.environ.get("GITHUB_STEP_SUMMARY"))
+    args = parser.parse_args(argv)
+
+    documents = expand(args.documents)
+    if not documents:
+        parser.error("--documents matches no document")
+    results = compile_all(documents, args.jobs, args.keep_intermediates)
+
+    report = markdown(results)
+    print(report)
+    if args.summary:
+        with open(args.summary, "a", encoding="utf-8") as f:
+            f.write(report)
+
+    failed = [r for r in results if r["status"] in ("failed", "missing")]
+    for result in failed:
+        reason = "not found" if result["status"] == "missing" else "failed to compile"
+        print(f"::error file={result['document']}::{result['document']} {reason}")
+        if result["log"]:
+            print(f"::group::End of {result['log']}")
+            print(tail(result["log"]))
+            print("::endgroup::")
+    if failed:
+        print(f"{len(failed)} of {len(results)} document(s) failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""Incremental and parallel pdoc builds for the pdoc action.
+
+Takes the same arguments as ``pdoc`` (plus ``--cache-dir`` and ``--workers``)
+and writes the same output. With ``--cache-dir`` the rendered HTML and search
+entries of every module are kept in a cache. Each module is keyed on a hash of
+its own source and the sources of the package modules it depends on, directly
+or indirectly: the modules it imports and the modules it names (e.g. in a
+docstring link). The key also holds the list of all documented modules, the
+pdoc arguments and the installed distributions, as they all change the
+rendered pages.
+
+Only the modules whose key changed are imported and rendered again. The index
+and the search index are always rebuilt from the (cached) parts, so the output
+is the same as that of a full ``pdoc`` run.
+
+With ``--workers`` the modules to render are split over a pool of processes;
+each imports and renders its share, and the parent merges the pages and search
+entries into one output folder and one search index. ``--workers 0`` uses one
+process per CPU core. Without ``--cache-dir`` every module is rendered.
+
+The helper relies on pdoc internals (its argument parser, the template
+environment and the search index builder). It is written against pdoc 16.0.0,
+the version the pdoc action installs when it runs the helper.
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import re
+import sys
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pdoc
+import pdoc.doc
+import pdoc.extract
+import pdoc.render
+import pdoc.search
+from pdoc.__main__ import parser as pdoc_parser
+from pdoc.render_helpers import defuse_unsafe_reprs
+
+# Dotted names in a source file, checked against the documented modules
+DOTTED_NAME = re.compile(r"[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*")
+
+
+class LazyModules(Mapping):
+    """The documented modules, imported only when a page needs them.
+
+    pdoc looks modules up in this mapping to resolve links, so a module that is
+    not rendered again is only imported if a rendered page refers to it.
+    """
+
+    def __init__(self, names):
+        """Keep the module names, in the order pdoc documents them."""
+        self._names = list(names)
+        self._known = set(self._names)
+        self._loaded = {}
+
+    def __getitem__(self, name):
+        """Return the pdoc documentation of a module, importing it on first use."""
+        if name not in self._known:
+            raise KeyError(name)
+        if name not in self._loaded:
+            self._loaded[name] = pdoc.doc.Module.from_name(name)
+        return self._loaded[name]
+
+    def __contains__(self, name):
+        """Return whether a module is documented, without importing it."""
+        return name in self._known
+
+    def __iter__(self):
+        """Iterate over the module names."""
+        return iter(self._names)
+
+    def __len__(self):
+        """Return the number of documented modules."""
+        return len(self._names)
+
+
+def configure(opts):
+    """Configure the pdoc renderer from the parsed pdoc arguments, as pdoc does."""
+    pdoc.render.configure(
+        docformat=opts.docformat,
+        include_undocumented=opts.include_undocumented,
+        edit_url_map=dict(x.split("=", 1) for x in opts.edit_url),
+        favicon=opts.favicon,
+        footer_text=opts.footer_text,
+        logo=opts.logo,
+        logo_link=opts.logo_link,
+        math=opts.math,
+        mermaid=opts.mermaid,
+        search=opts.search,
+        show_source=opts.show_source,
+        template_directory=opts.template_directory,
+    )
+
+
+def read_source(name):
+    """Return the source of a module as bytes (empty if it has no source file)."""
+    spec = importlib.util.find_spec(name)
+    origin = spec.origin if spec else None
+    if not origin or not os.path.isfile(origin):
+        return b""
+    return Path(origin).read_bytes()
+
+
+def is_package(name):
+    """Return whether a module is a package."""
+    spec = importlib.util.find_spec(name)
+    return bool(spec and spec.submodule_search_locations)
+
+
+def dependencies(name, source, modules, package=False):
+    """Return the documented modules a module imports or names in its source.
+
+    Args:
+        name: Name of the module.
+        source: Source of the module.
+        modules: Names of all documented modules.
+        package: Whether the module is a package, for its relative imports.
+    """
+    found = set()
+
+    def add(dotted):
+        # Any documented module along the dotted name, e.g. pkg and pkg.sub for pkg.sub.f
+        parts = dotted.split(".")
+        for end in range(1, len(parts) + 1):
+            prefix = ".".join(parts[:end])
+            if prefix in modules:
+                found.add(prefix)
+
+    text = source.decode("utf-8", errors="replace")
+    for match in DOTTED_NAME.finditer(text):
+        add(match.group())
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        tree = ast.Module(body=[], type_ignores=[])
+    here = name if package else name.rpartition(".")[0]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                anchor = here.split(".")[: len(here.split(".")) - node.level + 1]
+                base = ".".join([*anchor, base] if base else anchor)
+            add(base)
+            for alias in node.names:
+                add(f"{base}.{alias.name}")
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                add(alias.name)
+
+    found.discard(name)
+    return found
+
+
+def module_keys(names, sources, direct, context):
+    """Return the cache key of every module.
+
+    Args:
+        names: Names of all documented modules.
+        sources: Source of every module.
+        direct: Modules every module depends on directly.
+        context: Text that changes all keys (arguments, module list, versions).
+    """
+    digests = {name: hashlib.sha256(sources[name]).hexdigest() for name in names}
+    keys = {}
+    for name in names:
+        closure, todo = set(), [name]
+        while todo:
+            for dependency in direct[todo.pop()]:
+                if dependency not in closure and dependency != name:
+                    closure.add(dependency)
+                    todo.append(dependency)
+        digest = hashlib.sha256(context.encode())
+        digest.update(f"{name}:{digests[name]}".encode())
+        for dependency in sorted(closure):
+            digest.update(f"{dependency}:{digests[dependency]}".encode())
+        keys[name] = digest.hexdigest()
+    return keys
+
+
+def build_context(opts, names):
+    """Return the text shared by all keys: versions, options and module list.
+
+    The output directory is left out: it does not change the pages.
+    """
+    options = {k: str(v) for k, v in vars(opts).items() if k != "output_directory"}
+    distributions = sorted(
+        f"{dist.metadata['Name']}=={dist.version}"
+        for dist in importlib.metadata.distributions()
+    )
+    return json.dumps(
+        {
+            "pdoc": pdoc.__version__,
+            "python": sys.version_info[:2],
+            "options": options,
+            "modules": names,
+            "distributions": distributions,
+        }
+    )
+
+
+def public_filter(all_modules):
+    """Return pdoc's test for whether a member belongs in the search index.
+
+    This repeats what ``pdoc.render.search_index`` does, as the test is defined
+    in the module template.
+    """
+    template = pdoc.render.env.get_template("module.html.jinja2")
+    ctx = template.new_context(
+        {"module": pdoc.doc.Module(type(sys)("")), "all_modules": all_modules}
+    )
+    with defuse_unsafe_reprs():
+        for _ in template.root_render_func(ctx):
+            pass
+    return lambda doc: bool(ctx["is_public"](doc).strip())
+
+
+def render_module(name, all_modules, is_public):
+    """Render the page and the search entries of one module."""
+    module = all_modules[name]
+    page = pdoc.render.html_module(module, all_modules)
+    entries = []
+    if pdoc.render.env.globals["search"]:
+        # Like pdoc.render.search_index, which makes the index of all modules at once
+        with defuse_unsafe_reprs():
+            entries = pdoc.search.make_index(
+                {name: module}, is_public, pdoc.render.env.globals["docformat"]
+            )
+    return page, entries
+
+
+def write(output, name, page):
+    """Write the page of a module where pdoc puts it."""
+    path = output / f"{name.replace('.', '/')}.html"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(page.encode())
+
+
+def render_share(argv, path, names, share):
+    """Render a share of the modules, in a worker process.
+
+    Args:
+        argv: The pdoc arguments, to configure the renderer as in the parent.
+        path: The parent's ``sys.path``, which pdoc extended to find the modules.
+        names: Names of all documented modules, for the links between them.
+        share: Names of the modules this worker renders.
+
+    Returns:
+        A dict mapping each module of the share to its page and search entries.
+    """
+    sys.path[:] = path
+    configure(pdoc_parser.parse_args(argv))
+    all_modules = LazyModules(names)
+    is_public = public_filter(all_modules)
+    parts = {}
+    for name in share:
+        page, entries = render_module(name, all_modules, is_public)
+        parts[name] = {"page": page, "entries": entries}
+    return parts
+
+
+def split(names, workers):
+    """Split modules into at most ``workers`` contiguous shares of similar size.
+
+    Neighbouring modules usually belong to the same package and import the same
+    modules, so contiguous shares import less than interleaved ones.
+    """
+    workers = max(1, min(workers, len(names)))
+    size, extra = divmod(len(names), workers)
+    shares, start = [], 0
+    for index in range(workers):
+        end = start + size + (index < extra)
+        shares.append(names[start:end])
+        start = end
+    return [share for share in shares if share]
+
+
+def build(argv, cache_dir=None, workers=1):
+    """Build the documentation, rendering only the modules whose key changed.
+
+    Args:
+        argv: The pdoc arguments, including the output directory (``-o``).
+        cache_dir: Folder of the rendered modules; None renders every module.
+        workers: Number of processes rendering the modules.
+
+    Returns:
+        The names of the modules that were rendered again.
+    """
+    opts = pdoc_parser.parse_args(argv)
+    if not opts.output_directory:
+        raise SystemExit("cradle_pdoc needs an output directory (-o)")
+    configure(opts)
+
+    names = pdoc.extract.walk_specs(opts.modules)
+    cache = None
+    if cache_dir:
+        known = set(names)
+        sources = {name: read_source(name) for name in names}
+        direct = {
+            name: dependencies(name, sources[name], known, is_package(name))
+            for name in names
+        }
+        keys = module_keys(names, sources, direct, build_context(opts, names))
+        cache = Path(cache_dir)
+        cache.mkdir(parents=True, exist_ok=True)
+
+    parts = {}
+    if cache is not None:
+        for name in names:
+            cached = cache / f"{keys[name]}.json"
+            if cached.exists():
+                parts[name] = json.loads(cached.read_text(encoding="utf-8"))
+    stale = [name for name in names if name not in parts]
+
+    all_modules = LazyModules(names)
+    if workers > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [
+                pool.submit(render_share, argv, list(sys.path), names, share)
+                for share in split(stale, workers)
+            ]
+            for job in jobs:
+                parts.update(job.result())
+    elif stale:
+        is_public = public_filter(all_modules)
+        for name in stale:
+            page, entries = render_module(name, all_modules, is_public)
+            parts[name] = {"page": page, "entries": entries}
+
+    entries = []
+    for name in names:
+        write(opts.output_directory, name, parts[name]["page"])
+        entries.extend(parts[name]["entries"])
+
+    if cache is not None:
+        for name in stale:
+            (cache / f"{keys[name]}.json").write_text(
+                json.dumps(parts[name]), encoding="utf-8"
+            )
+        # Drop the cache entries of modules that changed or are gone
+        wanted = {f"{key}.json" for key in keys.values()}
+        for path in cache.glob("*.json"):
+            if path.name not in wanted:
+                path.unlink()
+
+    index = pdoc.render.html_index(all_modules)
+    if index:
+        (opts.output_directory / "index.html").write_bytes(index.encode())
+    if pdoc.render.env.globals["search"]:
+        # One search index over the entries of all modules, in pdoc's order
+        compile_js = Path(
+            pdoc.render.env.get_template("build-search-index.js").filename
+        )
+        search = pdoc.render.env.get_template("search.js.jinja2").render(
+            search_index=pdoc.search.precompile_index(entries, compile_js)
+        )
+        (opts.output_directory / "search.js").write_bytes(search.encode())
+    return stale
+
+
+def main(argv=None):
+    """Build the documentation and report how many modules were rendered."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    args, pdoc_args = parser.parse_known_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    rendered = build(pdoc_args, args.cache_dir, workers)
+    print(f"pdoc: rendered {len(rendered)} changed module(s)")
+    for name in rendered:
+        print(f"  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
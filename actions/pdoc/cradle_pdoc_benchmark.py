@@ -0,0 +1,120 @@
+"""Benchmark parallel pdoc rendering on a synthetic package.
+
+Writes a package with the given number of modules (each with a few documented
+functions and a class importing from its neighbour), then builds its
+documentation with ``cradle_pdoc.py`` in one process and with a pool of worker
+processes, and prints the wall times. Run it in an environment with pdoc::
+
+    python actions/pdoc/cradle_pdoc_benchmark.py --modules 900 --workers 4
+"""
+
+import argparse
+import filecmp
+import os
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODULE = '''"""Synthetic module {index} of the benchmark package."""
+
+from .mod_{previous:04d} import Base{previous} as Parent
+
+
+def function_{index}(x: int, y: float = 1.0) -> float:
+    """Scale `x` by `y`.
+
+    Args:
+        x: A number.
+        y: The factor.
+
+    Returns:
+        The product of x and y.
+    """
+    return x * y
+
+
+class Base{index}(Parent):
+    """A class that extends the class of the previous module."""
+
+    value: int = {index}
+    """A class attribute."""
+
+    def method(self, other: "Base{index}") -> bool:
+        """Compare with `other`."""
+        return self.value == other.value
+'''
+
+
+def write_package(root, modules, name="cradlebench"):
+    """Write a package with the given number of modules and return its folder."""
+    package = os.path.join(root, name)
+    os.makedirs(package, exist_ok=True)
+    with open(os.path.join(package, "__init__.py"), "w", encoding="utf-8") as f:
+        f.write(f'"""Synthetic package with {modules} modules."""\n')
+    with open(os.path.join(package, "mod_0000.py"), "w", encoding="utf-8") as f:
+        f.write('"""First module."""\n\n\nclass Base0:\n    """The root class."""\n')
+    for index in range(1, modules):
+        path = os.path.join(package, f"mod_{index:04d}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(MODULE.format(index=index, previous=index - 1))
+    return package
+
+
+def timed_build(root, output, workers, name="cradlebench"):
+    """Build the documentation with the helper and return the wall time."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([root, HERE])}
+    command = [sys.executable, "-m", "cradle_pdoc", "--workers", str(workers)]
+    start = time.perf_counter()
+    subprocess.run(  # nosec B603
+        [*command, "-o", output, name],
+        check=True,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def same_tree(left, right):
+    """Return whether two folders hold the same files with the same content."""
+    compare = filecmp.dircmp(left, right)
+    if compare.left_only or compare.right_only or compare.funny_files:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(
+        left, right, compare.common_files, shallow=False
+    )
+    return (
+        not mismatch
+        and not errors
+        and all(
+            same_tree(os.path.join(left, d), os.path.join(right, d))
+            for d in compare.common_dirs
+        )
+    )
+
+
+def main(argv=None):
+    """Time a single-process and a parallel build of a synthetic package."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        write_package(root, args.modules)
+        serial = timed_build(root, os.path.join(root, "serial"), 1)
+        parallel = timed_build(root, os.path.join(root, "parallel"), args.workers)
+        same = same_tree(os.path.join(root, "serial"), os.path.join(root, "parallel"))
+
+    print(f"modules:             {args.modules}")
+    print(f"1 process:           {serial:.2f} s")
+    print(f"{args.workers} processes:         {parallel:.2f} s")
+    print(f"speedup:             {serial / parallel:.2f}x")
+    print(f"identical output:    {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Find out whether any configured pre-commit hook runs on Node.js.
+
+The pre-commit action only installs Node when this prints ``node=true``. The
+languages of the hooks of a remote repository are in its
+``.pre-commit-hooks.yaml``, read from pre-commit's own store when the repository
+was cloned before (the store is restored from the cache of pre-commit/action),
+and otherwise fetched at the configured revision with a shallow ``git fetch``.
+Local hooks, and hooks whose language is overridden, have their language in the
+config itself.
+
+Both files are read line by line, as no YAML parser is available before
+pre-commit is installed; this covers the block style all these files use. When
+a manifest cannot be read the answer is ``true``, as installing Node is cheaper
+than a failing hook.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import subprocess  # nosec B404
+import sys
+import tempfile
+
+# "key: value" in a block mapping, possibly as the first key of a list item
+ENTRY = re.compile(r"^\s*(-\s+)?(?P<key>[\w-]+):\s*(?P<value>.*?)\s*$")
+
+# Hook languages that need Node.js on the runner
+NODE_LANGUAGES = {"node"}
+
+
+def scalar(value):
+    """Return a YAML scalar without comment and quotes."""
+    value = re.sub(r"\s+#.*$", "", value).strip()
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "'\"":
+        value = value[1:-1]
+    return value
+
+
+def parse_config(text):
+    """Return the repositories of a config with the hooks used from each.
+
+    Returns:
+        A list of dicts with ``repo``, ``rev`` and ``hooks``, which maps each
+        hook id to the language set in the config (None if not set).
+    """
+    repos, hook = [], None
+    for line in text.splitlines():
+        match = ENTRY.match(line)
+        if not match:
+            continue
+        key, value = match["key"], scalar(match["value"])
+        if key == "repo":
+            repos.append({"repo": value, "rev": "", "hooks": {}})
+            hook = None
+        elif not repos:
+            continue
+        elif key == "rev":
+            repos[-1]["rev"] = value
+        elif key == "id":
+            hook = value
+            repos[-1]["hooks"][hook] = None
+        elif key == "language" and hook is not None:
+            repos[-1]["hooks"][hook] = value
+    return repos
+
+
+def parse_manifest(text):
+    """Return the language of every hook in a ``.pre-commit-hooks.yaml``."""
+    languages, hook = {}, None
+    for line in text.splitlines():
+        match = ENTRY.match(line)
+        if not match:
+            continue
+        if match["key"] == "id":
+            hook = scalar(match["value"])
+            languages[hook] = None
+        elif match["key"] == "language" and hook is not None:
+            languages[hook] = scalar(match["value"])
+    return languages
+
+
+def store_dir():
+    """Return the folder of pre-commit's store, as pre-commit finds it."""
+    if os.environ.get("PRE_COMMIT_HOME"):
+        return os.environ["PRE_COMMIT_HOME"]
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache, "pre-commit")
+
+
+def manifest_from_store(store, repo, rev):
+    """Return the manifest of a repository cloned into the store, or None."""
+    database = os.path.join(store, "db.db")
+    if not os.path.exists(database):
+        return None
+    with sqlite3.connect(database) as connection:
+        row = connection.execute(
+            "SELECT path FROM repos WHERE repo = ? AND ref = ?", (repo, rev)
+        ).fetchone()
+    path = os.path.join(row[0], ".pre-commit-hooks.yaml") if row else ""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def git(*args, cwd):
+    """Run git quietly and return the completed process."""
+    return subprocess.run(  # nosec B603 B607
+        ["git", *args], cwd=cwd, check=False, capture_output=True, text=True
+    )
+
+
+def manifest_from_remote(repo, rev):
+    """Fetch only the revision of a repository and return its manifest, or None."""
+    with tempfile.TemporaryDirectory() as folder:
+        git("init", "-q", cwd=folder)
+        if git("fetch", "-q", "--depth=1", repo, rev, cwd=folder).returncode:
+            return None
+        shown = git("show", "FETCH_HEAD:.pre-commit-hooks.yaml", cwd=folder)
+        return shown.stdout if shown.returncode == 0 else None
+
+
+def needs_node(repos, store, fetch=None):
+    """Return whether a used hook needs Node, and the hooks that do.
+
+    Args:
+        repos: The repositories of the config, from ``parse_config``.
+        store: Folder of pre-commit's store.
+        fetch: Returns the manifest of a repository not in the store
+            (``manifest_from_remote`` if None).
+    """
+    fetch = fetch or manifest_from_remote
+    node, unknown = [], []
+    for entry in repos:
+        languages = dict(entry["hooks"])
+        if entry["repo"] not in ("local", "meta") and None in languages.values():
+            manifest = manifest_from_store(store, entry["repo"], entry["rev"])
+            if manifest is None:
+                manifest = fetch(entry["repo"], entry["rev"])
+            if manifest is None:
+                unknown.append(entry["repo"])
+                continue
+            known = parse_manifest(manifest)
+            for hook, language in languages.items():
+                languages[hook] = language or known.get(hook)
+        node += [
+            hook for hook, language in languages.items() if language in NODE_LANGUAGES
+        ]
+    return bool(node or unknown), node, unknown
+
+
+def main(argv=None):
+    """Print whether Node is needed, as a step output if one is given."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default=".pre-commit-config.yaml")
+    parser.add_argument("--store", default=store_dir())
+    parser.add_argument("--output", default=os.environ.get("GITHUB_OUTPUT"))
+    args = parser.parse_args(argv)
+
+    with open(args.config, encoding="utf-8") as f:
+        repos = parse_config(f.read())
+    node, hooks, unknown = needs_node(repos, args.store)
+
+    for repo in unknown:
+        print(f"::warning::Could not read the hooks of {repo}; installing Node")
+    if hooks:
+        print(f"Hooks running on Node: {', '.join(hooks)}")
+    print(f"node={str(node).lower()}")
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(f"node={str(node).lower()}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Per-step profiling used by the profile hook of the composite actions.
+
+``profile.sh`` calls ``start`` when a bash step begins and ``stop`` when it
+exits. While the step runs, a small background sampler follows the step's
+process tree and keeps the peak resident set size. Each finished step appends
+one JSON line with its wall time, sampled peak RSS and the bytes received over
+the network to ``timings.jsonl`` in the profile folder. ``report`` turns those
+lines into ``timings.json`` and a markdown table for ``$GITHUB_STEP_SUMMARY``.
+
+Memory and network figures come from ``/proc`` and are ``null`` where it is not
+available (e.g. on macOS and Windows runners); wall times are always recorded.
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+
+# How often the sampler looks at the process tree, in seconds
+SAMPLE_INTERVAL = 0.2
+
+
+def profile_dir():
+    """Return the folder the profile records are written to."""
+    default = os.path.join(
+        os.environ.get("RUNNER_TEMP", tempfile.gettempdir()), "cradle-profile"
+    )
+    return os.environ.get("CRADLE_PROFILE_DIR", default)
+
+
+def received_bytes(path="/proc/net/dev"):
+    """Return the bytes received on all non-loopback interfaces, or None."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()[2:]
+    except OSError:
+        return None
+    total = 0
+    for line in lines:
+        interface, _, counters = line.partition(":")
+        if interface.strip() != "lo" and counters.split():
+            total += int(counters.split()[0])
+    return total
+
+
+def process_tree_rss(root_pid, proc="/proc"):
+    """Return the summed resident set size in bytes of a process and its descendants.
+
+    Args:
+        root_pid: Process id at the top of the tree.
+        proc: Mount point of the proc filesystem.
+
+    Returns:
+        The RSS in bytes, or None if /proc is not available.
+    """
+    children = {}
+    rss = {}
+    try:
+        pids = [entry for entry in os.listdir(proc) if entry.isdigit()]
+    except OSError:
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for pid in pids:
+        try:
+            with open(os.path.join(proc, pid, "stat"), encoding="utf-8") as f:
+                # The command name may contain spaces, the fields after it do not
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(pid))
+        rss[int(pid)] = int(fields[21]) * page_size
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+def sample(pid, output):
+    """Record the peak RSS of a process tree until it exits or we are stopped."""
+    peak = 0
+    running = True
+
+    def stop(signum, frame):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    while running:
+        rss = process_tree_rss(pid)
+        if rss is None:
+            break
+        peak = max(peak, rss)
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(str(peak))
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            break
+        time.sleep(SAMPLE_INTERVAL)
+
+
+def start(action, step, pid):
+    """Record the start of a step and launch the RSS sampler.
+
+    Returns:
+        The path of the state file to pass to ``stop``.
+    """
+    folder = profile_dir()
+    os.makedirs(folder, exist_ok=True)
+    fd, state_file = tempfile.mkstemp(prefix="step-", suffix=".json", dir=folder)
+    sampler = subprocess.Popen(  # nosec B603 - runs this very script
+        [
+            sys.executable,
+            __file__,
+            "sample",
+            "--pid",
+            str(pid),
+            "--output",
+            f"{state_file}.rss",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    state = {
+        "action": action,
+        "step": step,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "start": time.monotonic(),
+        "received": received_bytes(),
+        "sampler": sampler.pid,
+    }
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    return state_file
+
+
+def stop(state_file, status):
+    """Finish a step and append its record to ``timings.jsonl``.
+
+    Returns:
+        The record that was written.
+    """
+    with open(state_file, encoding="utf-8") as f:
+        state = json.load(f)
+    wall = time.monotonic() - state["start"]
+    received = received_bytes()
+
+    try:
+        os.kill(state["sampler"], signal.SIGTERM)
+    except OSError:
+        pass
+    # Give the sampler a moment to write its final value
+    time.sleep(0.05)
+    try:
+        with open(f"{state_file}.rss", encoding="utf-8") as f:
+            peak = int(f.read() or 0) or None
+    except (OSError, ValueError):
+        peak = None
+
+    record = {
+        "action": state["action"],
+        "step": state["step"],
+        "started_at": state["started_at"],
+        "wall_seconds": round(wall, 3),
+        "peak_rss_bytes": peak,
+        "downloaded_bytes": (
+            received - state["received"]
+            if received is not None and state["received"] is not None
+            else None
+        ),
+        "exit_status": status,
+    }
+    with open(os.path.join(profile_dir(), "timings.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    for path in (state_file, f"{state_file}.rss"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return record
+
+
+def load_records(folder=None):
+    """Read all step records written so far."""
+    path = os.path.join(folder or profile_dir(), "timings.jsonl")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def format_bytes(value):
+    """Format a byte count for humans, or an em dash when it is unknown."""
+    if value is None:
+        return "—"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def markdown(records):
+    """Render the step records as a markdown table with a total row."""
+    lines = [
+        "### ⏱️ Step timings",
+        "",
+        "| Action | Step | Wall time | Peak RSS | Downloaded | Status |",
+        "|--------|------|----------:|---------:|-----------:|:------:|",
+    ]
+    for record in records:
+        status = "✅" if record["exit_status"] == 0 else f"❌ {record['exit_status']}"
+        lines.append(
+            f"| {record['action']} | {record['step']} "
+            f"| {record['wall_seconds']:.1f} s "
+            f"| {format_bytes(record['peak_rss_bytes'])} "
+            f"| {format_bytes(record['downloaded_bytes'])} | {status} |"
+        )
+    total_wall = sum(record["wall_seconds"] for record in records)
+    downloads = [
+        r["downloaded_bytes"] for r in records if r["downloaded_bytes"] is not None
+    ]
+    lines.append(
+        f"| **Total** | | **{total_wall:.1f} s** | "
+        f"| **{format_bytes(sum(downloads) if downloads else None)}** | |"
+    )
+    return "\n".join(lines) + "\n"
+
+
+def report(output, summary=None):
+    """Write ``timings.json`` and append the markdown table to the step summary."""
+    records = load_records()
+    folder = os.path.dirname(output)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "steps": records,
+                "total_wall_seconds": round(
+                    sum(record["wall_seconds"] for record in records), 3
+                ),
+            },
+            f,
+            indent=2,
+        )
+    if summary:
+        with open(summary, "a", encoding="utf-8") as f:
+            f.write(
+                markdown(records) if records else "No profiled steps were recorded.\n"
+            )
+    return records
+
+
+def main(argv=None):
+    """Run the command line interface used by profile.sh and the profile action."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = commands.add_parser("start", help="record the start of a step")
+    start_parser.add_argument("--action", required=True)
+    start_parser.add_argument("--step", required=True)
+    start_parser.add_argument("--pid", type=int, required=True)
+
+    stop_parser = commands.add_parser("stop", help="record the end of a step")
+    stop_parser.add_argument("--state", required=True)
+    stop_parser.add_argument("--status", type=int, default=0)
+
+    sample_parser = commands.add_parser("sample", help="sample the peak RSS")
+    sample_parser.add_argument("--pid", type=int, required=True)
+    sample_parser.add_argument("--output", required=True)
+
+    report_parser = commands.add_parser("report", help="write the report")
+    report_parser.add_argument("--output", required=True)
+    report_parser.add_argument(
+        "--summary", default=os.environ.get("GITHUB_STEP_SUMMARY")
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "start":
+        print(start(args.action, args.step, args.pid))
+    elif args.command == "stop":
+        stop(args.state, args.status)
+    elif args.command == "sample":
+        sample(args.pid, args.output)
+    else:
+        records = report(args.output, args.summary)
+        print(f"Wrote {len(records)} step timings to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+# Opt-in profiling hook shared by the composite actions in this repository.
+#
+# Source it at the top of a bash step, with a label for the step:
+#   source "$GITHUB_ACTION_PATH/../profile/profile.sh" "uv sync"
+#
+# It does nothing unless CRADLE_PROFILE is 'true'. Otherwise it records the wall
+# time, the sampled peak RSS of the step's processes and the bytes downloaded
+# while the step runs, and appends them to timings.jsonl in CRADLE_PROFILE_DIR
+# (default: $RUNNER_TEMP/cradle-profile) when the step exits.
+# The profile action turns those records into a report.
+
+if [ "${CRADLE_PROFILE:-false}" == "true" ]; then
+  _CRADLE_PROFILE_PY="$(dirname "${BASH_SOURCE[0]}")/cradle_profile.py"
+  _CRADLE_PYTHON="$(command -v python3 || command -v python)"
+  if _CRADLE_PROFILE_STATE=$("$_CRADLE_PYTHON" "$_CRADLE_PROFILE_PY" start \
+      --pid $$ \
+      --action "$(basename "${GITHUB_ACTION_PATH:-unknown}")" \
+      --step "${1:-${GITHUB_ACTION:-step}}"); then
+    # The exit status of the step is kept, a failing report never fails the step
+    trap '"$_CRADLE_PYTHON" "$_CRADLE_PROFILE_PY" stop --state "$_CRADLE_PROFILE_STATE" --status $? || true' EXIT
+  fi
+fi
@@ -0,0 +1,248 @@
+"""Compute the next semantic version tag from the local git history.
+
+The latest release tag (``<prefix>X.Y.Z``) reachable from ``HEAD`` is found by
+trying the tags from the highest version down until one is an ancestor of
+``HEAD``, usually the first. Only the commits after it are read, with one
+``git log``, and classified as conventional commits:
+
+- ``feat`` makes a minor release, ``fix`` and ``perf`` a patch release;
+- a ``!`` after the type or scope, or a ``BREAKING CHANGE:`` footer, a major one;
+- if no commit asks for a release, ``--default-bump`` decides (``false``: none).
+
+The last-tag lookup is cached in a JSON file, with the commit it was made for
+and a digest of all tags. With the same tags and a ``HEAD`` that descends from
+that commit, only tags of a higher version than the cached one are checked.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess  # nosec B404
+import sys
+
+# Types of conventional commits and the release each asks for
+RELEASES = {"feat": "minor", "fix": "patch", "perf": "patch"}
+
+# Order of the release types
+RANK = {None: 0, "patch": 1, "minor": 2, "major": 3}
+
+# First line of a conventional commit: type(scope)!: subject
+HEADER = re.compile(
+    r"^(?P<type>[A-Za-z]+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:\s*(?P<subject>.+)$"
+)
+
+# Footer of a breaking change
+BREAKING = re.compile(r"^BREAKING[ -]CHANGE:", re.MULTILINE)
+
+
+def git(repo, *args):
+    """Run git in a repository and return its output, raising on failure."""
+    result = subprocess.run(  # nosec B603 B607
+        ["git", "-C", repo, *args], check=False, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def parse_version(tag, prefix="v"):
+    """Return the (major, minor, patch) of a release tag, or None for other tags."""
+    match = re.fullmatch(re.escape(prefix) + r"(\d+)\.(\d+)\.(\d+)", tag)
+    return tuple(int(part) for part in match.groups()) if match else None
+
+
+def list_tags(repo, prefix="v"):
+    """Return (version, tag, commit) of all release tags, highest version first."""
+    output = git(
+        repo,
+        "for-each-ref",
+        "--format=%(refname:strip=2)%09%(objectname)%09%(*objectname)",
+        "refs/tags",
+    )
+    tags = []
+    for line in output.splitlines():
+        name, obj, peeled = line.split("\t")
+        version = parse_version(name, prefix)
+        if version:
+            # Annotated tags point to a tag object, which peels to the commit
+            tags.append((version, name, peeled or obj))
+    return sorted(tags, reverse=True)
+
+
+def is_ancestor(repo, commit, head):
+    """Return whether a commit is an ancestor of (or equal to) head."""
+    result = subprocess.run(  # nosec B603 B607
+        ["git", "-C", repo, "merge-base", "--is-ancestor", commit, head],
+        check=False,
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def read_cache(path):
+    """Return the cached last-tag lookup, or an empty dict."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def last_tag(repo, prefix="v", cache=None, head=None):
+    """Return (tag, commit) of the latest release tag reachable from HEAD, or None.
+
+    Args:
+        repo: The git repository.
+        prefix: Prefix of the release tags.
+        cache: JSON file of the last lookup, read and updated (None: no cache).
+        head: The commit to look from (default: HEAD).
+    """
+    head = head or git(repo, "rev-parse", "HEAD").strip()
+    tags = list_tags(repo, prefix)
+    digest = hashlib.sha256(
+        "\n".join(f"{name} {commit}" for _, name, commit in tags).encode()
+    ).hexdigest()
+
+    cached = read_cache(cache) if cache else {}
+    candidates = tags
+    if cached.get("tags") == digest and cached.get("prefix") == prefix:
+        if cached.get("head") == head:
+            return tuple(cached["last"]) if cached.get("last") else None
+        if is_ancestor(repo, cached["head"], head):
+            # Tags reachable from the cached commit still are; only higher ones can win
+            floor = (
+                parse_version(cached["last"][0], prefix) if cached.get("last") else None
+            )
+            candidates = [tag for tag in tags if floor is None or tag[0] > floor]
+            if floor is not None:
+                candidates.append((floor, *cached["last"]))
+
+    found = next(
+        (
+            (name, commit)
+            for _, name, commit in candidates
+            if is_ancestor(repo, commit, head)
+        ),
+        None,
+    )
+    if cache:
+        os.makedirs(os.path.dirname(os.path.abspath(cache)), exist_ok=True)
+        with open(cache, "w", encoding="utf-8") as f:
+            json.dump(
+                {"head": head, "tags": digest, "prefix": prefix, "last": found}, f
+            )
+    return found
+
+
+def commits_since(repo, commit, head="HEAD"):
+    """Return (sha, message) of the commits after a commit up to head (all if None)."""
+    revisions = f"{commit}..{head}" if commit else head
+    output = git(repo, "log", "--format=%H%x1f%B%x1e", revisions)
+    commits = []
+    for record in output.split("\x1e"):
+        if "\x1f" in record:
+            sha, message = record.strip("\n").split("\x1f", 1)
+            commits.append((sha, message.strip()))
+    return commits
+
+
+def classify(message):
+    """Return the release a commit message asks for: major, minor, patch or None."""
+    header = HEADER.match(message.splitlines()[0] if message else "")
+    if header and header["breaking"] or BREAKING.search(message):
+        return "major"
+    if header:
+        return RELEASES.get(header["type"].lower())
+    return None
+
+
+def bump(version, release):
+    """Return the version after a release of the given type."""
+    major, minor, patch = version
+    if release == "major":
+        return (major + 1, 0, 0)
+    if release == "minor":
+        return (major, minor + 1, 0)
+    return (major, minor, patch + 1)
+
+
+def next_tag(repo, prefix="v", default_bump="patch", cache=None):
+    """Compute the next tag from the commits since the latest release tag.
+
+    Returns:
+        A dict with the ``previous_tag``, ``new_tag`` and ``new_version`` (empty
+        when nothing is released), the ``release_type``, the number of
+        ``commits`` read, a markdown ``changelog`` of the conventional commits and
+        the ``sha`` of the commit the version was computed for, which is the
+        commit to tag.
+    """
+    head = git(repo, "rev-parse", "HEAD").strip()
+    found = last_tag(repo, prefix, cache, head)
+    previous, commit = found or ("", None)
+    commits = commits_since(repo, commit, head)
+
+    release, lines = None, []
+    for sha, message in commits:
+        kind = classify(message)
+        if RANK[kind] > RANK[release]:
+            release = kind
+        if HEADER.match(message.splitlines()[0] if message else ""):
+            lines.append(f"- {message.splitlines()[0]} ({sha[:7]})")
+    if release is None and commits and default_bump != "false":
+        release = default_bump
+
+    result = {
+        "previous_tag": previous,
+        "new_tag": "",
+        "new_version": "",
+        "release_type": release or "",
+        "commits": len(commits),
+        "changelog": "\n".join(lines),
+        "sha": head,
+    }
+    if release:
+        version = parse_version(previous, prefix) if previous else (0, 0, 0)
+        result["new_version"] = ".".join(str(part) for part in bump(version, release))
+        result["new_tag"] = f"{prefix}{result['new_version']}"
+    return result
+
+
+def main(argv=None):
+    """Print the next tag and write it as step outputs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=".")
+    parser.add_argument("--prefix", default="v")
+    parser.add_argument(
+        "--default-bump", choices=["major", "minor", "patch", "false"], default="patch"
+    )
+    parser.add_argument("--cache", default=None)
+    parser.add_argument("--output", default=os.environ.get("GITHUB_OUTPUT"))
+    args = parser.parse_args(argv)
+
+    result = next_tag(args.repo, args.prefix, args.default_bump, args.cache)
+    print(
+        f"{result['commits']} commit(s) since {result['previous_tag'] or 'the first commit'}: "
+        f"{result['release_type'] or 'no'} release {result['new_tag']}".rstrip()
+    )
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.writelines(
+                f"{key}={result[key]}\n"
+                for key in (
+                    "previous_tag",
+                    "new_tag",
+                    "new_version",
+                    "release_type",
+                    "sha",
+                )
+            )
+            f.write(
+                f"changelog<<CRADLE_CHANGELOG\n{result['changelog']}\nCRADLE_CHANGELOG\n"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
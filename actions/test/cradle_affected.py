@@ -0,0 +1,194 @@
+"""Test impact analysis for the test action.
+
+On the default branch the tests run with ``--cov-context=test`` and ``map``
+turns the recorded coverage data into a JSON map from every measured file to
+the tests that executed it. On pull requests ``check`` decides from the files
+changed against the base ref whether the whole suite has to run, and the
+``cradle_pytest`` plugin then only keeps the tests that touch a changed file.
+
+The map has two keys: ``files`` maps each file (relative to the repository
+root, with forward slashes) to the node ids of the tests that executed it, and
+``tests`` lists every test that was recorded. Tests missing from the map (new
+tests, or tests recorded in another shard) are always run.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+from collections import defaultdict
+
+# Changes to these files can affect any test, so they trigger a full run
+DEFAULT_FULL_RUN_PATTERNS = (
+    "conftest.py",
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "pytest.ini",
+    "tox.ini",
+    ".coveragerc",
+    "uv.lock",
+    "requirements*.txt",
+    ".python-version",
+)
+
+
+def build_map(data_file, root="."):
+    """Build the file-to-tests map from a coverage data file with test contexts.
+
+    Args:
+        data_file: Path to a coverage data file recorded with ``--cov-context=test``.
+        root: Folder the file paths in the map are made relative to.
+
+    Returns:
+        The test impact map as a dict with ``files`` and ``tests`` keys.
+    """
+    # Only needed on the default branch, where pytest-cov is installed anyway
+    from coverage import CoverageData
+
+    data = CoverageData(basename=data_file)
+    data.read()
+
+    files = defaultdict(set)
+    for filename in data.measured_files():
+        path = os.path.relpath(filename, root).replace(os.sep, "/")
+        for contexts in data.contexts_by_lineno(filename).values():
+            for context in contexts:
+                # pytest-cov names contexts "<nodeid>|setup", "<nodeid>|run", ...
+                nodeid = context.rsplit("|", 1)[0]
+                if nodeid:
+                    files[path].add(nodeid)
+
+    return {
+        "files": {path: sorted(nodeids) for path, nodeids in sorted(files.items())},
+        "tests": sorted(set().union(*files.values())),
+    }
+
+
+def load_map(path):
+    """Read a test impact map, returning an empty map if it is missing or broken."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}, "tests": []}
+    if not isinstance(data, dict):
+        return {"files": {}, "tests": []}
+    return {"files": data.get("files", {}), "tests": data.get("tests", [])}
+
+
+def read_changed(path):
+    """Read the changed files, one path per line, ignoring blank lines."""
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def full_run_reason(changed, test_map, patterns=DEFAULT_FULL_RUN_PATTERNS):
+    """Explain why the whole suite has to run, if it has to.
+
+    A changed file that is missing from the map also triggers a full run: the
+    map has no evidence of which tests it affects. This covers data files, test
+    helpers and source files whose only recorded lines run at import or
+    collection time, which coverage attributes to no test. Only files with
+    recorded tests are exempt, as a change to them selects their own tests.
+
+    Args:
+        changed: Paths of the changed files, relative to the repository root.
+        test_map: The test impact map.
+        patterns: Glob patterns (matched against the path and the file name)
+            of files whose change triggers a full run.
+
+    Returns:
+        A short reason for a full run, or None if only affected tests need to run.
+    """
+    if not test_map["tests"]:
+        return "no test impact map is available"
+    for path in sorted(changed):
+        name = path.rsplit("/", 1)[-1]
+        for pattern in patterns:
+            if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern):
+                return f"{path} matches {pattern}"
+    test_files = {nodeid.split("::", 1)[0] for nodeid in test_map["tests"]}
+    for path in sorted(changed):
+        if path not in test_map["files"] and path not in test_files:
+            return f"{path} is not in the test impact map"
+    return None
+
+
+def affected(nodeids, changed, test_map):
+    """Return the tests that have to run for the given changes.
+
+    A test runs if it executed a changed file, if it lives in a changed file or
+    if it is missing from the map, so nothing is skipped without evidence.
+
+    Args:
+        nodeids: Node ids of the collected tests.
+        changed: Paths of the changed files, relative to the repository root.
+        test_map: The test impact map.
+
+    Returns:
+        The set of node ids to run.
+    """
+    known = set(test_map["tests"])
+    impacted = {
+        nodeid for path in changed for nodeid in test_map["files"].get(path, ())
+    }
+    return {
+        nodeid
+        for nodeid in nodeids
+        if nodeid in impacted
+        or nodeid.split("::", 1)[0] in changed
+        or nodeid not in known
+    }
+
+
+def main(argv=None):
+    """Run the command line interface used by the test action."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    map_parser = commands.add_parser("map", help="build the test impact map")
+    map_parser.add_argument("--data-file", required=True)
+    map_parser.add_argument("--output", required=True)
+
+    check_parser = commands.add_parser(
+        "check", help="print 'all' or 'affected' for the changed files"
+    )
+    check_parser.add_argument("--map", required=True)
+    check_parser.add_argument("--changed", required=True)
+    check_parser.add_argument(
+        "--full-run-patterns",
+        default="",
+        help="extra patterns, separated by newlines, commas or spaces",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "map":
+        test_map = build_map(args.data_file)
+        folder = os.path.dirname(args.output)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(test_map, f, indent=2)
+        print(
+            f"Mapped {len(test_map['files'])} files to {len(test_map['tests'])} tests",
+            file=sys.stderr,
+        )
+        return 0
+
+    patterns = DEFAULT_FULL_RUN_PATTERNS + tuple(
+        args.full_run_patterns.replace(",", " ").split()
+    )
+    reason = full_run_reason(read_changed(args.changed), load_map(args.map), patterns)
+    if reason:
+        print(f"Running the whole suite: {reason}", file=sys.stderr)
+        print("all")
+    else:
+        print("affected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
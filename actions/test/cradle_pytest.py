@@ -0,0 +1,155 @@
+"""Pytest plugin used by the test and coverage actions to split a suite into shards.
+
+The actions load the plugin with ``-p cradle_pytest`` after putting this folder
+on ``PYTHONPATH``. Every collected test is assigned to exactly one shard. By
+default the shard comes from a stable hash of the test's node id, so the split
+does not depend on collection order, on the number of xdist workers or on the
+machine, and a test only ever moves to another shard when its node id changes.
+
+With ``--timings-file`` the durations recorded by a previous run are used to
+balance the shards instead (see ``cradle_timings``), and the durations measured
+in this run are merged back into the same file when the session finishes. With
+``--timings-output`` they are written to that file on their own instead, so the
+durations of every shard can be merged once all shards are done.
+
+With ``--impact-map`` and ``--changed-files`` only the tests affected by the
+changed files are kept (see ``cradle_affected``). Shards are always computed
+from the full suite first, so both options can be combined.
+"""
+
+import zlib
+from collections import defaultdict
+
+import cradle_affected
+import cradle_timings
+import pytest
+
+
+def pytest_addoption(parser):
+    """Register the sharding options."""
+    group = parser.getgroup("cradle", "test sharding for the cradle actions")
+    group.addoption(
+        "--shard-index",
+        type=int,
+        default=0,
+        help="Zero-based index of the shard to run (default: 0)",
+    )
+    group.addoption(
+        "--shard-total",
+        type=int,
+        default=1,
+        help="Total number of shards the suite is split into (default: 1)",
+    )
+    group.addoption(
+        "--timings-file",
+        default=None,
+        help="JSON file of per-test durations used to balance the shards "
+        "and updated with the durations of this run",
+    )
+    group.addoption(
+        "--timings-output",
+        default=None,
+        help="JSON file the durations of this run are written to on their own, "
+        "instead of updating --timings-file",
+    )
+    group.addoption(
+        "--impact-map",
+        default=None,
+        help="JSON test impact map; with --changed-files only affected tests run",
+    )
+    group.addoption(
+        "--changed-files",
+        default=None,
+        help="File listing the changed files, one path per line",
+    )
+
+
+def pytest_configure(config):
+    """Validate the options and start recording durations if asked to."""
+    index = config.getoption("shard_index")
+    total = config.getoption("shard_total")
+    if total < 1:
+        raise pytest.UsageError(f"--shard-total must be at least 1, got {total}")
+    if not 0 <= index < total:
+        raise pytest.UsageError(
+            f"--shard-index must be between 0 and {total - 1}, got {index}"
+        )
+    if bool(config.getoption("impact_map")) != bool(config.getoption("changed_files")):
+        raise pytest.UsageError("--impact-map and --changed-files go together")
+
+    # Only the controller writes the file, xdist workers send it their reports
+    path = config.getoption("timings_file")
+    output = config.getoption("timings_output")
+    if (path or output) and not hasattr(config, "workerinput"):
+        recorder = TimingsRecorder(output or path, merge=not output)
+        config.pluginmanager.register(recorder, "cradle-timings")
+
+
+def shard_of(nodeid, total):
+    """Return the shard a test belongs to when no durations are known.
+
+    Args:
+        nodeid: The pytest node id of the test.
+        total: The total number of shards.
+
+    Returns:
+        The zero-based shard index for the test.
+    """
+    return zlib.crc32(nodeid.encode("utf-8")) % total
+
+
+def pytest_collection_modifyitems(config, items):
+    """Deselect every test outside the requested shard or unaffected by the changes."""
+    keep = {item.nodeid for item in items}
+
+    index = config.getoption("shard_index")
+    total = config.getoption("shard_total")
+    if total > 1:
+        path = config.getoption("timings_file")
+        durations = cradle_timings.load(path) if path else {}
+        if durations:
+            assignment = cradle_timings.assign(list(keep), durations, total)
+        else:
+            assignment = {nodeid: shard_of(nodeid, total) for nodeid in keep}
+        keep = {nodeid for nodeid in keep if assignment[nodeid] == index}
+
+    if config.getoption("impact_map"):
+        keep = cradle_affected.affected(
+            keep,
+            cradle_affected.read_changed(config.getoption("changed_files")),
+            cradle_affected.load_map(config.getoption("impact_map")),
+        )
+
+    selected = [item for item in items if item.nodeid in keep]
+    deselected = [item for item in items if item.nodeid not in keep]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Do not fail a shard or an affected-only run that has nothing to run."""
+    config = session.config
+    selecting = config.getoption("shard_total") > 1 or config.getoption("impact_map")
+    if exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED and selecting:
+        session.exitstatus = pytest.ExitCode.OK
+
+
+class TimingsRecorder:
+    """Collect the duration of every test and write or merge them into a file."""
+
+    def __init__(self, path, merge=True):
+        """Initialize the recorder for the given timings file."""
+        self.path = path
+        self.merge = merge
+        self.durations = defaultdict(float)
+
+    def pytest_runtest_logreport(self, report):
+        """Add the duration of a setup, call or teardown phase to its test."""
+        self.durations[report.nodeid] += report.duration
+
+    def pytest_sessionfinish(self, session):
+        """Write the measured durations, merged into the file unless asked not to."""
+        durations = cradle_timings.load(self.path) if self.merge else {}
+        durations.update(self.durations)
+        cradle_timings.save(self.path, durations)
@@ -0,0 +1,146 @@
+"""Duration-balanced sharding for the test and coverage actions.
+
+Per-test durations recorded by a previous run are used to bin-pack the tests
+into shards with the greedy longest-processing-time-first (LPT) rule: the
+slowest test goes first, and every test goes to the shard with the least work
+so far. Tests without a recorded duration (e.g. new ones) are assumed to take
+the median of the known durations.
+
+The result only depends on the collected node ids and the timings file, so all
+shards of a run that see the same timings agree on the split.
+
+Run as a script, the module merges timings files: the snapshot of the base
+commit with the durations every shard measured, so the snapshot saved for a
+commit covers the whole suite and not just one shard.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import statistics
+import sys
+
+# Assumed duration (in seconds) when no test has a recorded duration at all
+DEFAULT_DURATION = 1.0
+
+
+def load(path):
+    """Read recorded durations from a JSON file.
+
+    Args:
+        path: Path to a JSON file mapping node ids to durations in seconds.
+
+    Returns:
+        The durations, or an empty dict if the file is missing or unreadable.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        nodeid: float(duration)
+        for nodeid, duration in data.items()
+        if isinstance(duration, (int, float)) and duration >= 0
+    }
+
+
+def save(path, durations):
+    """Write durations to a JSON file, creating its folder if needed.
+
+    Args:
+        path: Path of the JSON file to write.
+        durations: Mapping of node ids to durations in seconds.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(durations.items())), f, indent=2)
+        f.write("\n")
+
+
+def merge(paths):
+    """Merge timings files, a later file winning for a test in several files.
+
+    Args:
+        paths: Paths of JSON timings files; missing or unreadable ones are skipped.
+
+    Returns:
+        A dict mapping node ids to durations in seconds.
+    """
+    durations = {}
+    for path in paths:
+        durations.update(load(path))
+    return durations
+
+
+def estimate(nodeids, durations):
+    """Return a duration for every test, filling in the missing ones.
+
+    Args:
+        nodeids: Node ids of the collected tests.
+        durations: Recorded durations, possibly for other or fewer tests.
+
+    Returns:
+        A dict mapping each node id to its recorded or estimated duration.
+    """
+    known = [durations[nodeid] for nodeid in nodeids if nodeid in durations]
+    fallback = statistics.median(known) if known else DEFAULT_DURATION
+    return {nodeid: durations.get(nodeid, fallback) for nodeid in nodeids}
+
+
+def pack(durations, total):
+    """Bin-pack tests into shards, longest processing time first.
+
+    Args:
+        durations: Mapping of node ids to durations in seconds.
+        total: The number of shards.
+
+    Returns:
+        A list of ``total`` lists of node ids, one per shard.
+    """
+    shards = [[] for _ in range(total)]
+    # (load, index) pairs: ties are broken by the lower shard index
+    loads = [(0.0, index) for index in range(total)]
+    # Slowest first, ties broken by node id so the order never depends on input order
+    for nodeid in sorted(durations, key=lambda n: (-durations[n], n)):
+        load_, index = heapq.heappop(loads)
+        shards[index].append(nodeid)
+        heapq.heappush(loads, (load_ + durations[nodeid], index))
+    return shards
+
+
+def assign(nodeids, durations, total):
+    """Map every test to its shard, using recorded durations where available.
+
+    Args:
+        nodeids: Node ids of the collected tests.
+        durations: Recorded durations, possibly for other or fewer tests.
+        total: The number of shards.
+
+    Returns:
+        A dict mapping each node id to its zero-based shard index.
+    """
+    shards = pack(estimate(nodeids, durations), total)
+    return {nodeid: index for index, shard in enumerate(shards) for nodeid in shard}
+
+
+def main(argv=None):
+    """Merge timings files into one, as the test and coverage actions do."""
+    parser = argparse.ArgumentParser(description="Merge per-test timings files")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("files", nargs="*", help="timings files, later ones win")
+    args = parser.parse_args(argv)
+
+    durations = merge(args.files)
+    save(args.output, durations)
+    print(f"Merged {len(durations)} test duration(s) into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
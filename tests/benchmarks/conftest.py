@@ -0,0 +1,227 @@
+"""Fixtures for the benchmarks of the actions.
+
+The benchmarks run the bash steps of the actions with the local runner
+(the ``runner`` fixture of ``tests/conftest.py``) on synthetic projects, offline: uv installs only
+from a local package index, a folder of wheels (``--find-links``) that is
+downloaded once. ``CRADLE_BENCHMARK_WHEELHOUSE`` points to an existing folder of
+wheels; by default ``_tests/benchmarks/wheelhouse`` is used, and filled with
+``uvx pip download`` when it is empty. ``CRADLE_BENCHMARK_ROUNDS`` sets the
+number of rounds of every benchmark (default 3).
+
+The projects reuse the synthetic package of the pdoc benchmark
+(``actions/pdoc/cradle_pdoc_benchmark.py``): a chain of modules, each with a
+documented function and a class extending the class of the module before it.
+"""
+
+import importlib.util
+import os
+import shutil
+import subprocess  # nosec B404
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# What the actions install with uv, downloaded into the local package index
+REQUIREMENTS = [
+    "pytest",
+    "pytest-cov",
+    "pytest-html",
+    "pytest-random-order",
+    "pdoc",
+    "deptry",
+]
+
+# Rounds per benchmark, each a full run of the action
+ROUNDS = int(os.environ.get("CRADLE_BENCHMARK_ROUNDS", "3"))
+
+# Tests per test file of a synthetic project
+TESTS_PER_FILE = 50
+
+PYPROJECT = """\
+[project]
+name = "cradlebench"
+version = "0.1.0"
+requires-python = ">={python}"
+dependencies = []
+
+[dependency-groups]
+dev = ["pytest"]
+
+[tool.uv]
+package = false
+
+[tool.pytest.ini_options]
+pythonpath = ["src"]
+"""
+
+TEST_FILE = '''"""Tests of the synthetic package, part {part}."""
+
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize("index", {indices})
+def test_function(index):
+    """Test that the function of a module scales its argument."""
+    module = importlib.import_module(f"cradlebench.mod_{{index:04d}}")
+    assert getattr(module, f"function_{{index}}")(index, 2.0) == 2.0 * index
+'''
+
+
+def load(name, path):
+    """Import a Python file of this repository as a module."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def python_version():
+    """Return the version of this Python, which the projects use."""
+    return f"{sys.version_info.major}.{sys.version_info.minor}"
+
+
+@pytest.fixture(scope="session")
+def package_index(python_version):
+    """Return a folder of wheels for everything the actions install."""
+    if not shutil.which("uv"):
+        pytest.skip("uv is needed to run the actions")
+    folder = os.environ.get(
+        "CRADLE_BENCHMARK_WHEELHOUSE",
+        os.path.join(REPO, "_tests", "benchmarks", "wheelhouse"),
+    )
+    os.makedirs(folder, exist_ok=True)
+    if not any(name.endswith(".whl") for name in os.listdir(folder)):
+        result = subprocess.run(  # nosec B603 B607
+            [
+                "uvx",
+                "pip",
+                "download",
+                "--dest",
+                folder,
+                "--only-binary=:all:",
+                "--python-version",
+                python_version,
+                *REQUIREMENTS,
+            ],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            pytest.skip(f"Could not fill the local package index:\n{result.stderr}")
+    return folder
+
+
+@pytest.fixture(scope="session")
+def offline_env(package_index, tmp_path_factory):
+    """Return the environment that keeps uv on the local package index."""
+    home = tmp_path_factory.mktemp("home")
+    return {
+        "HOME": str(home),
+        "UV_NO_INDEX": "1",
+        "UV_FIND_LINKS": package_index,
+        "UV_PYTHON_DOWNLOADS": "never",
+        "UV_CACHE_DIR": str(home / ".cache" / "uv"),
+        # The projects use this Python, which uv finds first on the PATH
+        "PATH": os.pathsep.join(
+            [os.path.dirname(sys.executable), os.environ.get("PATH", "")]
+        ),
+    }
+
+
+def write_project(root, modules, tests, python_version):
+    """Write a project with a package of ``modules`` modules and ``tests`` tests."""
+    benchmark = load(
+        "cradle_pdoc_benchmark",
+        os.path.join(REPO, "actions", "pdoc", "cradle_pdoc_benchmark.py"),
+    )
+    os.makedirs(os.path.join(root, "src"), exist_ok=True)
+    package = benchmark.write_package(os.path.join(root, "src"), modules)
+    # Importing the modules in order keeps the chain of imports from nesting deeply
+    names = ", ".join(f"mod_{index:04d}" for index in range(modules))
+    with open(os.path.join(package, "__init__.py"), "a", encoding="utf-8") as f:
+        f.write(f"\nfrom . import {names}  # noqa: F401\n")
+    with open(os.path.join(root, "pyproject.toml"), "w", encoding="utf-8") as f:
+        f.write(PYPROJECT.format(python=python_version))
+
+    os.makedirs(os.path.join(root, "tests"), exist_ok=True)
+    for part in range(-(-tests // TESTS_PER_FILE)):
+        count = min(TESTS_PER_FILE, tests - part * TESTS_PER_FILE)
+        indices = [
+            1 + (part * TESTS_PER_FILE + i) % (modules - 1) for i in range(count)
+        ]
+        path = os.path.join(root, "tests", f"test_part_{part:04d}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(TEST_FILE.format(part=part, indices=indices))
+    return root
+
+
+@pytest.fixture(scope="session")
+def project(tmp_path_factory, python_version, runner, offline_env):
+    """Return a function that returns a synthetic project with its environment.
+
+    Projects are written and set up with the environment action once per size.
+    """
+    projects = {}
+
+    def _project(modules, tests):
+        if (modules, tests) not in projects:
+            root = tmp_path_factory.mktemp(f"project-{modules}-{tests}")
+            write_project(str(root), modules, tests, python_version)
+            run = runner.run_action(
+                os.path.join(REPO, "actions", "environment"),
+                root,
+                inputs={"python-version": python_version},
+                env=offline_env,
+            )
+            if run["status"] != "success":
+                pytest.fail(failure_log(run))
+            projects[modules, tests] = root
+        return projects[modules, tests]
+
+    return _project
+
+
+def failure_log(run):
+    """Return the log of the failed steps of a run."""
+    return "\n".join(
+        f"{step['name']}:\n{step['log']}"
+        for step in run["steps"]
+        if step["status"] == "failure"
+    )
+
+
+@pytest.fixture
+def measure(benchmark, runner):
+    """Return a function that benchmarks one action on a project.
+
+    Every round is a full run of the action; the paths in ``clean`` are removed
+    before each round.
+    """
+
+    def _measure(action, workspace, inputs, env, clean=()):
+        def setup():
+            for path in clean:
+                shutil.rmtree(os.path.join(workspace, path), ignore_errors=True)
+
+        def run():
+            result = runner.run_action(
+                os.path.join(REPO, "actions", action), workspace, inputs=inputs, env=env
+            )
+            assert result["status"] == "success", failure_log(result)
+            return result
+
+        result = benchmark.pedantic(run, setup=setup, rounds=ROUNDS, iterations=1)
+        benchmark.extra_info["steps"] = {
+            step["name"]: step["seconds"]
+            for step in result["steps"]
+            if step["kind"] == "run"
+        }
+        return result
+
+    return _measure
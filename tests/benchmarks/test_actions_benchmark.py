@@ -0,0 +1,63 @@
+"""Benchmarks of the environment, test, coverage, pdoc and deptry actions.
+
+Every benchmark runs the bash steps of one action end to end with the local
+runner, on synthetic projects of increasing size, with uv installing from the
+local package index only. The ``uses:`` steps (checkout, setup-uv, caches and
+uploads) do nothing. The wall time of every step of the last round is kept in
+the ``extra_info`` of the benchmark.
+
+Run them with ``make benchmark``, which writes the JSON results and histograms
+to ``_tests/benchmarks``. ``CRADLE_BENCHMARK_ROUNDS`` sets the number of rounds.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# Sizes of the synthetic projects
+MODULES = [10, 100, 1000]
+TESTS = [100, 5000]
+
+
+@pytest.mark.benchmark(group="environment")
+@pytest.mark.parametrize("modules", MODULES)
+def test_environment(measure, project, offline_env, python_version, modules):
+    """Create the virtual environment of a project from its lockfile."""
+    root = project(modules, TESTS[0])
+    inputs = {"python-version": python_version}
+    measure("environment", root, inputs, offline_env, [".venv"])
+
+
+@pytest.mark.benchmark(group="test")
+@pytest.mark.parametrize("tests", TESTS)
+def test_test(measure, project, offline_env, tests):
+    """Run the test suite of a project."""
+    root = project(MODULES[1], tests)
+    measure("test", root, {"tests-folder": "tests"}, offline_env)
+
+
+@pytest.mark.benchmark(group="coverage")
+@pytest.mark.parametrize("tests", TESTS)
+def test_coverage(measure, project, offline_env, tests):
+    """Run the test suite with coverage and write all reports."""
+    root = project(MODULES[1], tests)
+    inputs = {"tests-folder": "tests", "source-folder": "src/cradlebench"}
+    measure("coverage", root, inputs, offline_env, ["artifacts"])
+
+
+@pytest.mark.benchmark(group="pdoc")
+@pytest.mark.parametrize("modules", MODULES)
+def test_pdoc(measure, project, offline_env, modules):
+    """Build the documentation of every module of a project."""
+    root = project(modules, TESTS[0])
+    inputs = {"source-folder": "src/cradlebench", "incremental": "false"}
+    measure("pdoc", root, inputs, offline_env, ["artifacts"])
+
+
+@pytest.mark.benchmark(group="deptry")
+@pytest.mark.parametrize("modules", MODULES)
+def test_deptry(measure, project, offline_env, modules):
+    """Check the dependencies of a project."""
+    root = project(modules, TESTS[0])
+    inputs = {"source-folder": "src", "incremental": "false"}
+    measure("deptry", root, inputs, offline_env)
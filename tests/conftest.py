@@ -0,0 +1,21 @@
+"""Pytest fixtures shared by the tests, benchmarks and stress tests of the actions.
+
+This module provides the local runner for composite actions
+(``tests/cradle_runner.py``) to every test folder.
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """Return the local runner for composite actions (tests/cradle_runner.py)."""
+    spec = importlib.util.spec_from_file_location(
+        "cradle_runner", os.path.join(os.path.dirname(__file__), "cradle_runner.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
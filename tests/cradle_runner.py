@@ -0,0 +1,670 @@
+"""Run a composite action of this repository locally, without GitHub.
+
+The runner loads ``actions/<name>/action.yml`` and runs its steps one after the
+other against a project folder, the way the GitHub runner does:
+
+- ``${{ ... }}`` expressions in ``run``, ``env``, ``with``, ``if``,
+  ``working-directory`` and the action outputs are evaluated against the
+  ``inputs``, ``steps``, ``github``, ``runner`` and ``env`` contexts;
+- every step gets fresh ``GITHUB_OUTPUT`` and shares ``GITHUB_ENV``,
+  ``GITHUB_PATH`` and ``GITHUB_STEP_SUMMARY`` files, which are read back after
+  the step as the runner does;
+- a failing step skips the steps after it, unless their ``if`` asks for
+  ``always()`` or ``failure()``.
+
+Steps with ``uses:`` are replaced by stubs: ``stubs`` maps the action (with or
+without ``@version``), a step id or a step name to None (do nothing), a bash
+script (which sees the ``with`` values as ``INPUT_<NAME>``) or a function of the
+``with`` values and the environment that returns the step outputs. The same keys
+also replace ``run`` steps, e.g. one that needs the network. Unmatched ``uses``
+steps do nothing.
+
+The wall time of every step is measured. From the command line::
+
+    python tests/cradle_runner.py actions/deptry --workspace ../project \\
+        --input source-folder=src --stub "Run Deptry=echo skipped"
+
+prints a table of the steps with their status and wall time (``--json`` writes
+the results to a file).
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+
+import yaml
+
+# A ${{ ... }} expression in a string
+EXPRESSION = re.compile(r"\$\{\{(.*?)\}\}", re.DOTALL)
+
+# Tokens of the expression language
+TOKEN = re.compile(
+    r"\s*(?:(?P<string>'(?:[^']|'')*')"
+    r"|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<op>==|!=|<=|>=|&&|\|\||[!<>()\[\].,])"
+    r"|(?P<ident>[A-Za-z_][\w-]*))"
+)
+
+# Status functions, which stop the implicit success() of an if condition
+STATUS_FUNCTION = re.compile(r"\b(success|always|failure|cancelled)\s*\(")
+
+# How the runner calls a script for each shell
+SHELLS = {
+    "bash": ["bash", "--noprofile", "--norc", "-eo", "pipefail"],
+    "sh": ["sh", "-e"],
+    "python": [sys.executable],
+}
+
+
+def truthy(value):
+    """Return whether a value is true in an expression."""
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return value not in (None, False, 0, "")
+
+
+def to_number(value):
+    """Convert a value to a number, as comparisons of different types do."""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip() or 0)
+        except ValueError:
+            return float("nan")
+    return float("nan")
+
+
+def to_string(value):
+    """Convert a value to the text it is replaced with in a string."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, indent=2)
+    return str(value)
+
+
+def compare(left, op, right):
+    """Compare two values, loosely typed and case-insensitive like GitHub."""
+    if isinstance(left, str) and isinstance(right, str):
+        left, right = left.lower(), right.lower()
+    elif type(left) is not type(right):
+        left, right = to_number(left), to_number(right)
+    if op == "==":
+        return left == right
+    if op == "!=":
+        return left != right
+    try:
+        return {
+            "<": left < right,
+            "<=": left <= right,
+            ">": left > right,
+            ">=": left >= right,
+        }[op]
+    except TypeError:
+        return False
+
+
+def hash_files(workspace, patterns):
+    """Return the hash of the files matching the globs, as hashFiles does."""
+    files = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(workspace, pattern), recursive=True):
+            if os.path.isfile(path):
+                files.add(path)
+    if not files:
+        return ""
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class Expression:
+    """Evaluate one expression of the GitHub Actions expression language."""
+
+    def __init__(self, text, contexts, status="success", workspace="."):
+        """Tokenize the expression.
+
+        Args:
+            text: The expression, without ``${{ }}``.
+            contexts: The contexts by name (``inputs``, ``steps``, ``github``, ...).
+            status: ``success`` or ``failure``, for the status functions.
+            workspace: Folder ``hashFiles`` globs are relative to.
+        """
+        self.tokens, position, text = [], 0, text.strip()
+        while position < len(text):
+            match = TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Cannot parse expression at {text[position:]!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match[kind]))
+            position = match.end()
+        self.position = 0
+        self.contexts = contexts
+        self.status = status
+        self.workspace = workspace
+
+    def peek(self):
+        """Return the next token, or (None, None) at the end."""
+        return (
+            self.tokens[self.position]
+            if self.position < len(self.tokens)
+            else (None, None)
+        )
+
+    def take(self, value=None):
+        """Consume the next token, checking its text if given."""
+        kind, text = self.peek()
+        if kind is None or (value is not None and text != value):
+            raise ValueError(f"Expected {value!r} in expression, got {text!r}")
+        self.position += 1
+        return kind, text
+
+    def evaluate(self):
+        """Return the value of the whole expression."""
+        value = self.or_expression()
+        if self.peek()[0] is not None:
+            raise ValueError(f"Unexpected {self.peek()[1]!r} in expression")
+        return value
+
+    def or_expression(self):
+        """Parse ``a || b``, which returns the first truthy operand."""
+        value = self.and_expression()
+        while self.peek() == ("op", "||"):
+            self.take()
+            right = self.and_expression()
+            value = value if truthy(value) else right
+        return value
+
+    def and_expression(self):
+        """Parse ``a && b``, which returns the first falsy operand."""
+        value = self.comparison()
+        while self.peek() == ("op", "&&"):
+            self.take()
+            right = self.comparison()
+            value = right if truthy(value) else value
+        return value
+
+    def comparison(self):
+        """Parse a comparison of two operands."""
+        value = self.unary()
+        kind, text = self.peek()
+        if kind == "op" and text in ("==", "!=", "<", "<=", ">", ">="):
+            self.take()
+            value = compare(value, text, self.unary())
+        return value
+
+    def unary(self):
+        """Parse ``!a``."""
+        if self.peek() == ("op", "!"):
+            self.take()
+            return not truthy(self.unary())
+        return self.postfix()
+
+    def postfix(self):
+        """Parse property access, ``a.b`` and ``a['b']``."""
+        value = self.primary()
+        while self.peek() in (("op", "."), ("op", "[")):
+            if self.take()[1] == ".":
+                key = self.take()[1]
+            else:
+                key = to_string(self.or_expression())
+                self.take("]")
+            value = value.get(key) if isinstance(value, dict) else None
+        return value
+
+    def primary(self):
+        """Parse a literal, a parenthesised expression, a call or a context."""
+        kind, text = self.take()
+        if kind == "string":
+            return text[1:-1].replace("''", "'")
+        if kind == "number":
+            return float(text) if "." in text else int(text)
+        if text == "(":
+            value = self.or_expression()
+            self.take(")")
+            return value
+        if kind != "ident":
+            raise ValueError(f"Unexpected {text!r} in expression")
+        if text in ("true", "false"):
+            return text == "true"
+        if text == "null":
+            return None
+        if self.peek() == ("op", "("):
+            self.take()
+            args = []
+            while self.peek() != ("op", ")"):
+                args.append(self.or_expression())
+                if self.peek() == ("op", ","):
+                    self.take()
+            self.take(")")
+            return self.call(text, args)
+        return self.contexts.get(text)
+
+    def call(self, name, args):
+        """Call a function of the expression language."""
+        name = name.lower()
+        if name == "success":
+            return self.status == "success"
+        if name == "failure":
+            return self.status == "failure"
+        if name == "always":
+            return True
+        if name == "cancelled":
+            return False
+        if name == "contains":
+            haystack, needle = args
+            if isinstance(haystack, list):
+                return any(compare(item, "==", needle) for item in haystack)
+            return to_string(needle).lower() in to_string(haystack).lower()
+        if name == "startswith":
+            return to_string(args[0]).lower().startswith(to_string(args[1]).lower())
+        if name == "endswith":
+            return to_string(args[0]).lower().endswith(to_string(args[1]).lower())
+        if name == "format":
+            return (
+                re.sub(
+                    r"\{(\d+)\}",
+                    lambda m: to_string(args[1 + int(m[1])]),
+                    to_string(args[0]),
+                )
+                .replace("{{", "{")
+                .replace("}}", "}")
+            )
+        if name == "join":
+            separator = to_string(args[1]) if len(args) > 1 else ","
+            items = args[0] if isinstance(args[0], list) else [args[0]]
+            return separator.join(to_string(item) for item in items)
+        if name == "tojson":
+            return json.dumps(args[0], indent=2)
+        if name == "fromjson":
+            return json.loads(to_string(args[0]))
+        if name == "hashfiles":
+            return hash_files(self.workspace, [to_string(arg) for arg in args])
+        raise ValueError(f"Unknown function {name}() in expression")
+
+
+def substitute(value, contexts, status="success", workspace="."):
+    """Replace every ``${{ }}`` in a string (a whole expression keeps its type)."""
+    if not isinstance(value, str):
+        return value
+    whole = EXPRESSION.fullmatch(value.strip())
+    if whole:
+        return Expression(whole[1], contexts, status, workspace).evaluate()
+    return EXPRESSION.sub(
+        lambda m: to_string(Expression(m[1], contexts, status, workspace).evaluate()),
+        value,
+    )
+
+
+def condition(text, contexts, status, workspace):
+    """Return whether a step runs, given its ``if`` and the current status."""
+    if isinstance(text, bool):
+        return text and status == "success"
+    text = str(text).strip() if text is not None else ""
+    whole = EXPRESSION.fullmatch(text)
+    if whole:
+        text = whole[1].strip()
+    if not text:
+        return status == "success"
+    if not STATUS_FUNCTION.search(text):
+        text = f"success() && ({text})"
+    return truthy(Expression(text, contexts, status, workspace).evaluate())
+
+
+def read_env_file(path):
+    """Read ``NAME=value`` and ``NAME<<DELIMITER`` blocks from a runner file."""
+    values = {}
+    if not os.path.exists(path):
+        return values
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+        if "<<" in line and ("=" not in line or line.index("<<") < line.index("=")):
+            name, delimiter = line.split("<<", 1)
+            block = []
+            while index < len(lines) and lines[index] != delimiter:
+                block.append(lines[index])
+                index += 1
+            index += 1
+            values[name] = "\n".join(block)
+        elif "=" in line:
+            name, value = line.split("=", 1)
+            values[name] = value
+    return values
+
+
+def find_stub(stubs, step):
+    """Return (True, stub) if a stub replaces the step, else (False, None)."""
+    uses = step.get("uses", "")
+    for key in (step.get("id"), step.get("name"), uses, uses.split("@")[0]):
+        if key and key in stubs:
+            return True, stubs[key]
+    return (True, None) if uses else (False, None)
+
+
+def run_script(script, shell, env, cwd, folder):
+    """Run a script with a shell and return (exit status, combined output)."""
+    if shell not in SHELLS:
+        raise ValueError(f"The local runner does not support shell {shell!r}")
+    fd, path = tempfile.mkstemp(
+        dir=folder, suffix=".py" if shell == "python" else ".sh"
+    )
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(script)
+    result = subprocess.run(  # nosec B603
+        [*SHELLS[shell], path],
+        check=False,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    return result.returncode, result.stdout
+
+
+def load_action(action):
+    """Load an action.yml, given the file or the folder holding it."""
+    path = os.path.join(action, "action.yml") if os.path.isdir(action) else action
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f), os.path.dirname(os.path.abspath(path))
+
+
+def run_action(
+    action,
+    workspace,
+    inputs=None,
+    stubs=None,
+    env=None,
+    github=None,
+    temp=None,
+):
+    """Run a composite action locally and time its steps.
+
+    Args:
+        action: Path to the action.yml, or to the folder holding it.
+        workspace: The project folder the steps run in.
+        inputs: Input values; the defaults of the action fill in the rest.
+        stubs: Replacements of steps, see the module docstring.
+        env: Extra environment variables for all steps.
+        github: Values of the ``github`` context (``event_name``, ``sha``, ...).
+        temp: Folder for the runner files (``RUNNER_TEMP``); if None, a temporary
+            folder that is removed when the run ends.
+
+    Returns:
+        A dict with ``steps`` (name, id, kind, status, seconds, outputs and log
+        of every step), the action ``outputs``, the ``summary`` written to
+        ``GITHUB_STEP_SUMMARY`` and the ``seconds`` of the whole run.
+    """
+    if temp is None:
+        with tempfile.TemporaryDirectory(prefix="cradle-runner-") as folder:
+            return run_action(action, workspace, inputs, stubs, env, github, folder)
+
+    definition, action_path = load_action(action)
+    workspace = os.path.abspath(workspace)
+    os.makedirs(temp, exist_ok=True)
+    stubs = stubs or {}
+
+    values = {}
+    for name, spec in (definition.get("inputs") or {}).items():
+        values[name] = str((spec or {}).get("default", ""))
+    for name, value in (inputs or {}).items():
+        if name not in values:
+            raise ValueError(f"The action has no input {name!r}")
+        values[name] = value if isinstance(value, str) else to_string(value)
+    missing = [
+        name
+        for name, spec in (definition.get("inputs") or {}).items()
+        if (spec or {}).get("required") and name not in (inputs or {})
+    ]
+    if missing:
+        raise ValueError(f"Required input(s) not given: {', '.join(missing)}")
+
+    github = {
+        "repository": "owner/repo",
+        "repository_owner": "owner",
+        "sha": "0" * 40,
+        "ref": "refs/heads/main",
+        "ref_type": "branch",
+        "ref_name": "main",
+        "event_name": "push",
+        "event": {},
+        "token": "",
+        "run_id": "1",
+        "run_number": "1",
+        "server_url": "https://github.com",
+        "api_url": "https://api.github.com",
+        "workspace": workspace,
+        "action_path": action_path,
+        **(github or {}),
+    }
+    files = {
+        name: os.path.join(temp, name.lower())
+        for name in ("GITHUB_ENV", "GITHUB_PATH", "GITHUB_STEP_SUMMARY")
+    }
+    for path in files.values():
+        open(path, "w", encoding="utf-8").close()
+
+    base = {
+        **os.environ,
+        "CI": "true",
+        "GITHUB_ACTIONS": "true",
+        "GITHUB_WORKSPACE": workspace,
+        "GITHUB_ACTION_PATH": action_path,
+        "GITHUB_REPOSITORY": github["repository"],
+        "GITHUB_REPOSITORY_OWNER": github["repository_owner"],
+        "GITHUB_SHA": github["sha"],
+        "GITHUB_REF": github["ref"],
+        "GITHUB_REF_NAME": github["ref_name"],
+        "GITHUB_EVENT_NAME": github["event_name"],
+        "GITHUB_RUN_ID": str(github["run_id"]),
+        "GITHUB_RUN_NUMBER": str(github["run_number"]),
+        "GITHUB_SERVER_URL": github["server_url"],
+        "GITHUB_API_URL": github["api_url"],
+        "RUNNER_TEMP": temp,
+        "RUNNER_OS": "Linux",
+        "RUNNER_ARCH": "X64",
+        **files,
+        **(env or {}),
+    }
+    base.pop("GITHUB_OUTPUT", None)
+    added_env, added_path = {}, []
+    steps, results, status = {}, [], "success"
+    started = time.perf_counter()
+
+    for index, step in enumerate(definition["runs"]["steps"]):
+        contexts = {
+            "inputs": values,
+            "steps": steps,
+            "github": github,
+            "runner": {"os": "Linux", "arch": "X64", "temp": temp},
+            "env": {**(env or {}), **added_env},
+        }
+        name = to_string(
+            substitute(
+                step.get("name") or step.get("uses") or f"Run {index + 1}", contexts
+            )
+        )
+        result = {
+            "name": name,
+            "id": step.get("id"),
+            "outputs": {},
+            "log": "",
+            "seconds": 0.0,
+        }
+        results.append(result)
+
+        if not condition(step.get("if"), contexts, status, workspace):
+            result.update(kind="skipped", status="skipped")
+            if step.get("id"):
+                steps[step["id"]] = {
+                    "outputs": {},
+                    "outcome": "skipped",
+                    "conclusion": "skipped",
+                }
+            continue
+
+        step_env = {
+            **base,
+            **added_env,
+            "PATH": os.pathsep.join([*reversed(added_path), base.get("PATH", "")]),
+        }
+        for key, value in (step.get("env") or {}).items():
+            step_env[key] = to_string(substitute(value, contexts, status, workspace))
+        output_file = os.path.join(temp, f"output-{index}")
+        open(output_file, "w", encoding="utf-8").close()
+        step_env["GITHUB_OUTPUT"] = output_file
+        cwd = os.path.join(
+            workspace,
+            to_string(
+                substitute(
+                    step.get("working-directory", "."), contexts, status, workspace
+                )
+            ),
+        )
+
+        stubbed, stub = find_stub(stubs, step)
+        step_start = time.perf_counter()
+        code, log, outputs = 0, "", {}
+        if stubbed:
+            result["kind"] = "stub"
+            with_values = {
+                key: to_string(substitute(value, contexts, status, workspace))
+                for key, value in (step.get("with") or {}).items()
+            }
+            if callable(stub):
+                outputs = stub(with_values, step_env) or {}
+            elif isinstance(stub, str):
+                for key, value in with_values.items():
+                    step_env[f"INPUT_{key.upper().replace(' ', '_')}"] = value
+                code, log = run_script(stub, "bash", step_env, cwd, temp)
+        else:
+            result["kind"] = "run"
+            script = to_string(substitute(step["run"], contexts, status, workspace))
+            shell = to_string(
+                substitute(step.get("shell", "bash"), contexts, status, workspace)
+            )
+            code, log = run_script(script, shell, step_env, cwd, temp)
+        result["seconds"] = round(time.perf_counter() - step_start, 3)
+
+        outputs = {**read_env_file(output_file), **outputs}
+        added_env.update(read_env_file(files["GITHUB_ENV"]))
+        with open(files["GITHUB_PATH"], encoding="utf-8") as f:
+            added_path = [line for line in f.read().splitlines() if line]
+        outcome = "success" if code == 0 else "failure"
+        conclusion = "success" if step.get("continue-on-error") else outcome
+        if conclusion == "failure":
+            status = "failure"
+        result.update(status=outcome, outputs=outputs, log=log)
+        if step.get("id"):
+            steps[step["id"]] = {
+                "outputs": outputs,
+                "outcome": outcome,
+                "conclusion": conclusion,
+            }
+
+    contexts = {"inputs": values, "steps": steps, "github": github, "env": added_env}
+    outputs = {
+        name: to_string(
+            substitute((spec or {}).get("value", ""), contexts, status, workspace)
+        )
+        for name, spec in (definition.get("outputs") or {}).items()
+    }
+    with open(files["GITHUB_STEP_SUMMARY"], encoding="utf-8") as f:
+        summary = f.read()
+    return {
+        "action": definition.get("name", ""),
+        "status": status,
+        "steps": results,
+        "outputs": outputs,
+        "summary": summary,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def markdown(run):
+    """Return a markdown table of the steps of a run and their wall times."""
+    lines = [
+        f"### {run['action']}",
+        "",
+        "| Step | Kind | Status | Wall time (s) |",
+        "|------|------|--------|---------------|",
+    ]
+    for step in run["steps"]:
+        lines.append(
+            f"| {step['name']} | {step['kind']} | {step['status']} | {step['seconds']:.3f} |"
+        )
+    lines.append(f"| **Total** | | {run['status']} | {run['seconds']:.3f} |")
+    return "\n".join(lines) + "\n"
+
+
+def key_value(text):
+    """Split a ``NAME=value`` command line argument."""
+    if "=" not in text:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got {text!r}")
+    return tuple(text.split("=", 1))
+
+
+def main(argv=None):
+    """Run an action from the command line and print the timing of its steps."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", help="action folder or action.yml")
+    parser.add_argument("--workspace", default=".", help="project the steps run in")
+    parser.add_argument("--input", type=key_value, action="append", default=[])
+    parser.add_argument("--env", type=key_value, action="append", default=[])
+    parser.add_argument(
+        "--stub",
+        type=key_value,
+        action="append",
+        default=[],
+        help="ACTION_OR_STEP=bash script replacing the step ('' does nothing)",
+    )
+    parser.add_argument("--event", default="push", help="github.event_name")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument(
+        "--verbose", action="store_true", help="print the log of every step"
+    )
+    args = parser.parse_args(argv)
+
+    run = run_action(
+        args.action,
+        args.workspace,
+        inputs=dict(args.input),
+        stubs={name: script or None for name, script in args.stub},
+        env=dict(args.env),
+        github={"event_name": args.event},
+    )
+    for step in run["steps"]:
+        if args.verbose or step["status"] == "failure":
+            print(f"--- {step['name']} ({step['status']})\n{step['log']}")
+    print(markdown(run))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+    return 0 if run["status"] == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
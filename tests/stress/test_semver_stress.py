@@ -0,0 +1,71 @@
+"""Stress test of the version bump engine of the tag action.
+
+A repository with 100k commits is built with ``git fast-import`` and the next
+tag is computed against a release tag deep in its history. Run with
+``make stress``; ``make test`` leaves this folder out.
+"""
+
+import importlib.util
+import os
+import subprocess  # nosec B404
+import time
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COMMITS = 100_000
+
+# The release tag, 2000 commits before HEAD
+TAGGED = 98_000
+
+
+@pytest.fixture
+def semver():
+    """Return the cradle_semver module of the tag action."""
+    path = os.path.join(REPO, "actions", "tag", "cradle_semver.py")
+    spec = importlib.util.spec_from_file_location("cradle_semver", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def long_history(tmp_path):
+    """Return a repository with 100k commits and a release tag deep in its history."""
+    stream = []
+    for index in range(COMMITS):
+        stream.append(
+            f"commit refs/heads/main\nmark :{index + 1}\n"
+            f"committer test <test@example.com> {1_600_000_000 + index} +0000\n"
+            f"data <<EOF\n{'feat' if index % 7 else 'fix'}: change {index}\nEOF\n"
+        )
+        if index:
+            stream.append(f"from :{index}\n")
+        stream.append("\n")
+        if index == TAGGED:
+            stream.append(f"reset refs/tags/v3.4.5\nfrom :{index + 1}\n\n")
+
+    subprocess.run(["git", "init", "-q", "-b", "main", str(tmp_path)], check=True)
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        cwd=tmp_path,
+        input="".join(stream),
+        text=True,
+        check=True,
+    )
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=tmp_path, check=True)
+    return str(tmp_path)
+
+
+@pytest.mark.stress
+def test_long_history_is_fast(semver, long_history):
+    """Test that the next tag of a 100k-commit repository takes under a second."""
+    start = time.perf_counter()
+    result = semver.next_tag(long_history)
+    seconds = time.perf_counter() - start
+
+    assert result["previous_tag"] == "v3.4.5"
+    assert result["commits"] == COMMITS - TAGGED - 1
+    assert result["new_tag"] == "v3.5.0"
+    assert seconds < 1.0
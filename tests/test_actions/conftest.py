@@ -10,6 +10,7 @@ Security Notes:
 """
 
 import glob
+import importlib.util
 import os
 
 import pytest
@@ -42,3 +43,22 @@ def action_path(actions_dir):
 def all_action_paths(actions_dir):
     """Return a list of paths to all action.yml files."""
     return glob.glob(os.path.join(actions_dir, "*", "action.yml"))
+
+
+@pytest.fixture
+def action_module(actions_dir, monkeypatch):
+    """Return a function that imports a Python helper module shipped with an action."""
+
+    def _action_module(action_name, module_name):
+        """Import and return the module_name.py file of the given action."""
+        folder = os.path.join(actions_dir, action_name)
+        # The helpers import their siblings, just like they do on the runner
+        monkeypatch.syspath_prepend(folder)
+        spec = importlib.util.spec_from_file_location(
+            module_name, os.path.join(folder, f"{module_name}.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return _action_module
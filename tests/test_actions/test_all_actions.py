@@ -134,3 +134,24 @@ def _test_action_inputs_documentation(action_path):
             assert "default" in input_config, (
                 f"{action_name} action input {input_name} is not required but has no default value"
             )
+
+
+@pytest.mark.parametrize(
+    "action_name", ["environment", "build", "deptry", "pre-commit", "ci"]
+)
+def test_checkout_options(action_name, action_path):
+    """Test that the actions checking out code share the same checkout inputs."""
+    with open(action_path(action_name)) as f:
+        action = yaml.safe_load(f)
+
+    for name in ("skip-checkout", "fetch-depth", "filter", "sparse-checkout", "lfs"):
+        assert name in action["inputs"], f"{action_name} must have a {name} input"
+
+    checkout = next(
+        step
+        for step in action["runs"]["steps"]
+        if step.get("uses", "").startswith("actions/checkout")
+    )
+    assert checkout["if"] == "inputs.skip-checkout != 'true'"
+    assert set(checkout["with"]) == {"fetch-depth", "filter", "sparse-checkout", "lfs"}
+    assert "inputs.fetch-depth" in checkout["with"]["fetch-depth"]
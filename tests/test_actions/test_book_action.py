@@ -6,6 +6,7 @@ a minibook from a list of links and deploys it to GitHub Pages.
 """
 
 import os
+import subprocess
 
 import yaml
 
@@ -82,3 +83,98 @@ def test_book_action_structure(action_path):
         (step for step in steps if step.get("name", "").startswith("Deploy")), None
     )
     assert deploy_step is not None, "Action must have a deploy step"
+
+
+def test_book_action_skips_unchanged_site(action_path):
+    """Test that the book action compares the site with the deployed manifest."""
+    with open(action_path("book")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["skip-unchanged"]["default"] == "true"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    compare = steps["Compare with deployed site"]
+    assert "cradle_pages.py" in compare["run"]
+    assert "toJSON(inputs)" in compare["env"]["BOOK_FINGERPRINT"]
+
+    # The manifest is written before the book page, which holds a timestamp
+    names = list(steps)
+    assert names.index("Compare with deployed site") < names.index("Create minibook")
+
+    unchanged = "steps.pages-diff.outputs.changed != 'false'"
+    assert steps["Upload static files as artifact"]["if"] == unchanged
+    assert unchanged in steps["Deploy to GitHub Pages"]["if"]
+
+
+def test_book_action_selects_and_checks_artifacts(action_path, tmp_path):
+    """Test the artifact selection, the concurrent download and the link check."""
+    with open(action_path("book")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["artifacts"]["default"] == ""
+    assert action["inputs"]["download-concurrency"]["default"] == "0"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    download = steps["Download all artifacts"]
+    assert download["if"] == "inputs.download-concurrency == '0'"
+    assert download["with"]["pattern"] == "${{ steps.artifact-select.outputs.pattern }}"
+    concurrent = steps["Download artifacts concurrently"]
+    assert concurrent["if"] == "inputs.download-concurrency != '0'"
+    assert "cradle_artifacts.py" in concurrent["run"]
+    assert "cradle_artifacts.py" in steps["Check artifact links"]["run"]
+
+    # The list of names becomes one glob for actions/download-artifact
+    select = steps["Select artifacts"]["run"]
+    for artifacts, pattern in [
+        ("", ""),
+        ("pdoc", "pdoc"),
+        ("pdoc, tests\ncoverage-*", "{pdoc,tests,coverage-*}"),
+    ]:
+        output = tmp_path / "output"
+        subprocess.run(
+            ["bash", "-c", select],
+            env={**os.environ, "ARTIFACTS": artifacts, "GITHUB_OUTPUT": str(output)},
+            check=True,
+        )
+        assert output.read_text() == f"pattern={pattern}\n"
+        output.unlink()
+
+
+def test_book_action_deploys_the_manifest(runner, action_path, tmp_path):
+    """Test that the manifest is in the site uploaded to GitHub Pages."""
+    uploaded = []
+
+    def upload(values, env):
+        # upload-pages-artifact leaves out dotfiles unless include-hidden-files is set
+        hidden = values.get("include-hidden-files") == "true"
+        root = tmp_path / values["path"]
+        uploaded.extend(
+            path.relative_to(root).as_posix()
+            for path in root.rglob("*")
+            if path.is_file()
+            and (
+                hidden
+                or not any(p.startswith(".") for p in path.relative_to(root).parts)
+            )
+        )
+
+    # No GitHub API and no deployed site: gh fails, as without a token
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "gh").write_text("#!/bin/bash\nexit 1\n")
+    (bin_dir / "gh").chmod(0o755)
+    (tmp_path / "artifacts" / "pdoc").mkdir(parents=True)
+    (tmp_path / "artifacts" / "pdoc" / "index.html").write_text("docs")
+    run = runner.run_action(
+        os.path.dirname(action_path("book")),
+        tmp_path,
+        inputs={"links": '{"API": "./pdoc/index.html"}'},
+        env={"PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"},
+        stubs={
+            "Create minibook": None,
+            "Check artifact links": None,
+            "actions/upload-pages-artifact": upload,
+        },
+    )
+    assert run["status"] == "success"
+    assert ".cradle-manifest.json" in uploaded
@@ -82,3 +82,62 @@ def test_build_action_structure(action_path):
         None,
     )
     assert release_step is not None, "Action must have a release step"
+
+
+def test_build_action_cache_and_target(action_path):
+    """Test that the build action caches the build tool and the build outputs."""
+    with open(action_path("build")) as f:
+        action = yaml.safe_load(f)
+
+    inputs = action["inputs"]
+    assert inputs["target"]["default"] == "all", "Target input must default to all"
+    assert inputs["enable-cache"]["default"] == "true", (
+        "Enable-cache input must default to true"
+    )
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+
+    # The build tool comes through uv instead of pip
+    assert steps["Set up uv"]["uses"].startswith("astral-sh/setup-uv@")
+    assert steps["Set up uv"]["with"]["enable-cache"] == (
+        "${{ inputs.enable-cache == 'true' && 'true' || 'false' }}"
+    ), "Set up uv step must not cache the build tool when caching is off"
+    build_run = steps["Build package"]["run"]
+    assert "uvx hatch build" in build_run, "Build step must run hatch through uv"
+    assert "pip install hatch" not in build_run, "Build step must not pip install"
+    assert "format('-t {0}', inputs.target)" in build_run, (
+        "Build step must honour the target input"
+    )
+
+    # Build outputs are keyed on the source tree and reused on an exact hit
+    assert 'git rev-parse "HEAD^{tree}"' in steps["Compute build cache key"]["run"]
+    assert "${{ runner.arch }}" in steps["Compute build cache key"]["run"], (
+        "Build cache key must tell x64 and arm64 runners apart"
+    )
+    restore = steps["Restore build outputs"]
+    assert restore["uses"].startswith("actions/cache@")
+    assert restore["with"]["path"] == "dist/"
+    assert steps["Build package"]["if"] == (
+        "steps.build-cache.outputs.cache-hit != 'true'"
+    ), "Build step must be skipped on an exact cache hit"
+
+
+def test_build_action_python_versions(action_path):
+    """Test that the build action can build wheels for several Python versions."""
+    with open(action_path("build")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["python-versions"]["default"] == "", (
+        "Python-versions input must default to a single hatch build"
+    )
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    assert "inputs.python-versions" in steps["Compute build cache key"]["run"], (
+        "Build outputs must be keyed on the Python versions"
+    )
+
+    wheels = steps["Build wheels for all Python versions"]
+    assert "inputs.python-versions != ''" in wheels["if"]
+    assert "steps.build-cache.outputs.cache-hit != 'true'" in wheels["if"]
+    assert "cradle_wheels.py" in wheels["run"]
+    assert "--python-versions" in wheels["run"]
@@ -0,0 +1,101 @@
+"""Tests for the ci GitHub Action.
+
+This module checks that the ci action sets up the checkout and the environment
+once, and runs it offline with the local runner, with stand-ins for uv and uvx.
+"""
+
+import os
+
+import yaml
+
+
+def test_ci_action_structure(action_path):
+    """Test that the ci action has the expected structure."""
+    with open(action_path("ci")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["runs"]["using"] == "composite"
+    assert action["inputs"]["stages"]["default"] == "test"
+    for stage in ("test", "coverage", "pdoc", "deptry", "pre-commit"):
+        assert (
+            action["outputs"][stage]["value"] == f"${{{{ steps.ci.outputs.{stage} }}}}"
+        )
+
+    steps = action["runs"]["steps"]
+    uses = [step.get("uses", "") for step in steps]
+    assert uses.count("actions/checkout@v6") == 1
+    assert uses.count("astral-sh/setup-uv@v7") == 1
+
+    names = {step.get("name"): step for step in steps}
+    assert "cradle_ci.py" in names["Run stages"]["run"]
+    assert names["Upload documentation"]["with"]["name"] == "pdoc"
+    assert names["Upload coverage reports"]["with"]["name"] == "tests"
+    for step in steps:
+        if step.get("uses", "").startswith("actions/upload-artifact"):
+            assert step["with"]["retention-days"] == 1
+
+
+def test_ci_action_shares_the_pre_commit_cache(action_path):
+    """Test that the hook environments use the one cache entry of pre-commit/action."""
+    restores = {}
+    for name in ("ci", "pre-commit"):
+        with open(action_path(name)) as f:
+            steps = yaml.safe_load(f)["runs"]["steps"]
+        restore = next(
+            step
+            for step in steps
+            if step.get("name") == "Restore pre-commit environments"
+        )
+        assert restore["uses"] == "actions/cache/restore@v5"
+        restores[name] = restore["with"]
+        assert not any(step.get("uses") == "actions/cache@v5" for step in steps)
+    assert restores["ci"] == restores["pre-commit"]
+
+    with open(action_path("ci")) as f:
+        steps = {step.get("name"): step for step in yaml.safe_load(f)["runs"]["steps"]}
+    save = steps["Save pre-commit environments"]
+    assert save["with"] == restores["ci"], "The entry is saved under the same key"
+    assert "steps.pre-commit-cache.outputs.cache-hit != 'true'" in save["if"]
+
+
+def test_ci_action_runs_stages_offline(runner, action_path, tmp_path):
+    """Test the per-stage outputs with uv and uvx stand-ins that log their calls."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    calls = tmp_path / "calls"
+    for tool in ("uv", "uvx"):
+        script = bin_dir / tool
+        script.write_text(
+            f'#!/bin/bash\necho "{tool} $*" >> {calls}\n[[ "$*" != *deptry* ]]\n'
+        )
+        script.chmod(0o755)
+    (tmp_path / ".pre-commit-config.yaml").write_text("repos: []\n")
+
+    run = runner.run_action(
+        os.path.dirname(action_path("ci")),
+        tmp_path,
+        inputs={"stages": "test, deptry, pre-commit"},
+        env={"PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"},
+    )
+
+    assert run["status"] == "failure"
+    outputs = run["outputs"]
+    assert (outputs["test"], outputs["deptry"], outputs["pre-commit"]) == (
+        "success",
+        "failure",
+        "success",
+    )
+    assert outputs["pdoc"] == ""
+    statuses = {step["name"]: step["status"] for step in run["steps"]}
+    assert statuses["Install Node"] == "skipped"
+    assert statuses["Upload deptry report"] == "success"
+    assert statuses["Upload documentation"] == "skipped"
+
+    logged = calls.read_text().splitlines()
+    assert logged[:3] == [
+        "uv venv --clear --python 3.12",
+        "uv sync --all-extras",
+        "uv pip install pytest",
+    ]
+    assert logged[3].startswith("uvx pre-commit run")
+    assert (tmp_path / "artifacts" / "ci-logs" / "deptry.log").exists()
@@ -5,8 +5,12 @@ including required inputs, steps, and other elements. The coverage action runs t
 with comprehensive coverage reporting and optional Coveralls integration.
 """
 
+import json
 import os
+import subprocess
+import sys
 
+import pytest
 import yaml
 
 
@@ -74,3 +78,155 @@ def test_coverage_action_structure(action_path):
     assert upload_results_step is not None, (
         "Action must have an upload test results step"
     )
+
+
+def test_coverage_action_timings(action_path):
+    """Test that the coverage action can record per-test durations."""
+    with open(action_path("coverage")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["timings"]["default"] == "false", (
+        "Timings input must default to false"
+    )
+
+    steps = action["runs"]["steps"]
+    names = [step.get("name", "") for step in steps]
+    assert "Restore test timings" in names, "Action must restore test timings"
+    assert "Save test timings" in names, "Action must save test timings"
+    assert "Upload test timings" in names, "Action must upload test timings"
+    restore_step = steps[names.index("Restore test timings")]
+    assert "restore-keys" not in restore_step["with"], (
+        "Every shard must restore the timings of the base commit"
+    )
+    # Shards only upload their durations, the combine job merges and saves them
+    save_step = steps[names.index("Save test timings")]
+    assert "inputs.mode != 'shard'" in save_step["if"]
+    assert "Merge test timings" in names, "Action must merge the shards' timings"
+    download_step = steps[names.index("Download test timings")]
+    assert download_step["if"].endswith("inputs.mode == 'combine'")
+    assert "-shard-*" in download_step["with"]["pattern"]
+
+    run_tests_step = next(
+        step for step in steps if step.get("name", "").startswith("Run tests")
+    )
+    assert "-p cradle_pytest" in run_tests_step["run"], (
+        "Run tests step must load the cradle_pytest plugin"
+    )
+    assert "../test" in run_tests_step["env"]["PYTHONPATH"], (
+        "Run tests step must make the test action's plugin importable"
+    )
+
+
+def test_coverage_action_shard_and_combine(action_path):
+    """Test that the coverage action can run in shards and combine them."""
+    with open(action_path("coverage")) as f:
+        action = yaml.safe_load(f)
+
+    inputs = action["inputs"]
+    assert inputs["mode"]["default"] == "full", "Mode input must default to full"
+    assert inputs["shard-index"]["default"] == "0"
+    assert inputs["shard-total"]["default"] == "1"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+
+    # Shards upload their raw data files, which are hidden files
+    upload_data = steps["Upload coverage data"]
+    assert upload_data["if"] == "inputs.mode == 'shard'"
+    assert upload_data["with"]["include-hidden-files"] is True, (
+        "Raw .coverage.* files must be uploaded"
+    )
+
+    # The combine mode downloads every shard and merges them once
+    download_data = steps["Download coverage data"]
+    assert download_data["with"]["pattern"] == "coverage-data-*"
+    assert download_data["with"]["merge-multiple"] is True
+    assert "coverage combine" in steps["Combine coverage data"]["run"]
+
+    # Full and combined runs write the reports through the same step
+    reports = steps["Write coverage reports"]
+    assert reports["if"] == "inputs.mode != 'shard'"
+
+
+def test_coverage_action_reports(action_path):
+    """Test that the coverage action only writes and installs what is requested."""
+    with open(action_path("coverage")) as f:
+        action = yaml.safe_load(f)
+
+    inputs = action["inputs"]
+    assert inputs["reports"]["default"] == "term,xml,json,lcov,html,pytest-html", (
+        "Reports input must default to all formats"
+    )
+    assert inputs["random-order"]["default"] == "true", (
+        "Random-order input must default to true"
+    )
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+
+    # Optional plugins are only installed when needed
+    run = steps["Run tests with coverage"]["run"]
+    assert "PLUGINS=(pytest pytest-cov)" in run
+    assert "PLUGINS+=(pytest-html)" in run
+    assert "PLUGINS+=(pytest-random-order)" in run
+
+    # Every coverage format is written on request only
+    reports = steps["Write coverage reports"]["run"]
+    for report in ["term", "xml|json|lcov", "html", "pytest-html"]:
+        assert f"{report})" in reports, f"Reports step must handle {report}"
+    assert "uv run coverage report" in reports
+    assert "uv run coverage html" in reports
+    assert "Unknown report format" in reports, "Unknown formats must be rejected"
+
+    # Nothing is uploaded when no report file was written
+    upload = steps["Upload test results"]
+    assert "steps.reports.outputs.files == 'true'" in upload["if"]
+
+
+def test_sharded_coverage_matches_full_run(actions_dir, tmp_path):
+    """Test that combining shard data gives the same reports as a full run."""
+    pytest.importorskip("pytest_cov")
+
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "pkg" / "__init__.py").write_text(
+        "def f(x):\n    if x > 0:\n        return 1\n    return 2\n\n\n"
+        "def unused():\n    return 3\n"
+    )
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_pkg.py").write_text(
+        "from pkg import f\n\n\n"
+        + "\n".join(f"def test_{i}():\n    assert f({i - 2})\n" for i in range(6))
+    )
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([os.path.join(actions_dir, "test"), "src"]),
+    }
+
+    def run(*args, data_file):
+        subprocess.run(
+            [sys.executable, "-m", *args],
+            cwd=tmp_path,
+            env={**env, "COVERAGE_FILE": data_file},
+            check=True,
+            capture_output=True,
+        )
+
+    def reports(name, data_file):
+        run("coverage", "json", "-o", f"{name}.json", data_file=data_file)
+        run("coverage", "lcov", "-o", f"{name}.info", data_file=data_file)
+        report = json.loads((tmp_path / f"{name}.json").read_text())
+        # coverage.py stamps every report with the time it was written
+        del report["meta"]["timestamp"]
+        return report, (tmp_path / f"{name}.info").read_text()
+
+    pytest_args = ["pytest", "-p", "cradle_pytest", "--cov=src", "--cov-report="]
+    run(*pytest_args, "tests", data_file="full/.coverage")
+    for index in range(3):
+        run(
+            *pytest_args,
+            f"--shard-index={index}",
+            "--shard-total=3",
+            "tests",
+            data_file=f"shards/.coverage.shard-{index}",
+        )
+    run("coverage", "combine", "shards", data_file="shards/.coverage")
+
+    assert reports("full", "full/.coverage") == reports("combined", "shards/.coverage")
@@ -0,0 +1,161 @@
+"""Tests for the cradle_affected helper shipped with the test action.
+
+This module checks how the test impact map is built from coverage contexts,
+when a change forces the whole suite to run and which tests are selected.
+"""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def affected(action_module):
+    """Return the cradle_affected module."""
+    return action_module("test", "cradle_affected")
+
+
+@pytest.fixture
+def test_map():
+    """Return a small test impact map."""
+    return {
+        "files": {
+            "src/pkg/core.py": [
+                "tests/test_core.py::test_a",
+                "tests/test_io.py::test_c",
+            ],
+            "src/pkg/io.py": ["tests/test_io.py::test_c"],
+            "tests/test_core.py": ["tests/test_core.py::test_a"],
+            "tests/test_io.py": [
+                "tests/test_io.py::test_c",
+                "tests/test_io.py::test_d",
+            ],
+        },
+        "tests": [
+            "tests/test_core.py::test_a",
+            "tests/test_io.py::test_c",
+            "tests/test_io.py::test_d",
+        ],
+    }
+
+
+COLLECTED = [
+    "tests/test_core.py::test_a",
+    "tests/test_io.py::test_c",
+    "tests/test_io.py::test_d",
+]
+
+
+def test_affected_by_source_change(affected, test_map):
+    """Test that a source change selects the tests that executed it."""
+    selected = affected.affected(COLLECTED, {"src/pkg/io.py"}, test_map)
+    assert selected == {"tests/test_io.py::test_c"}
+
+
+def test_affected_by_test_file_change(affected, test_map):
+    """Test that all tests in a changed test file are selected."""
+    selected = affected.affected(COLLECTED, {"tests/test_io.py"}, test_map)
+    assert selected == {"tests/test_io.py::test_c", "tests/test_io.py::test_d"}
+
+
+def test_unknown_tests_always_run(affected, test_map):
+    """Test that tests missing from the map are never skipped."""
+    collected = [*COLLECTED, "tests/test_new.py::test_e"]
+    selected = affected.affected(collected, {"README.md"}, test_map)
+    assert selected == {"tests/test_new.py::test_e"}
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["tests/conftest.py", "pyproject.toml", "uv.lock", "requirements-dev.txt"],
+)
+def test_config_changes_run_everything(affected, test_map, path):
+    """Test that conftest, config and lockfile changes trigger a full run."""
+    reason = affected.full_run_reason({"src/pkg/io.py", path}, test_map)
+    assert reason is not None
+    assert path in reason
+
+
+def test_extra_full_run_patterns(affected, test_map):
+    """Test that extra patterns also trigger a full run."""
+    assert affected.full_run_reason({"src/pkg/io.py"}, test_map) is None
+    patterns = (*affected.DEFAULT_FULL_RUN_PATTERNS, "src/pkg/*")
+    reason = affected.full_run_reason({"src/pkg/io.py"}, test_map, patterns)
+    assert reason == "src/pkg/io.py matches src/pkg/*"
+
+
+@pytest.mark.parametrize("path", ["data/table.csv", "src/pkg/constants.py"])
+def test_unmapped_changes_run_everything(affected, test_map, path):
+    """Test that a changed file the map knows nothing about triggers a full run."""
+    reason = affected.full_run_reason({"src/pkg/io.py", path}, test_map)
+    assert reason == f"{path} is not in the test impact map"
+
+
+def test_changed_test_files_do_not_run_everything(affected, test_map):
+    """Test that a test file with recorded tests only selects its own tests."""
+    test_map["files"].pop("tests/test_io.py")
+    assert affected.full_run_reason({"tests/test_io.py"}, test_map) is None
+
+
+@pytest.mark.parametrize(
+    "path", ["tests/data/table.csv", "tests/helpers.py", "tests/test_new.py"]
+)
+def test_unmapped_files_in_tests_run_everything(affected, test_map, path):
+    """Test that other files in the tests folder are no exception."""
+    reason = affected.full_run_reason({"tests/test_io.py", path}, test_map)
+    assert reason == f"{path} is not in the test impact map"
+
+
+def test_missing_map_runs_everything(affected, tmp_path):
+    """Test that no map means the whole suite runs."""
+    empty = affected.load_map(str(tmp_path / "missing.json"))
+    assert empty == {"files": {}, "tests": []}
+    assert affected.full_run_reason({"src/pkg/io.py"}, empty) is not None
+
+
+def test_build_map_from_contexts(affected, tmp_path, monkeypatch):
+    """Test that per-test coverage contexts become a file-to-tests map."""
+    coverage = pytest.importorskip("coverage")
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "src" / "mod.py"
+    source.parent.mkdir()
+    source.write_text("x = 1\ny = 2\n")
+
+    data = coverage.CoverageData(basename=str(tmp_path / ".coverage"))
+    for context, lines in [
+        ("tests/test_mod.py::test_x|setup", [1]),
+        ("tests/test_mod.py::test_x|run", [1, 2]),
+        ("tests/test_mod.py::test_y[1]|run", [2]),
+        ("", [1]),
+    ]:
+        data.set_context(context)
+        data.add_lines({str(source): lines})
+    data.write()
+
+    test_map = affected.build_map(str(tmp_path / ".coverage"))
+    assert test_map == {
+        "files": {
+            "src/mod.py": ["tests/test_mod.py::test_x", "tests/test_mod.py::test_y[1]"]
+        },
+        "tests": ["tests/test_mod.py::test_x", "tests/test_mod.py::test_y[1]"],
+    }
+
+
+def test_check_command(affected, test_map, tmp_path, capsys):
+    """Test that the check command prints the selection mode."""
+    map_file = tmp_path / "map.json"
+    map_file.write_text(json.dumps(test_map))
+    changed = tmp_path / "changed.txt"
+
+    changed.write_text("src/pkg/io.py\n")
+    args = ["check", "--map", str(map_file), "--changed", str(changed)]
+    assert affected.main(args) == 0
+    assert capsys.readouterr().out == "affected\n"
+
+    changed.write_text("src/pkg/io.py\ntests/conftest.py\n")
+    assert affected.main(args) == 0
+    assert capsys.readouterr().out == "all\n"
+
+    changed.write_text("docs/index.md\n")
+    assert affected.main([*args, "--full-run-patterns", "docs/*.md, *.cfg"]) == 0
+    assert capsys.readouterr().out == "all\n"
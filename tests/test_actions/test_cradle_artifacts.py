@@ -0,0 +1,141 @@
+"""Tests for the cradle_artifacts helper shipped with the book action.
+
+This module checks the selection of artifacts, their concurrent download from a
+local stand-in for the GitHub API, and the warning about unreferenced artifacts.
+"""
+
+import io
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+@pytest.fixture
+def artifacts(action_module):
+    """Return the cradle_artifacts module."""
+    return action_module("book", "cradle_artifacts")
+
+
+def zipped(files):
+    """Return a zip archive holding the given files."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def api():
+    """Serve the artifacts of run 7 like the GitHub API, with signed redirects."""
+    listing = [
+        {"id": 1, "name": "pdoc", "expired": False},
+        {"id": 2, "name": "tests", "expired": False},
+        {"id": 3, "name": "old", "expired": True},
+    ]
+    blobs = {
+        "1": zipped({"index.html": "docs"}),
+        "2": zipped({"html-coverage/index.html": "coverage"}),
+    }
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append((self.path, self.headers.get("Authorization")))
+            if self.path.startswith("/repos/o/r/actions/runs/7/artifacts"):
+                body = json.dumps({"artifacts": listing}).encode()
+            elif self.path.endswith("/zip"):
+                artifact = self.path.split("/")[-2]
+                self.send_response(302)
+                self.send_header("Location", f"{base}/blob/{artifact}?sig=x")
+                self.end_headers()
+                return
+            else:
+                body = blobs[self.path.split("/")[2].split("?")[0]]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    base = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield base, seen
+    server.shutdown()
+
+
+def test_select_matches_globs(artifacts):
+    """Test that expired artifacts are dropped and names are matched by glob."""
+    listed = [
+        {"name": "pdoc"},
+        {"name": "coverage-3.12"},
+        {"name": "tests", "expired": True},
+    ]
+    assert artifacts.select(listed, []) == listed[:2]
+    assert artifacts.select(listed, ["coverage-*"]) == [listed[1]]
+    assert artifacts.pattern_list("pdoc, tests\n coverage-*\n") == [
+        "pdoc",
+        "tests",
+        "coverage-*",
+    ]
+
+
+def test_download_all_unpacks_each_artifact(artifacts, api, tmp_path):
+    """Test that artifacts land in their own folder and storage gets no token."""
+    base, seen = api
+    results = artifacts.download_all(base, "o/r", "7", "token", [], tmp_path, 2)
+
+    assert sorted(result["name"] for result in results) == ["pdoc", "tests"]
+    assert (tmp_path / "pdoc" / "index.html").read_text() == "docs"
+    assert (tmp_path / "tests" / "html-coverage" / "index.html").read_text() == (
+        "coverage"
+    )
+    for path, authorization in seen:
+        assert (authorization is None) == path.startswith("/blob/")
+
+
+def test_download_all_keeps_selected(artifacts, api, tmp_path):
+    """Test that only the artifacts matching a pattern are downloaded."""
+    base, _ = api
+    artifacts.download_all(base, "o/r", "7", "token", ["pdoc"], tmp_path, 4)
+    assert [path.name for path in tmp_path.iterdir()] == ["pdoc"]
+
+
+@pytest.mark.parametrize(
+    "links",
+    [
+        {"Docs": "./pdoc/index.html", "Home": "https://example.com"},
+        [{"name": "Docs", "url": "pdoc/index.html"}],
+        [["Docs", "./pdoc/"]],
+    ],
+)
+def test_unreferenced_reads_all_link_formats(artifacts, links):
+    """Test that artifacts without a relative link are reported."""
+    assert artifacts.unreferenced(["pdoc", "tests"], json.dumps(links)) == ["tests"]
+
+
+def test_check_warns_about_unreferenced(artifacts, tmp_path, capsys):
+    """Test that the check prints a warning annotation per unreferenced artifact."""
+    (tmp_path / "pdoc").mkdir()
+    (tmp_path / "marimushka").mkdir()
+    (tmp_path / ".cradle-manifest.json").write_text("{}")
+
+    links = json.dumps({"Docs": "./pdoc/index.html"})
+    assert artifacts.main(["--path", str(tmp_path), "check", "--links", links]) == 0
+
+    out = capsys.readouterr().out
+    assert "::warning::Artifact 'marimushka'" in out
+    assert "'pdoc'" not in out
+
+
+def test_check_warns_about_invalid_links(artifacts, tmp_path, capsys):
+    """Test that links that are no JSON give a warning, not a failed job."""
+    (tmp_path / "pdoc").mkdir()
+    assert artifacts.main(["--path", str(tmp_path), "check", "--links", "{"]) == 0
+    assert "::warning::Cannot check the artifacts" in capsys.readouterr().out
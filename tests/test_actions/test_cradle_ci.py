@@ -0,0 +1,146 @@
+"""Tests for the cradle_ci helper shipped with the ci action.
+
+This module checks the selection of stages, their commands, the order in which
+they run (pre-commit alone first, the others concurrently) and the report.
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def ci(action_module):
+    """Return the cradle_ci module."""
+    return action_module("ci", "cradle_ci")
+
+
+@pytest.fixture
+def args():
+    """Return the arguments of the helper with their defaults."""
+    return argparse.Namespace(
+        source_folder="src",
+        tests_folder="tests",
+        pdoc_arguments="--docformat google",
+        deptry_options="--ignore DEP002",
+        coverage_reports="term,xml,json,lcov,html,pytest-html",
+    )
+
+
+def test_stage_list(ci):
+    """Test that stages are read in report order, once each."""
+    assert ci.stage_list("pdoc, test\npre-commit,test") == [
+        "pre-commit",
+        "test",
+        "pdoc",
+    ]
+    with pytest.raises(ValueError, match="lint"):
+        ci.stage_list("test,lint")
+
+
+def test_commands(ci, args):
+    """Test that the stages run the tools the single actions run."""
+    pdoc, _ = ci.command("pdoc", args)
+    assert pdoc == [
+        "uv",
+        "run",
+        "pdoc",
+        "-o",
+        "artifacts/pdoc",
+        "--docformat",
+        "google",
+        "src",
+    ]
+    deptry, _ = ci.command("deptry", args)
+    assert deptry[:4] == ["uvx", "deptry", "src", "--ignore"]
+    coverage, env = ci.command("coverage", args)
+    assert "--cov=src" in coverage
+    assert env == {"COVERAGE_FILE": "artifacts/tests/coverage/.coverage"}
+
+
+def test_coverage_reports(ci, args, tmp_path, monkeypatch):
+    """Test that the coverage stage writes the reports of the coverage action."""
+    coverage, _ = ci.command("coverage", args)
+    assert [option for option in coverage if option.startswith("--cov-report")] == [
+        "--cov-report=term",
+        "--cov-report=xml:artifacts/tests/coverage/coverage.xml",
+        "--cov-report=json:artifacts/tests/coverage/coverage.json",
+        "--cov-report=lcov:artifacts/tests/coverage/coverage.info",
+        "--cov-report=html:artifacts/tests/html-coverage",
+    ]
+    assert "--html=artifacts/tests/html-report/report.html" in coverage
+
+    args.coverage_reports = "xml, lcov"
+    coverage, _ = ci.command("coverage", args)
+    assert [option for option in coverage if "artifacts/tests" in option] == [
+        "--cov-report=xml:artifacts/tests/coverage/coverage.xml",
+        "--cov-report=lcov:artifacts/tests/coverage/coverage.info",
+    ]
+    with pytest.raises(ValueError, match="svg"):
+        ci.report_options("xml,svg")
+
+    # The html report must not be ignored by git, as in the coverage action
+    monkeypatch.chdir(tmp_path)
+
+    def write_report(argv, env, log):
+        html = tmp_path / "artifacts" / "tests" / "html-coverage"
+        html.mkdir(parents=True)
+        (html / ".gitignore").write_text("*\n")
+        (html / "index.html").write_text("")
+        return 0
+
+    result = ci.run_stage("coverage", args, str(tmp_path), write_report)
+    assert result["status"] == "success"
+    html = tmp_path / "artifacts" / "tests" / "html-coverage"
+    assert sorted(path.name for path in html.iterdir()) == ["index.html"]
+
+
+def test_run_all_runs_pre_commit_first_then_the_rest_concurrently(
+    ci, args, tmp_path, monkeypatch
+):
+    """Test that independent stages overlap and pre-commit runs alone."""
+    monkeypatch.chdir(tmp_path)
+    spans, lock = {}, threading.Lock()
+
+    def runner(argv, env, log):
+        start = time.monotonic()
+        time.sleep(0.2)
+        with lock:
+            spans[os.path.basename(log)[: -len(".log")]] = (start, time.monotonic())
+        return 1 if "deptry" in argv else 0
+
+    stages = ["pre-commit", "test", "pdoc", "deptry"]
+    results = ci.run_all(stages, args, "logs", runner=runner)
+
+    assert [r["stage"] for r in results] == stages
+    assert [r["status"] for r in results] == [
+        "success",
+        "success",
+        "success",
+        "failure",
+    ]
+    first = spans.pop("pre-commit")
+    assert all(start >= first[1] for start, _ in spans.values())
+    assert max(s for s, _ in spans.values()) < min(e for _, e in spans.values())
+
+
+def test_main_writes_outputs_and_fails(ci, tmp_path, monkeypatch, capsys):
+    """Test the step outputs, the summary and the exit status of a failure."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        ci, "run_command", lambda argv, env, log: 0 if "pytest" in argv else 2
+    )
+    output, summary = tmp_path / "output", tmp_path / "summary"
+    argv = ["--stages", "test,pdoc", "--output", str(output), "--summary", str(summary)]
+
+    assert ci.main(argv) == 1
+    assert output.read_text().splitlines() == [
+        "test=success",
+        "pdoc=failure",
+        'results={"test": "success", "pdoc": "failure"}',
+    ]
+    assert "| pdoc | ❌ failure |" in summary.read_text()
+    assert "::error::Stage pdoc failed" in capsys.readouterr().out
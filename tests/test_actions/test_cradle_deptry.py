@@ -0,0 +1,141 @@
+"""Tests for the cradle_deptry helper shipped with the deptry action.
+
+This module checks the per-file cache around deptry's import extraction with a
+stand-in extractor, and the whole command when deptry is installed.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+
+@dataclass
+class Location:
+    """The location of an import, like deptry's."""
+
+    file: Path
+    line: int | None = None
+    column: int | None = None
+    ignored_rule_codes: frozenset[str] = frozenset()
+
+
+@pytest.fixture
+def cradle_deptry(action_module):
+    """Return the cradle_deptry module."""
+    return action_module("deptry", "cradle_deptry")
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a project with two modules."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("import numpy\n")
+    (tmp_path / "src" / "b.py").write_text("import pandas\nimport numpy\n")
+    return tmp_path
+
+
+def extract(files):
+    """Return the imports of the files, as deptry's extractor does."""
+    modules = {}
+    for path in files:
+        for number, line in enumerate(Path(path).read_text().splitlines(), 1):
+            ignored = re.search(r"# deptry: ignore\[(.*)\]", line)
+            codes = frozenset(ignored.group(1).split(",")) if ignored else frozenset()
+            modules.setdefault(line.split()[1], []).append(
+                Location(path, number, 8, codes)
+            )
+    return modules
+
+
+def test_cache_parses_only_changed_files(cradle_deptry, project, tmp_path):
+    """Test that unchanged files come from the cache and results are merged."""
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    files = sorted((project / "src").glob("*.py"))
+    parsed = []
+
+    def counting(paths):
+        parsed.append([path.name for path in paths])
+        return extract(paths)
+
+    used = set()
+    first = cradle_deptry.cached_extractor(counting, Location, cache, "1", used)(files)
+    assert first == extract(files)
+    assert len(list(cache.iterdir())) == 2
+
+    (project / "src" / "a.py").write_text("import scipy\n")
+    used = set()
+    second = cradle_deptry.cached_extractor(counting, Location, cache, "1", used)(files)
+    assert parsed == [["a.py", "b.py"], ["a.py"]]
+    assert sorted(second) == ["numpy", "pandas", "scipy"]
+    assert second["numpy"] == [Location(files[1], 2, 8)]
+
+    cradle_deptry.prune(cache, used)
+    assert len(list(cache.iterdir())) == 2
+
+
+def test_cache_keeps_ignored_rule_codes(cradle_deptry, project, tmp_path):
+    """Test that inline ignore comments survive a cold and a warm cache."""
+    (project / "src" / "a.py").write_text(
+        "import requests  # deptry: ignore[DEP001,DEP003]\n"
+    )
+    files = sorted((project / "src").glob("*.py"))
+    cache = tmp_path / "cache"
+    cache.mkdir()
+
+    for _ in range(2):
+        found = cradle_deptry.cached_extractor(extract, Location, cache, "1", set())(
+            files
+        )
+        assert found == extract(files)
+        assert found["requests"][0].ignored_rule_codes == {"DEP001", "DEP003"}
+        assert found["numpy"][0].ignored_rule_codes == frozenset()
+
+
+def test_file_key_depends_on_version(cradle_deptry, project):
+    """Test that another deptry version does not reuse the cached imports."""
+    path = project / "src" / "a.py"
+    assert cradle_deptry.file_key(path, "1") != cradle_deptry.file_key(path, "2")
+
+
+def test_main_reports_like_deptry(cradle_deptry, project, tmp_path, monkeypatch):
+    """Test that the wrapped deptry writes the same JSON report twice."""
+    pytest.importorskip("deptry")
+    (project / "pyproject.toml").write_text(
+        '[project]\nname = "demo"\nversion = "0.1"\ndependencies = []\n'
+    )
+    monkeypatch.chdir(project)
+    reports = []
+    for run in range(2):
+        report = tmp_path / f"report{run}.json"
+        with pytest.raises(SystemExit):
+            cradle_deptry.main(
+                [
+                    "--cache-dir",
+                    str(tmp_path / "cache"),
+                    "src",
+                    "--json-output",
+                    str(report),
+                ]
+            )
+        reports.append(json.loads(report.read_text()))
+    assert reports[0] == reports[1]
+    assert {issue["module"] for issue in reports[0]} >= {"numpy", "pandas"}
+
+
+def test_main_keeps_inline_ignores(cradle_deptry, project, tmp_path, monkeypatch):
+    """Test that deptry honours an inline ignore with a cold and a warm cache."""
+    pytest.importorskip("deptry")
+    (project / "pyproject.toml").write_text(
+        '[project]\nname = "demo"\nversion = "0.1"\ndependencies = []\n'
+    )
+    (project / "src" / "b.py").unlink()
+    (project / "src" / "a.py").write_text("import numpy  # deptry: ignore[DEP001]\n")
+    monkeypatch.chdir(project)
+    for _ in range(2):
+        with pytest.raises(SystemExit) as exit_info:
+            cradle_deptry.main(["--cache-dir", str(tmp_path / "cache"), "src"])
+        assert exit_info.value.code == 0
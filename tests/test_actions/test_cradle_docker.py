@@ -0,0 +1,317 @@
+"""Tests for the cradle_docker helper shipped with the docker action.
+
+This module checks the parsing of image timestamps, the classification of the
+history entries of an image as reused from the layer cache or built anew, the
+detection of shared stages, the parallel builds and the retried push. The push
+is also run against a local registry container standing in for ghcr.io, when
+podman and buildah are installed.
+"""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import time
+import urllib.request
+
+import pytest
+
+
+@pytest.fixture
+def docker(action_module):
+    """Return the cradle_docker module."""
+    return action_module("docker", "cradle_docker")
+
+
+def test_parse_time_handles_go_timestamps(docker):
+    """Test that nanoseconds, Z and offsets are all understood."""
+    assert docker.parse_time("1970-01-01T00:01:40Z") == 100.0
+    assert docker.parse_time("1970-01-01T00:01:40.123456789Z") == pytest.approx(
+        100.123456
+    )
+    assert docker.parse_time("1970-01-01T01:01:40+01:00") == 100.0
+    with pytest.raises(ValueError, match="RFC 3339"):
+        docker.parse_time("yesterday")
+
+
+def test_classify_splits_reused_and_built(docker):
+    """Test that entries older than the build start count as reused."""
+    entries = [
+        {"created": "1970-01-01T00:00:10Z", "created_by": "/bin/sh -c #(nop) ADD file"},
+        {
+            "created": "1970-01-01T00:00:20Z",
+            "created_by": "/bin/sh -c #(nop) ENV A=1",
+            "empty_layer": True,
+        },
+        {"created": "1970-01-01T00:01:50Z", "created_by": "/bin/sh -c uv sync"},
+        {"created_by": "COPY . ."},
+    ]
+    rows = docker.classify(entries, since=100)
+
+    assert [row["status"] for row in rows] == ["reused", "reused", "built", "unknown"]
+    assert [row["empty"] for row in rows] == [False, True, False, False]
+    assert rows[1]["instruction"] == "ENV A=1"
+
+
+def test_markdown_counts_hits(docker):
+    """Test that the summary counts the reused steps and escapes the table."""
+    rows = [
+        {"instruction": "RUN a | b", "empty": False, "status": "reused"},
+        {"instruction": "RUN " + "x" * 200, "empty": False, "status": "built"},
+    ]
+    report = docker.markdown("ghcr.io/o/r:latest", rows)
+
+    assert "**1** of **2** steps reused" in report
+    assert "`RUN a \\| b`" in report
+    assert "x" * 200 not in report
+
+
+API = """# syntax=docker/dockerfile:1
+ARG PY=3.12
+FROM python:${PY}-slim AS base
+RUN pip install \\
+    uv
+FROM base AS deps
+COPY uv.lock .
+RUN uv sync
+FROM deps
+COPY api api
+"""
+
+WEB = """ARG PY=3.12
+FROM python:${PY}-slim as base
+RUN pip   install uv
+FROM base AS deps
+COPY uv.lock .
+RUN uv sync
+FROM deps AS final
+COPY web web
+"""
+
+
+def test_stages_key_on_content(docker):
+    """Test that stages are keyed on their instructions and their base."""
+    api, web = docker.stages(API), docker.stages(WEB)
+
+    assert sorted(api) == ["base", "deps"]
+    assert api["deps"][1] == "base"
+    # Formatting and the case of keywords do not matter
+    assert api["base"] == web["base"]
+    assert api["deps"] == web["deps"]
+    assert api["base"][0] != docker.stages(WEB.replace("3.12", "3.13"))["base"][0]
+
+
+def test_shared_stages_builds_deepest_once(docker):
+    """Test that only the deepest shared stage is built up front."""
+    files = {"Dockerfile.api": API, "web/Dockerfile": WEB}
+
+    assert docker.shared_stages(list(files), read=files.get) == [
+        ("Dockerfile.api", "deps")
+    ]
+    assert docker.shared_stages(["Dockerfile.api"], read=files.get) == []
+
+
+def test_image_name(docker):
+    """Test that several Dockerfiles get one image each, named after the file."""
+    assert docker.image_name("docker/Dockerfile", "ghcr.io", "O/R", False) == (
+        "ghcr.io/o/r"
+    )
+    assert docker.image_name("Dockerfile.api", "ghcr.io", "o/r", True) == (
+        "ghcr.io/o/r/api"
+    )
+    assert docker.image_name("web.Dockerfile", "ghcr.io", "o/r", True) == (
+        "ghcr.io/o/r/web"
+    )
+    assert docker.image_name("docker/Worker/Dockerfile", "ghcr.io", "o/r", True) == (
+        "ghcr.io/o/r/worker"
+    )
+
+
+def test_build_all_prebuilds_and_pushes_each_image(docker, tmp_path, monkeypatch):
+    """Test that shared stages are built first and every image is pushed."""
+    (tmp_path / "Dockerfile.api").write_text(API)
+    (tmp_path / "Dockerfile.web").write_text(WEB)
+    monkeypatch.chdir(tmp_path)
+
+    commands = []
+
+    def fake_run(command):
+        commands.append(command)
+        if "--digestfile" in command:
+            with open(command[command.index("--digestfile") + 1], "w") as f:
+                f.write("sha256:" + command[-1][-8:])
+        return ""
+
+    monkeypatch.setattr(docker, "run", fake_run)
+    monkeypatch.setattr(docker, "inspect", lambda image: {"Size": 1000})
+
+    images = docker.build_all(
+        ["Dockerfile.api", "Dockerfile.web"],
+        ["ghcr.io/o/r/api", "ghcr.io/o/r/web"],
+        ["v1", "latest"],
+        ["--label", "a=b"],
+    )
+
+    assert "--target" in commands[0], "The shared stage must be built first"
+    assert commands[0][-4:] == ["deps", "-f", "Dockerfile.api", "."]
+    builds = [c for c in commands[1:] if c[1] == "build"]
+    assert len(builds) == 2
+    assert all("--layers" in c and "--label" in c for c in builds)
+    pushes = [c[-1] for c in commands if c[1] == "push"]
+    assert sorted(pushes) == [
+        "docker://ghcr.io/o/r/api:latest",
+        "docker://ghcr.io/o/r/api:v1",
+        "docker://ghcr.io/o/r/web:latest",
+        "docker://ghcr.io/o/r/web:v1",
+    ]
+    assert images["ghcr.io/o/r/web"]["dockerfile"] == "Dockerfile.web"
+    assert images["ghcr.io/o/r/web"]["size"] == 1000
+    assert images["ghcr.io/o/r/web"]["digest"].startswith("sha256:")
+
+
+def test_images_markdown(docker):
+    """Test that the images table shows digest, size and times."""
+    images = {
+        "ghcr.io/o/r": {
+            "dockerfile": "Dockerfile",
+            "digest": "sha256:abc",
+            "size": 12_300_000,
+            "build_seconds": 10.0,
+            "push_seconds": 2.5,
+        }
+    }
+    assert (
+        "| `ghcr.io/o/r` | `sha256:abc` | 12.3 MB | 10.0 s | 2.5 s |"
+        in docker.images_markdown(images)
+    )
+
+
+def test_push_retries_with_backoff(docker, monkeypatch):
+    """Test that a failed push is retried after doubling waits."""
+    failures = iter([True, True, False])
+
+    def flaky_run(command):
+        if next(failures):
+            raise RuntimeError("502 Bad Gateway")
+        with open(command[command.index("--digestfile") + 1], "w") as f:
+            f.write("sha256:abc")
+        return ""
+
+    waits = []
+    monkeypatch.setattr(docker, "run", flaky_run)
+    pushed = docker.push(
+        "o/r",
+        "ghcr.io/o/r",
+        ["v1"],
+        options=["--compression-format", "zstd"],
+        retries=3,
+        delay=1.5,
+        sleep=waits.append,
+    )
+
+    assert pushed == {"digest": "sha256:abc", "attempts": 3}
+    assert waits == [1.5, 3.0]
+
+
+def test_push_gives_up_after_retries(docker, monkeypatch):
+    """Test that the last failure is raised once the retries are used up."""
+
+    def broken_run(command):
+        raise RuntimeError("unauthorized")
+
+    monkeypatch.setattr(docker, "run", broken_run)
+    with pytest.raises(RuntimeError, match="unauthorized"):
+        docker.push("o/r", "ghcr.io/o/r", ["v1"], retries=2, sleep=lambda _: None)
+
+
+def test_push_options_set_parallel_copies(docker, monkeypatch):
+    """Test that the number of concurrent uploads goes to a containers.conf."""
+    monkeypatch.delenv("CONTAINERS_CONF_OVERRIDE", raising=False)
+    parser = docker.argparse.ArgumentParser()
+    docker.push_arguments(parser)
+    args = parser.parse_args(["--compression-format", "zstd:chunked", "--jobs", "4"])
+
+    options = docker.push_options(args)
+
+    assert options["options"] == ["--compression-format", "zstd:chunked"]
+    with open(docker.os.environ["CONTAINERS_CONF_OVERRIDE"]) as f:
+        assert "image_parallel_copies = 4" in f.read()
+
+
+def test_sent_bytes(docker, tmp_path):
+    """Test that sent bytes are summed over the interfaces, loopback on request."""
+    dev = tmp_path / "dev"
+    dev.write_text(
+        "Inter-|   Receive |  Transmit\n"
+        " face |bytes packets errs drop fifo frame compressed multicast|bytes\n"
+        "    lo: 100 1 0 0 0 0 0 0 70 1 0 0 0 0 0 0\n"
+        "  eth0: 900 9 0 0 0 0 0 0 500 5 0 0 0 0 0 0\n"
+    )
+    assert docker.sent_bytes(path=str(dev)) == 500
+    assert docker.sent_bytes(loopback=True, path=str(dev)) == 570
+    assert docker.sent_bytes(path=str(tmp_path / "missing")) is None
+    assert docker.is_local("localhost:5000/o")
+    assert not docker.is_local("ghcr.io")
+
+
+@pytest.fixture
+def local_registry():
+    """Start a registry container on a free port and return its address."""
+    if not (shutil.which("podman") and shutil.which("buildah")):
+        pytest.skip("podman and buildah are needed for a local registry")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    name = f"cradle-test-registry-{port}"
+    started = subprocess.run(
+        ["podman", "run", "-d", "--rm", "--name", name, "-p", f"{port}:5000"]
+        + ["docker.io/library/registry:2"],
+        check=False,
+        capture_output=True,
+    )
+    if started.returncode != 0:
+        pytest.skip(f"cannot start a registry: {started.stderr.decode()}")
+    try:
+        for _ in range(50):
+            try:
+                urllib.request.urlopen(f"http://localhost:{port}/v2/")
+                break
+            except OSError:
+                time.sleep(0.2)
+        yield f"localhost:{port}"
+    finally:
+        subprocess.run(["podman", "stop", name], check=False)
+
+
+def test_push_to_local_registry(docker, local_registry, tmp_path):
+    """Test a zstd push and that a second push skips the blobs already there."""
+    (tmp_path / "payload").write_bytes(os.urandom(2_000_000))
+    (tmp_path / "Dockerfile").write_text("FROM scratch\nCOPY payload /payload\n")
+    docker.run(["buildah", "build", "-t", "localhost/cradle-test:v1", str(tmp_path)])
+    destination = f"{local_registry}/cradle-test"
+    options = ["--tls-verify=false", "--compression-format", "zstd"]
+
+    try:
+        before = docker.sent_bytes(loopback=True)
+        first = docker.push("localhost/cradle-test", destination, ["v1"], options)
+        middle = docker.sent_bytes(loopback=True)
+        docker.run(["buildah", "tag", "localhost/cradle-test:v1", "cradle-test:v2"])
+        second = docker.push("localhost/cradle-test", destination, ["v2"], options)
+        after = docker.sent_bytes(loopback=True)
+    finally:
+        docker.run(["buildah", "rmi", "-f", "localhost/cradle-test:v1"])
+
+    assert first["digest"].startswith("sha256:")
+    assert second["digest"] == first["digest"]
+    # The random payload does not compress: it is sent once, not twice
+    assert middle - before > 2_000_000
+    assert after - middle < 500_000
+
+    request = urllib.request.Request(
+        f"http://{destination.replace('/', '/v2/', 1)}/manifests/v1",
+        headers={"Accept": "application/vnd.oci.image.manifest.v1+json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        manifest = json.load(response)
+    assert manifest["layers"][0]["mediaType"].endswith("+zstd")
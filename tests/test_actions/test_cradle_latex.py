@@ -0,0 +1,107 @@
+"""Tests for the cradle_latex helper shipped with the latex action.
+
+This module checks the expansion of the document globs, the source hash that
+decides whether a document is compiled again, and that a failing document does
+not stop the others from compiling.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def latex(action_module):
+    """Return the cradle_latex module."""
+    return action_module("latex", "cradle_latex")
+
+
+@pytest.fixture
+def papers(tmp_path, monkeypatch):
+    """Create two papers and a slide deck and change into their folder."""
+    for name in ("a", "b"):
+        (tmp_path / "papers" / name).mkdir(parents=True)
+        (tmp_path / "papers" / name / "main.tex").write_text(f"paper {name}")
+    (tmp_path / "slides").mkdir()
+    (tmp_path / "slides" / "talk.tex").write_text("slides")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def fake_tectonic(fail=()):
+    """Return a runner that writes a PDF, or fails for the given documents."""
+    calls = []
+
+    def run(document, outdir, keep):
+        calls.append(document)
+        if document in fail:
+            return 1, "! Undefined control sequence.\nerror: halted\n"
+        stem = document.rsplit("/", 1)[-1][: -len(".tex")]
+        with open(f"{outdir}/{stem}.pdf", "w") as f:
+            f.write("%PDF")
+        return 0, "note: writing main.pdf\n"
+
+    run.calls = calls
+    return run
+
+
+def test_expand_globs_and_lists(latex, papers):
+    """Test that globs and comma or newline separated paths are all expanded."""
+    assert latex.expand("papers/**/main.tex,\nslides/talk.tex") == [
+        "papers/a/main.tex",
+        "papers/b/main.tex",
+        "slides/talk.tex",
+    ]
+    assert latex.expand("missing.tex") == ["missing.tex"]
+
+
+def test_source_hash_ignores_outputs(latex, papers):
+    """Test that only the sources, not the compiled outputs, change the hash."""
+    before = latex.source_hash("papers/a/main.tex")
+    (papers / "papers" / "a" / "compiled").mkdir()
+    (papers / "papers" / "a" / "compiled" / "main.pdf").write_text("%PDF")
+    assert latex.source_hash("papers/a/main.tex") == before
+
+    (papers / "papers" / "a" / "refs.bib").write_text("@book{}")
+    assert latex.source_hash("papers/a/main.tex") != before
+
+
+def test_compile_all_reports_every_failure(latex, papers):
+    """Test that a failing document does not stop the others."""
+    runner = fake_tectonic(fail={"papers/a/main.tex"})
+    documents = latex.expand("papers/*/main.tex,slides/talk.tex,gone.tex")
+    results = latex.compile_all(documents, jobs=2, runner=runner)
+
+    assert [r["status"] for r in results] == ["failed", "ok", "ok", "missing"]
+    assert sorted(runner.calls) == sorted(documents[:3])
+    assert "Undefined control sequence" in latex.tail(results[0]["log"])
+    assert (papers / "slides" / "compiled" / "talk.tectonic.log").exists()
+
+
+def test_unchanged_documents_are_skipped(latex, papers):
+    """Test that a document is only compiled again when its sources change."""
+    runner = fake_tectonic()
+    latex.compile_all(["papers/a/main.tex"], runner=runner)
+    results = latex.compile_all(["papers/a/main.tex"], runner=runner)
+    assert results[0]["status"] == "unchanged"
+    assert len(runner.calls) == 1
+
+    (papers / "papers" / "a" / "main.tex").write_text("paper a, revised")
+    results = latex.compile_all(["papers/a/main.tex"], runner=runner)
+    assert results[0]["status"] == "ok"
+    assert len(runner.calls) == 2
+
+
+def test_main_fails_with_summary(latex, papers, monkeypatch, capsys):
+    """Test that the command lists the failed documents and exits with 1."""
+    monkeypatch.setattr(latex, "run_tectonic", fake_tectonic(fail={"slides/talk.tex"}))
+    summary = papers / "summary.md"
+
+    status = latex.main(
+        ["--documents", "papers/*/main.tex,slides/talk.tex"]
+        + ["--keep-intermediates", "--summary", str(summary)]
+    )
+
+    output = capsys.readouterr().out
+    assert status == 1
+    assert "::error file=slides/talk.tex::" in output
+    assert "1 of 3 document(s) failed" in output
+    assert "| `papers/a/main.tex` | ✅ ok |" in summary.read_text()
@@ -0,0 +1,133 @@
+"""Tests for the cradle_pages helper shipped with the book action.
+
+This module checks the manifest of content hashes written with the site and
+its comparison with the manifest of the deployed site.
+"""
+
+import http.server
+import json
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def pages(action_module):
+    """Return the cradle_pages module."""
+    return action_module("book", "cradle_pages")
+
+
+@pytest.fixture
+def site(tmp_path):
+    """Create a small site with coverage and pdoc output."""
+    (tmp_path / "tests" / "html-coverage").mkdir(parents=True)
+    (tmp_path / "tests" / "html-coverage" / "index.html").write_text("coverage")
+    (tmp_path / "pdoc").mkdir()
+    (tmp_path / "pdoc" / "cvx.html").write_text("docs")
+    return tmp_path
+
+
+def test_manifest_lists_every_file(pages, site):
+    """Test that the manifest holds hash and size of all files but itself."""
+    (site / pages.MANIFEST).write_text("{}")
+    result = pages.manifest(str(site), "inputs")
+
+    assert sorted(result["files"]) == [
+        "pdoc/cvx.html",
+        "tests/html-coverage/index.html",
+    ]
+    assert result["files"]["pdoc/cvx.html"]["size"] == 4
+
+
+def test_compare_with_deployed_manifest(pages, site):
+    """Test that added, changed, removed and unchanged files are told apart."""
+    old = pages.manifest(str(site), "inputs")
+    old["files"]["gone.html"] = {"sha256": "0", "size": 10}
+    (site / "pdoc" / "cvx.html").write_text("new docs")
+    (site / "pdoc" / "extra.html").write_text("extra")
+
+    diff = pages.compare(old, pages.manifest(str(site), "inputs"))
+
+    assert diff["added"] == ["pdoc/extra.html"]
+    assert diff["changed"] == ["pdoc/cvx.html"]
+    assert diff["removed"] == ["gone.html"]
+    assert diff["unchanged"] == ["tests/html-coverage/index.html"]
+    assert diff["changed_bytes"] == 13
+    assert diff["unchanged_bytes"] == 8
+    assert not diff["page_changed"]
+    assert not pages.is_unchanged(diff)
+
+
+def test_unchanged_site_and_page(pages, site):
+    """Test that only a change of files or book inputs counts as a change."""
+    old = pages.manifest(str(site), "inputs")
+
+    assert pages.is_unchanged(pages.compare(old, pages.manifest(str(site), "inputs")))
+    assert not pages.is_unchanged(
+        pages.compare(old, pages.manifest(str(site), "other inputs"))
+    )
+    assert not pages.is_unchanged(pages.compare(None, old)), "First deploy"
+
+
+@pytest.mark.parametrize(
+    ("deployed_commit", "changed"),
+    [("aaa", "false"), ("ccc", "true"), ("", "true")],
+)
+def test_main_skips_unchanged_deploy(
+    pages, site, monkeypatch, tmp_path, deployed_commit, changed
+):
+    """Test that only an unchanged site of the live deployment skips the deploy."""
+    deployed = pages.manifest(str(site), "inputs", "aaa")
+    monkeypatch.setattr(pages, "fetch", lambda url: json.loads(json.dumps(deployed)))
+    output, summary = tmp_path / "output", tmp_path / "summary.md"
+
+    pages.main(
+        ["--site", str(site), "--url", "https://o.github.io/r", "--fingerprint"]
+        + ["inputs", "--skip-unchanged", "--output", str(output)]
+        + ["--summary", str(summary), "--commit", "bbb"]
+        + ["--deployed-commit", deployed_commit]
+    )
+
+    assert output.read_text() == f"changed={changed}\n"
+    skipped = "skipped uploading and deploying" in summary.read_text()
+    assert skipped == (changed == "false")
+    written = json.loads((site / pages.MANIFEST).read_text())
+    assert written == {**deployed, "commit": "bbb"}
+
+
+def test_fetch_without_site(pages):
+    """Test that a missing deployment means there is no manifest to compare."""
+    assert pages.fetch("") is None
+    assert pages.fetch("http://127.0.0.1:9", timeout=1) is None
+
+
+def test_fetch_bypasses_the_cdn_cache(pages):
+    """Test that every fetch asks for a fresh copy of the deployed manifest."""
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append((self.path, self.headers.get("Cache-Control")))
+            body = json.dumps({"commit": "aaa", "files": {}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/site/"
+        assert pages.fetch(url) == {"commit": "aaa", "files": {}}
+        pages.fetch(url)
+    finally:
+        server.shutdown()
+
+    paths = [path for path, _ in requests]
+    assert all(path.startswith(f"/site/{pages.MANIFEST}?nocache=") for path in paths)
+    assert paths[0] != paths[1]
+    assert {header for _, header in requests} == {"no-cache"}
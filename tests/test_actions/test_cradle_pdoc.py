@@ -0,0 +1,166 @@
+"""Tests for the cradle_pdoc helper shipped with the pdoc action.
+
+This module checks how the dependencies of a module are found and how they
+feed into the per-module cache keys, and that an incremental build renders
+only the changed modules yet writes the same files as a full pdoc run, also
+when the modules are rendered in worker processes.
+"""
+
+import filecmp
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pdoc")
+
+PACKAGE = {
+    "cradledemo/__init__.py": '"""Demo package, see `cradledemo.sub.tools.helper`."""\n'
+    "from .core import Base\n",
+    "cradledemo/core.py": '"""Core module."""\n\n\nclass Base:\n'
+    '    """A base class."""\n\n    def run(self, x: int) -> int:\n'
+    '        """Run it."""\n        return x\n',
+    "cradledemo/other.py": '"""Unrelated module."""\n\n\ndef other():\n'
+    '    """Do something else."""\n',
+    "cradledemo/sub/__init__.py": '"""Sub package."""\n',
+    "cradledemo/sub/tools.py": '"""Tools built on `Base`."""\n\nfrom ..core import Base\n\n\n'
+    'def helper(a, b=2):\n    """Help with a and b."""\n    return a + b\n\n\n'
+    'class Derived(Base):\n    """Derived class."""\n',
+}
+
+
+@pytest.fixture
+def pdoc_helper(action_module):
+    """Return the cradle_pdoc module."""
+    return action_module("pdoc", "cradle_pdoc")
+
+
+@pytest.fixture
+def package(tmp_path):
+    """Write the demo package and return the folder it lives in."""
+    src = tmp_path / "src"
+    for name, text in PACKAGE.items():
+        (src / name).parent.mkdir(parents=True, exist_ok=True)
+        (src / name).write_text(text)
+    return src
+
+
+def run_pdoc(src, output, *prefix):
+    """Run pdoc (or the helper, given as prefix) on the demo package."""
+    helper_dir = os.path.join(os.path.dirname(__file__), "..", "..", "actions", "pdoc")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(src), helper_dir])}
+    command = [sys.executable, *prefix, "-o", str(output), "cradledemo"]
+    result = subprocess.run(
+        command, check=False, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def same_tree(left, right):
+    """Return whether two folders hold the same files with the same content."""
+    compare = filecmp.dircmp(left, right)
+    if compare.left_only or compare.right_only or compare.funny_files:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(
+        left, right, compare.common_files, shallow=False
+    )
+    return (
+        not mismatch
+        and not errors
+        and all(
+            same_tree(os.path.join(left, d), os.path.join(right, d))
+            for d in compare.common_dirs
+        )
+    )
+
+
+def test_dependencies(pdoc_helper):
+    """Test that imports, relative imports and named modules are dependencies."""
+    modules = {"pkg", "pkg.core", "pkg.sub", "pkg.sub.tools", "pkg.other"}
+    source = b'"""See `pkg.other.f`."""\nfrom ..core import Base\nimport json\n'
+
+    found = pdoc_helper.dependencies("pkg.sub.tools", source, modules)
+    assert found == {"pkg", "pkg.core", "pkg.other"}
+
+    found = pdoc_helper.dependencies("pkg", b"from . import core\n", modules, True)
+    assert found == {"pkg.core"}
+
+
+def test_module_keys_follow_indirect_dependencies(pdoc_helper):
+    """Test that a change reaches the modules depending on it, even indirectly."""
+    names = ["a", "b", "c", "d"]
+    direct = {"a": {"b"}, "b": {"c"}, "c": set(), "d": set()}
+    sources = {name: name.encode() for name in names}
+    before = pdoc_helper.module_keys(names, sources, direct, "context")
+
+    after = pdoc_helper.module_keys(names, {**sources, "c": b"new"}, direct, "context")
+    assert [before[n] != after[n] for n in names] == [True, True, True, False]
+
+    other = pdoc_helper.module_keys(names, sources, direct, "other context")
+    assert all(before[n] != other[n] for n in names)
+
+
+def test_incremental_build_matches_full_build(package, tmp_path):
+    """Test that only changed modules are rendered and the output matches pdoc."""
+    cache = tmp_path / "cache"
+    helper = ["-m", "cradle_pdoc", "--cache-dir", str(cache)]
+
+    first = run_pdoc(package, tmp_path / "first", *helper)
+    assert "rendered 5 changed module(s)" in first
+    run_pdoc(package, tmp_path / "full", "-m", "pdoc")
+    assert same_tree(tmp_path / "full", tmp_path / "first")
+
+    again = run_pdoc(package, tmp_path / "again", *helper)
+    assert "rendered 0 changed module(s)" in again
+    assert same_tree(tmp_path / "full", tmp_path / "again")
+
+    core = package / "cradledemo" / "core.py"
+    core.write_text(core.read_text().replace("A base class.", "The base class."))
+    changed = run_pdoc(package, tmp_path / "changed", *helper)
+    rendered = set(changed.splitlines()[1:])
+    assert {line.strip() for line in rendered} == {
+        "cradledemo",
+        "cradledemo.core",
+        "cradledemo.sub.tools",
+    }
+    run_pdoc(package, tmp_path / "full-changed", "-m", "pdoc")
+    assert same_tree(tmp_path / "full-changed", tmp_path / "changed")
+    assert len(list(cache.glob("*.json"))) == 5
+
+
+def test_split_keeps_neighbours_together(pdoc_helper):
+    """Test that the modules are split into contiguous shares of similar size."""
+    names = [f"m{i}" for i in range(7)]
+    assert pdoc_helper.split(names, 3) == [
+        ["m0", "m1", "m2"],
+        ["m3", "m4"],
+        ["m5", "m6"],
+    ]
+    assert pdoc_helper.split(names[:2], 4) == [["m0"], ["m1"]]
+
+
+def test_parallel_build_matches_full_build(package, tmp_path):
+    """Test that worker processes produce the same output as pdoc."""
+    output = run_pdoc(
+        package, tmp_path / "parallel", "-m", "cradle_pdoc", "--workers", "3"
+    )
+    assert "rendered 5 changed module(s)" in output
+    run_pdoc(package, tmp_path / "full", "-m", "pdoc")
+    assert same_tree(tmp_path / "full", tmp_path / "parallel")
+
+
+def test_benchmark_package(action_module, tmp_path):
+    """Test that the benchmark writes a package whose modules build on each other."""
+    benchmark = action_module("pdoc", "cradle_pdoc_benchmark")
+    package = benchmark.write_package(str(tmp_path), 3)
+
+    assert sorted(os.listdir(package)) == [
+        "__init__.py",
+        "mod_0000.py",
+        "mod_0001.py",
+        "mod_0002.py",
+    ]
+    with open(os.path.join(package, "mod_0002.py")) as f:
+        assert "from .mod_0001 import Base1 as Parent" in f.read()
@@ -0,0 +1,113 @@
+"""Tests for the cradle_precommit helper shipped with the pre-commit action.
+
+This module checks that the hooks running on Node.js are found from the config,
+from the manifests in pre-commit's store, and from fetched manifests.
+"""
+
+import sqlite3
+
+import pytest
+
+CONFIG = """\
+repos:
+  - repo: https://github.com/astral-sh/ruff-pre-commit
+    rev: 'v0.9.0'  # ruff
+    hooks:
+      - id: ruff
+      - id: ruff-format
+  - repo: https://github.com/rbubley/mirrors-prettier
+    rev: v3.4.2
+    hooks:
+      - id: prettier
+  - repo: local
+    hooks:
+      - id: check
+        name: check
+        entry: ./check.sh
+        language: system
+"""
+
+RUFF = """\
+- id: ruff
+  name: ruff
+  language: python
+- id: ruff-format
+  language: python
+"""
+
+PRETTIER = """\
+-   id: prettier
+    name: prettier
+    entry: prettier --write
+    language: node
+"""
+
+
+@pytest.fixture
+def precommit(action_module):
+    """Return the cradle_precommit module."""
+    return action_module("pre-commit", "cradle_precommit")
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a pre-commit store holding a clone of ruff-pre-commit."""
+    clone = tmp_path / "repoabc"
+    clone.mkdir()
+    (clone / ".pre-commit-hooks.yaml").write_text(RUFF)
+    with sqlite3.connect(tmp_path / "db.db") as connection:
+        connection.execute(
+            "CREATE TABLE repos (repo TEXT, ref TEXT, path TEXT, PRIMARY KEY (repo, ref))"
+        )
+        connection.execute(
+            "INSERT INTO repos VALUES (?, ?, ?)",
+            ("https://github.com/astral-sh/ruff-pre-commit", "v0.9.0", str(clone)),
+        )
+    return tmp_path
+
+
+def test_parse_config(precommit):
+    """Test that repositories, revisions, hooks and languages are read."""
+    repos = precommit.parse_config(CONFIG)
+    assert [repo["rev"] for repo in repos] == ["v0.9.0", "v3.4.2", ""]
+    assert repos[0]["hooks"] == {"ruff": None, "ruff-format": None}
+    assert repos[2] == {"repo": "local", "rev": "", "hooks": {"check": "system"}}
+
+
+def test_needs_node_reads_store_and_fetches_the_rest(precommit, store):
+    """Test that cached manifests are not fetched and node hooks are found."""
+    fetched = []
+
+    def fetch(repo, rev):
+        fetched.append((repo, rev))
+        return PRETTIER
+
+    node, hooks, unknown = precommit.needs_node(
+        precommit.parse_config(CONFIG), store, fetch
+    )
+    assert node is True
+    assert hooks == ["prettier"]
+    assert unknown == []
+    assert fetched == [("https://github.com/rbubley/mirrors-prettier", "v3.4.2")]
+
+
+def test_needs_node_false_for_python_hooks(precommit, store):
+    """Test that a config of Python and system hooks needs no Node."""
+    config = CONFIG.split("  - repo: https://github.com/rbubley")[0]
+    node, hooks, _ = precommit.needs_node(
+        precommit.parse_config(config), store, lambda repo, rev: None
+    )
+    assert (node, hooks) == (False, [])
+
+
+def test_unreadable_manifest_installs_node(precommit, tmp_path, capsys, monkeypatch):
+    """Test that a manifest which cannot be read makes the answer true."""
+    config = tmp_path / ".pre-commit-config.yaml"
+    config.write_text(CONFIG)
+    output = tmp_path / "output"
+    monkeypatch.setattr(precommit, "manifest_from_remote", lambda repo, rev: None)
+
+    argv = ["--config", str(config), "--store", str(tmp_path), "--output", str(output)]
+    assert precommit.main(argv) == 0
+    assert output.read_text() == "node=true\n"
+    assert "::warning::Could not read the hooks" in capsys.readouterr().out
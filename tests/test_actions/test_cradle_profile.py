@@ -0,0 +1,129 @@
+"""Tests for the cradle_profile helper shipped with the profile action.
+
+This module checks the /proc parsing, the start/stop bookkeeping of a step and
+the markdown and JSON reports.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+@pytest.fixture
+def profile(action_module, tmp_path, monkeypatch):
+    """Return the cradle_profile module, writing records to a temporary folder."""
+    monkeypatch.setenv("CRADLE_PROFILE_DIR", str(tmp_path / "profile"))
+    return action_module("profile", "cradle_profile")
+
+
+def test_received_bytes(profile, tmp_path):
+    """Test that received bytes are summed over all interfaces but loopback."""
+    net_dev = tmp_path / "dev"
+    net_dev.write_text(
+        "Inter-|   Receive\n"
+        " face |bytes    packets\n"
+        "    lo: 5000 10 0 0 0 0 0 0 5000 10 0 0 0 0 0 0\n"
+        "  eth0: 1200 3 0 0 0 0 0 0 800 2 0 0 0 0 0 0\n"
+        "  eth1:   34 1 0 0 0 0 0 0 0 0 0 0 0 0 0 0\n"
+    )
+    assert profile.received_bytes(str(net_dev)) == 1234
+    assert profile.received_bytes(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def test_process_tree_rss(profile):
+    """Test that the RSS of a process tree includes its children."""
+    child = subprocess.Popen(  # nosec B603
+        [sys.executable, "-c", "x = bytearray(50_000_000); input()"],
+        stdin=subprocess.PIPE,
+    )
+    try:
+        # Wait until the child has allocated its memory
+        deadline = time.monotonic() + 10
+        while profile.process_tree_rss(child.pid) < 50_000_000:
+            assert time.monotonic() < deadline, "child never allocated its memory"
+            time.sleep(0.05)
+
+        assert profile.process_tree_rss(os.getpid()) > profile.process_tree_rss(
+            child.pid
+        )
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_start_and_stop_record_a_step(profile, tmp_path):
+    """Test that a started and stopped step ends up in timings.jsonl."""
+    state = profile.start("environment", "uv sync", os.getpid())
+    record = profile.stop(state, 0)
+
+    assert record["action"] == "environment"
+    assert record["step"] == "uv sync"
+    assert record["wall_seconds"] >= 0
+    assert record["exit_status"] == 0
+    assert profile.load_records() == [record]
+    # Temporary state files are cleaned up
+    assert os.listdir(tmp_path / "profile") == ["timings.jsonl"]
+
+
+def test_format_bytes(profile):
+    """Test that byte counts are formatted for humans."""
+    assert profile.format_bytes(None) == "—"
+    assert profile.format_bytes(512) == "512 B"
+    assert profile.format_bytes(1536) == "1.5 KiB"
+    assert profile.format_bytes(3 * 1024**3) == "3.0 GiB"
+
+
+def test_report(profile, tmp_path):
+    """Test that the report writes timings.json and a markdown summary."""
+    records = [
+        {
+            "action": "environment",
+            "step": "uv sync",
+            "started_at": "2026-01-01T00:00:00Z",
+            "wall_seconds": 12.5,
+            "peak_rss_bytes": 200 * 1024**2,
+            "downloaded_bytes": 50 * 1024**2,
+            "exit_status": 0,
+        },
+        {
+            "action": "test",
+            "step": "pytest",
+            "started_at": "2026-01-01T00:00:13Z",
+            "wall_seconds": 30.0,
+            "peak_rss_bytes": None,
+            "downloaded_bytes": None,
+            "exit_status": 1,
+        },
+    ]
+    folder = tmp_path / "profile"
+    folder.mkdir()
+    (folder / "timings.jsonl").write_text(
+        "".join(json.dumps(record) + "\n" for record in records)
+    )
+
+    output = tmp_path / "out" / "timings.json"
+    summary = tmp_path / "summary.md"
+    assert (
+        profile.main(["report", "--output", str(output), "--summary", str(summary)])
+        == 0
+    )
+
+    report = json.loads(output.read_text())
+    assert report == {"steps": records, "total_wall_seconds": 42.5}
+
+    table = summary.read_text()
+    assert "| environment | uv sync | 12.5 s | 200.0 MiB | 50.0 MiB | ✅ |" in table
+    assert "| test | pytest | 30.0 s | — | — | ❌ 1 |" in table
+    assert "**42.5 s**" in table
+
+
+def test_report_without_records(profile, tmp_path):
+    """Test that an empty profile still produces a report."""
+    summary = tmp_path / "summary.md"
+    assert profile.report(str(tmp_path / "timings.json"), str(summary)) == []
+    assert "No profiled steps" in summary.read_text()
@@ -0,0 +1,169 @@
+"""Tests for the cradle_pytest plugin shipped with the test action.
+
+This module checks that the sharding plugin splits a test suite into shards
+that are disjoint, cover every test exactly once and are stable between runs.
+"""
+
+import json
+import os
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def plugin(action_module):
+    """Return the cradle_pytest plugin module."""
+    return action_module("test", "cradle_pytest")
+
+
+@pytest.fixture
+def action_dir_on_path(actions_dir, monkeypatch):
+    """Make the test action's helpers importable for in-process pytest runs."""
+    monkeypatch.syspath_prepend(os.path.join(actions_dir, "test"))
+
+
+def test_shard_of_is_stable(plugin):
+    """Test that a test always lands in the same shard."""
+    nodeid = "tests/test_example.py::test_one"
+    assert plugin.shard_of(nodeid, 4) == plugin.shard_of(nodeid, 4)
+    assert 0 <= plugin.shard_of(nodeid, 4) < 4
+    assert plugin.shard_of(nodeid, 1) == 0
+
+
+def test_shards_partition_the_suite(plugin):
+    """Test that every test runs in exactly one shard."""
+    nodeids = [f"tests/test_{i // 10}.py::test_{i}" for i in range(1000)]
+    shards = {index: set() for index in range(4)}
+    for nodeid in nodeids:
+        shards[plugin.shard_of(nodeid, 4)].add(nodeid)
+
+    assert set().union(*shards.values()) == set(nodeids)
+    assert sum(len(shard) for shard in shards.values()) == len(nodeids)
+    # A stable hash spreads the tests roughly evenly
+    assert all(150 < len(shard) < 350 for shard in shards.values())
+
+
+def test_plugin_runs_each_test_once(pytester, action_dir_on_path):
+    """Test that running all shards executes every test exactly once."""
+    pytester.makepyfile(
+        test_sample="\n".join(f"def test_{i}(): pass" for i in range(20))
+    )
+
+    passed = 0
+    for index in range(3):
+        result = pytester.runpytest(
+            "-p", "cradle_pytest", f"--shard-index={index}", "--shard-total=3"
+        )
+        outcomes = result.parseoutcomes()
+        passed += outcomes.get("passed", 0)
+        assert outcomes.get("passed", 0) + outcomes.get("deselected", 0) == 20
+
+    assert passed == 20
+
+
+def test_plugin_rejects_invalid_shard(pytester, action_dir_on_path):
+    """Test that an out-of-range shard index is a usage error."""
+    pytester.makepyfile(test_sample="def test_one(): pass")
+    result = pytester.runpytest(
+        "-p", "cradle_pytest", "--shard-index=3", "--shard-total=3"
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*--shard-index must be between 0 and 2*"])
+
+
+def test_plugin_records_and_balances_timings(pytester, action_dir_on_path):
+    """Test that durations are recorded and then used to balance the shards."""
+    pytester.makepyfile(
+        test_sample="\n".join(f"def test_{i}(): pass" for i in range(10))
+    )
+    timings_file = pytester.path / "timings" / "timings.json"
+
+    # A first run records the duration of every test
+    result = pytester.runpytest("-p", "cradle_pytest", f"--timings-file={timings_file}")
+    result.assert_outcomes(passed=10)
+    recorded = json.loads(timings_file.read_text())
+    assert sorted(recorded) == sorted(f"test_sample.py::test_{i}" for i in range(10))
+
+    # Pretend one test is slow: it then gets a shard of its own
+    recorded["test_sample.py::test_0"] = 100.0
+    timings_file.write_text(json.dumps(recorded))
+    result = pytester.runpytest(
+        "-p",
+        "cradle_pytest",
+        "--shard-index=0",
+        "--shard-total=2",
+        f"--timings-file={timings_file}",
+    )
+    result.assert_outcomes(passed=1, deselected=9)
+
+
+def test_plugin_writes_timings_of_this_run(pytester, action_dir_on_path):
+    """Test that --timings-output gets only the durations measured in this run."""
+    pytester.makepyfile(test_sample="def test_a(): pass\ndef test_b(): pass")
+    timings_file = pytester.path / "timings.json"
+    timings_file.write_text(json.dumps({"test_sample.py::gone": 5.0}))
+    output = pytester.path / "run" / "timings.json"
+
+    result = pytester.runpytest(
+        "-p",
+        "cradle_pytest",
+        f"--timings-file={timings_file}",
+        f"--timings-output={output}",
+    )
+    result.assert_outcomes(passed=2)
+    assert sorted(json.loads(output.read_text())) == [
+        "test_sample.py::test_a",
+        "test_sample.py::test_b",
+    ]
+    assert json.loads(timings_file.read_text()) == {"test_sample.py::gone": 5.0}
+
+
+def test_plugin_runs_affected_tests(pytester, action_dir_on_path):
+    """Test that only tests affected by the changed files are kept."""
+    pytester.makepyfile(
+        test_core="def test_a(): pass\ndef test_b(): pass",
+        test_new="def test_c(): pass",
+    )
+    impact_map = pytester.path / "map.json"
+    impact_map.write_text(
+        json.dumps(
+            {
+                "files": {"src/core.py": ["test_core.py::test_a"]},
+                "tests": ["test_core.py::test_a", "test_core.py::test_b"],
+            }
+        )
+    )
+    changed = pytester.path / "changed.txt"
+    args = ["-p", "cradle_pytest", f"--impact-map={impact_map}"]
+
+    # test_a executed the changed file, test_c is not in the map yet
+    changed.write_text("src/core.py\n")
+    result = pytester.runpytest(*args, f"--changed-files={changed}")
+    result.assert_outcomes(passed=2, deselected=1)
+
+    # Nothing affected apart from the unknown test, and an empty run is fine
+    impact_map.write_text(
+        json.dumps(
+            {
+                "files": {},
+                "tests": [
+                    "test_core.py::test_a",
+                    "test_core.py::test_b",
+                    "test_new.py::test_c",
+                ],
+            }
+        )
+    )
+    changed.write_text("README.md\n")
+    result = pytester.runpytest(*args, f"--changed-files={changed}")
+    result.assert_outcomes(deselected=3)
+    assert result.ret == pytest.ExitCode.OK
+
+
+def test_plugin_requires_both_impact_options(pytester, action_dir_on_path):
+    """Test that --impact-map without --changed-files is a usage error."""
+    pytester.makepyfile(test_sample="def test_one(): pass")
+    result = pytester.runpytest("-p", "cradle_pytest", "--impact-map=map.json")
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
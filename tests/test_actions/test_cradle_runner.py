@@ -0,0 +1,175 @@
+"""Tests for the local runner of composite actions (tests/cradle_runner.py).
+
+This module checks the expression language, the runner files and the stubs on
+a small action, and runs the pre-commit action of this repository offline.
+"""
+
+import json
+import os
+
+import pytest
+
+ACTION = """\
+name: Demo
+description: A demo action
+inputs:
+  greeting:
+    description: Greeting
+    required: false
+    default: hello
+  fail:
+    description: Fail the second step
+    required: false
+    default: 'false'
+outputs:
+  message:
+    description: The message
+    value: ${{ steps.greet.outputs.message }}
+runs:
+  using: composite
+  steps:
+    - uses: actions/checkout@v6
+      with:
+        fetch-depth: ${{ inputs.fail == 'true' && '2' || '1' }}
+    - name: Greet
+      id: greet
+      shell: bash
+      env:
+        WHO: world
+      run: |
+        echo "message=${{ inputs.greeting }} $WHO" >> "$GITHUB_OUTPUT"
+        echo "FROM_ENV=set" >> "$GITHUB_ENV"
+        echo "## Greeted" >> "$GITHUB_STEP_SUMMARY"
+    - name: Fail
+      if: inputs.fail == 'true'
+      shell: bash
+      run: exit 3
+    - name: Read env
+      shell: bash
+      run: test "$FROM_ENV" == set
+    - name: Clean up
+      if: ${{ always() }}
+      shell: bash
+      run: echo "${{ steps.greet.outcome }}"
+"""
+
+
+@pytest.fixture
+def demo(tmp_path):
+    """Write the demo action and return its folder."""
+    folder = tmp_path / "demo"
+    folder.mkdir()
+    (folder / "action.yml").write_text(ACTION)
+    return folder
+
+
+@pytest.mark.parametrize(
+    ("expression", "value"),
+    [
+        ("inputs.flag == 'TRUE'", True),
+        ("inputs.flag != 'true' || 'fallback'", "fallback"),
+        ("inputs.flag == 'true' && '2' || '1'", "2"),
+        ("!github.event.repository.fork", True),
+        ("steps['a-b'].outputs.x", "y"),
+        ("format('{0}-{1}', 'a', 1)", "a-1"),
+        ("contains(fromJSON('[\"x\", \"y\"]'), 'Y')", True),
+        ("startsWith(github.ref, 'refs/heads/')", True),
+        ("1 < 2 && (null == 0)", True),
+    ],
+)
+def test_expressions(runner, expression, value):
+    """Test that expressions evaluate as on GitHub."""
+    contexts = {
+        "inputs": {"flag": "true"},
+        "steps": {"a-b": {"outputs": {"x": "y"}}},
+        "github": {"ref": "refs/heads/main", "event": {}},
+    }
+    assert runner.Expression(expression, contexts).evaluate() == value
+
+
+def test_run_action_passes_outputs_env_and_stubs(runner, demo, tmp_path):
+    """Test outputs, GITHUB_ENV, the summary and a callable stub."""
+    seen = []
+    run = runner.run_action(
+        demo,
+        tmp_path,
+        inputs={"greeting": "hi"},
+        stubs={"actions/checkout": lambda values, env: seen.append(values)},
+    )
+    assert run["status"] == "success"
+    assert run["outputs"] == {"message": "hi world"}
+    assert run["summary"] == "## Greeted\n"
+    assert seen == [{"fetch-depth": "1"}]
+    assert [step["kind"] for step in run["steps"]] == [
+        "stub",
+        "run",
+        "skipped",
+        "run",
+        "run",
+    ]
+    assert run["steps"][-1]["log"] == "success\n"
+    assert all(step["seconds"] >= 0 for step in run["steps"])
+
+
+def test_failure_skips_later_steps(runner, demo, tmp_path):
+    """Test that a failing step skips the rest but not always() steps."""
+    run = runner.run_action(demo, tmp_path, inputs={"fail": "true"})
+    assert run["status"] == "failure"
+    assert [step["status"] for step in run["steps"]] == [
+        "success",
+        "success",
+        "failure",
+        "skipped",
+        "success",
+    ]
+    assert "| Fail | run | failure |" in runner.markdown(run)
+
+
+def test_runner_files_are_removed(runner, demo, tmp_path):
+    """Test that the runner folder is removed unless the caller passes one."""
+    stub = {"Greet": 'echo "message=$RUNNER_TEMP" >> "$GITHUB_OUTPUT"'}
+    run = runner.run_action(demo, tmp_path, stubs=stub)
+    assert os.path.basename(run["outputs"]["message"]).startswith("cradle-runner-")
+    assert not os.path.exists(run["outputs"]["message"])
+
+    temp = tmp_path / "runner"
+    run = runner.run_action(demo, tmp_path, stubs=stub, temp=str(temp))
+    assert run["outputs"]["message"] == str(temp)
+    assert temp.is_dir()
+
+
+def test_unknown_input_is_an_error(runner, demo, tmp_path):
+    """Test that inputs the action does not declare are refused."""
+    with pytest.raises(ValueError, match="no input 'greting'"):
+        runner.run_action(demo, tmp_path, inputs={"greting": "hi"})
+
+
+def test_pre_commit_action_runs_offline(runner, action_path, tmp_path):
+    """Test the pre-commit action with stubbed actions on a fixture project."""
+    (tmp_path / ".pre-commit-config.yaml").write_text(
+        "repos:\n  - repo: local\n    hooks:\n      - id: lint\n        language: node\n"
+    )
+    calls = []
+    run = runner.run_action(
+        action_path("pre-commit").removesuffix("action.yml"),
+        tmp_path,
+        inputs={"changed-only": "true"},
+        stubs={
+            "pre-commit/action": lambda values, env: calls.append(values["extra_args"])
+        },
+        github={"event_name": "pull_request"},
+    )
+    statuses = {step["name"]: step["status"] for step in run["steps"]}
+    assert run["status"] == "success"
+    assert statuses["Install Node 22"] == "success"
+    assert calls == ["--verbose --from-ref HEAD^1 --to-ref HEAD"]
+
+
+def test_main_writes_json(runner, demo, tmp_path, capsys):
+    """Test the command line with a bash stub and the JSON results."""
+    results = tmp_path / "results.json"
+    argv = [str(demo), "--workspace", str(tmp_path), "--stub", "Greet=echo stubbed"]
+    # The stub writes no FROM_ENV, so "Read env" fails and the exit status is 1
+    assert runner.main([*argv, "--json", str(results)]) == 1
+    assert "| Greet | stub | success |" in capsys.readouterr().out
+    assert json.loads(results.read_text())["steps"][1]["log"] == "stubbed\n"
@@ -0,0 +1,151 @@
+"""Tests for the cradle_semver helper shipped with the tag action.
+
+This module checks the classification of conventional commits and the next tag
+computed in throwaway git repositories, including the cached last-tag lookup.
+"""
+
+import os
+import subprocess
+
+import pytest
+
+ENV = {
+    "GIT_AUTHOR_NAME": "test",
+    "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "test",
+    "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+@pytest.fixture
+def semver(action_module):
+    """Return the cradle_semver module."""
+    return action_module("tag", "cradle_semver")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Return a function that runs git in a new repository."""
+    folder = tmp_path / "repo"
+    folder.mkdir()
+
+    def git(*args):
+        return subprocess.run(
+            ["git", *args],
+            cwd=folder,
+            env={**os.environ, **ENV},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    git("init", "-q", "-b", "main")
+    git.path = str(folder)
+    git.commit = lambda message: git("commit", "-q", "--allow-empty", "-m", message)
+    return git
+
+
+@pytest.mark.parametrize(
+    ("message", "release"),
+    [
+        ("feat: add a thing", "minor"),
+        ("feat(api): add a thing", "minor"),
+        ("fix: repair", "patch"),
+        ("perf: faster", "patch"),
+        ("docs: explain", None),
+        ("refactor!: drop the old API", "major"),
+        ("chore: bump\n\nBREAKING CHANGE: needs Python 3.12", "major"),
+        ("Merge pull request #1 from x/y", None),
+    ],
+)
+def test_classify(semver, message, release):
+    """Test the release each kind of commit asks for."""
+    assert semver.classify(message) == release
+
+
+def test_first_release(semver, repo):
+    """Test that a repository without tags starts from 0.0.0."""
+    repo.commit("feat: first feature")
+    result = semver.next_tag(repo.path)
+    assert (result["previous_tag"], result["new_tag"]) == ("", "v0.1.0")
+
+
+@pytest.mark.parametrize(
+    ("messages", "default_bump", "new_tag"),
+    [
+        (["fix: a", "feat: b", "docs: c"], "patch", "v1.3.0"),
+        (["fix: a", "feat!: b"], "patch", "v2.0.0"),
+        (["update readme"], "patch", "v1.2.4"),
+        (["update readme"], "minor", "v1.3.0"),
+        (["update readme"], "false", ""),
+        ([], "patch", ""),
+    ],
+)
+def test_next_tag(semver, repo, messages, default_bump, new_tag):
+    """Test the bump from the commits after the last release tag only."""
+    repo.commit("feat!: before the tag")
+    repo("tag", "-a", "v1.2.3", "-m", "release")
+    for message in messages:
+        repo.commit(message)
+
+    result = semver.next_tag(repo.path, default_bump=default_bump)
+    assert result["previous_tag"] == "v1.2.3"
+    assert result["new_tag"] == new_tag
+    assert result["commits"] == len(messages)
+
+
+def test_last_tag_ignores_other_and_unreachable_tags(semver, repo):
+    """Test that pre-releases, other tags and tags on other branches are skipped."""
+    repo.commit("feat: one")
+    repo("tag", "v1.0.0")
+    repo.commit("feat: two")
+    repo("tag", "v1.1.0-rc.1")
+    repo("tag", "nightly")
+    repo("checkout", "-q", "-b", "other")
+    repo.commit("feat: elsewhere")
+    repo("tag", "v9.0.0")
+    repo("checkout", "-q", "main")
+
+    assert semver.last_tag(repo.path)[0] == "v1.0.0"
+    assert semver.next_tag(repo.path)["new_tag"] == "v1.1.0"
+
+
+def test_cached_lookup_checks_only_higher_tags(semver, repo, tmp_path, monkeypatch):
+    """Test that a cached lookup is reused and new higher tags are still found."""
+    cache = str(tmp_path / "cache" / "last-tag.json")
+    for version in ("v0.1.0", "v0.2.0", "v0.3.0"):
+        repo.commit("feat: more")
+        repo("tag", version)
+    assert semver.last_tag(repo.path, cache=cache)[0] == "v0.3.0"
+
+    checks = []
+    is_ancestor = semver.is_ancestor
+    monkeypatch.setattr(
+        semver,
+        "is_ancestor",
+        lambda *args: checks.append(args[1]) or is_ancestor(*args),
+    )
+    assert semver.last_tag(repo.path, cache=cache)[0] == "v0.3.0"
+    assert checks == []
+
+    repo.commit("fix: after the cache")
+    assert semver.last_tag(repo.path, cache=cache)[0] == "v0.3.0"
+    assert len(checks) == 2  # the cached HEAD and the cached tag
+
+    repo("tag", "v0.4.0")
+    assert semver.last_tag(repo.path, cache=cache)[0] == "v0.4.0"
+
+
+def test_main_writes_outputs(semver, repo, tmp_path):
+    """Test the step outputs, including the changelog."""
+    repo.commit("feat: one")
+    repo("tag", "v1.0.0")
+    repo.commit("fix(core): repair")
+    output = tmp_path / "output"
+
+    assert semver.main(["--repo", repo.path, "--output", str(output)]) == 0
+    text = output.read_text()
+    assert "new_tag=v1.0.1\n" in text
+    assert "release_type=patch\n" in text
+    assert "- fix(core): repair (" in text
+    assert f"sha={repo('rev-parse', 'HEAD')}\n" in text
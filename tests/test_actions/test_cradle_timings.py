@@ -0,0 +1,118 @@
+"""Tests for the cradle_timings helper shipped with the test action.
+
+This module checks the longest-processing-time-first bin-packing used to
+balance shards, the fallback for tests without a recorded duration and the
+reading and writing of the timings file.
+"""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def timings(action_module):
+    """Return the cradle_timings module."""
+    return action_module("test", "cradle_timings")
+
+
+def test_pack_longest_first(timings):
+    """Test that the slowest tests are spread before the fast ones fill the gaps."""
+    durations = {"a": 10.0, "b": 6.0, "c": 5.0, "d": 4.0, "e": 1.0}
+    shards = timings.pack(durations, 2)
+
+    assert shards == [["a", "d"], ["b", "c", "e"]]
+    assert [sum(durations[n] for n in shard) for shard in shards] == [14.0, 12.0]
+
+
+def test_pack_beats_slowest_file_split(timings):
+    """Test that one slow test no longer drags its whole file into one shard."""
+    durations = {"slow.py::test_a": 30.0, "slow.py::test_b": 30.0}
+    durations.update({f"fast.py::test_{i}": 1.0 for i in range(60)})
+    shards = timings.pack(durations, 2)
+
+    loads = [sum(durations[n] for n in shard) for shard in shards]
+    assert loads == [60.0, 60.0]
+
+
+def test_pack_covers_every_test_once(timings):
+    """Test that every test lands in exactly one shard."""
+    durations = {f"t{i}": float(i % 7) for i in range(100)}
+    shards = timings.pack(durations, 3)
+
+    flat = [nodeid for shard in shards for nodeid in shard]
+    assert sorted(flat) == sorted(durations)
+    assert len(shards) == 3
+
+
+def test_pack_is_deterministic(timings):
+    """Test that the split does not depend on the order of the input."""
+    durations = {f"t{i}": 1.0 for i in range(10)}
+    reversed_durations = dict(reversed(list(durations.items())))
+    assert timings.pack(durations, 3) == timings.pack(reversed_durations, 3)
+
+
+def test_estimate_uses_median_for_new_tests(timings):
+    """Test that tests without a recorded duration get the median duration."""
+    durations = {"a": 1.0, "b": 2.0, "c": 30.0, "gone": 100.0}
+    estimated = timings.estimate(["a", "b", "c", "new"], durations)
+
+    assert estimated == {"a": 1.0, "b": 2.0, "c": 30.0, "new": 2.0}
+
+
+def test_estimate_without_any_timings(timings):
+    """Test that the default duration is used when nothing was recorded."""
+    estimated = timings.estimate(["a", "b"], {})
+    assert estimated == {"a": timings.DEFAULT_DURATION, "b": timings.DEFAULT_DURATION}
+
+
+def test_assign_maps_every_test(timings):
+    """Test that assign returns a shard for every collected test."""
+    assignment = timings.assign(["a", "b", "c"], {"a": 5.0}, 2)
+    assert set(assignment) == {"a", "b", "c"}
+    assert set(assignment.values()) <= {0, 1}
+
+
+def test_load_and_save_roundtrip(timings, tmp_path):
+    """Test that durations survive a save/load roundtrip."""
+    path = tmp_path / "timings" / "timings.json"
+    timings.save(str(path), {"b": 2.0, "a": 1.5})
+
+    assert timings.load(str(path)) == {"a": 1.5, "b": 2.0}
+    assert list(json.loads(path.read_text())) == ["a", "b"]
+
+
+def test_load_missing_or_invalid_file(timings, tmp_path):
+    """Test that a missing or broken timings file means no durations."""
+    assert timings.load(str(tmp_path / "missing.json")) == {}
+
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    assert timings.load(str(broken)) == {}
+
+    wrong = tmp_path / "wrong.json"
+    wrong.write_text(json.dumps({"a": "slow", "b": -1, "c": 0.5}))
+    assert timings.load(str(wrong)) == {"c": 0.5}
+
+
+def test_merge_prefers_later_files(timings, tmp_path):
+    """Test that the shards' durations are merged into the base snapshot."""
+    base = tmp_path / "base.json"
+    timings.save(str(base), {"a": 1.0, "b": 1.0})
+    shard = tmp_path / "shard.json"
+    timings.save(str(shard), {"b": 4.0, "c": 2.0})
+    output = tmp_path / "out" / "timings.json"
+
+    assert (
+        timings.main(
+            [
+                "--output",
+                str(output),
+                str(base),
+                str(tmp_path / "missing.json"),
+                str(shard),
+            ]
+        )
+        == 0
+    )
+    assert timings.load(str(output)) == {"a": 1.0, "b": 4.0, "c": 2.0}
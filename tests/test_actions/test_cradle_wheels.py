@@ -0,0 +1,147 @@
+"""Tests for the cradle_wheels helper shipped with the build action.
+
+This module checks that the wheels for several Python versions are built
+concurrently, that identical pure-Python wheels are kept once and that the
+manifest lists the hash and size of every distribution file.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def wheels(action_module):
+    """Return the cradle_wheels module."""
+    return action_module("build", "cradle_wheels")
+
+
+def fake_builder(delay, pure=False):
+    """Return a builder that sleeps and writes a wheel named after the version."""
+
+    def build(sdist, version, folder):
+        time.sleep(delay)
+        os.makedirs(folder, exist_ok=True)
+        tag = "py3" if pure else "cp" + version.replace(".", "")
+        with open(os.path.join(folder, f"pkg-1.0-{tag}-none-any.whl"), "w") as f:
+            f.write(f"built from {os.path.basename(sdist)}")
+
+    return build
+
+
+def test_parse_versions(wheels):
+    """Test that versions may be separated by commas, spaces or newlines."""
+    assert wheels.parse_versions("3.11, 3.12\n3.13 3.12") == ["3.11", "3.12", "3.13"]
+    assert wheels.parse_versions("  ") == []
+
+
+def test_build_wheels_runs_in_parallel(wheels, tmp_path):
+    """Test that the builds overlap, so the wall time is below the serial sum."""
+    versions = ["3.11", "3.12", "3.13"]
+    timing = wheels.build_wheels(
+        "pkg-1.0.tar.gz", versions, str(tmp_path), builder=fake_builder(0.3)
+    )
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "pkg-1.0-cp311-none-any.whl",
+        "pkg-1.0-cp312-none-any.whl",
+        "pkg-1.0-cp313-none-any.whl",
+    ]
+    assert list(timing["durations"]) == versions
+    assert timing["wall"] < sum(timing["durations"].values())
+
+
+def test_build_wheels_keeps_one_pure_wheel(wheels, tmp_path):
+    """Test that a pure-Python wheel built for every version is kept once."""
+    wheels.build_wheels(
+        "pkg-1.0.tar.gz",
+        ["3.11", "3.12"],
+        str(tmp_path),
+        builder=fake_builder(0, pure=True),
+    )
+    assert os.listdir(tmp_path) == ["pkg-1.0-py3-none-any.whl"]
+
+
+def test_build_wheels_fails_with_the_builder(wheels, tmp_path):
+    """Test that a failing build fails the whole matrix."""
+
+    def broken(sdist, version, folder):
+        raise RuntimeError(f"no interpreter for {version}")
+
+    with pytest.raises(RuntimeError, match="3.12"):
+        wheels.build_wheels("pkg-1.0.tar.gz", ["3.12"], str(tmp_path), builder=broken)
+
+
+def test_manifest_lists_hash_and_size(wheels, tmp_path):
+    """Test that the manifest lists every distribution file."""
+    (tmp_path / "pkg-1.0.tar.gz").write_bytes(b"sdist")
+    (tmp_path / "pkg-1.0-py3-none-any.whl").write_bytes(b"wheel!")
+
+    assert wheels.manifest(str(tmp_path)) == [
+        {
+            "file": "pkg-1.0-py3-none-any.whl",
+            "sha256": hashlib.sha256(b"wheel!").hexdigest(),
+            "size": 6,
+        },
+        {
+            "file": "pkg-1.0.tar.gz",
+            "sha256": hashlib.sha256(b"sdist").hexdigest(),
+            "size": 5,
+        },
+    ]
+
+
+def test_main_writes_manifest_outside_dist(wheels, tmp_path, monkeypatch):
+    """Test that dist/ only holds distributions, so dist/* can be published."""
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    (dist / "pkg-1.0.tar.gz").write_bytes(b"sdist")
+    monkeypatch.setattr(wheels, "run", lambda command: None)
+    build = wheels.build_wheels
+    monkeypatch.setattr(
+        wheels,
+        "build_wheels",
+        lambda sdist, versions, out_dir, workers=None: build(
+            sdist, versions, out_dir, builder=fake_builder(0), workers=workers
+        ),
+    )
+    manifest = tmp_path / "artifacts" / "build" / "manifest.json"
+
+    wheels.main(
+        [
+            "--python-versions",
+            "3.12",
+            "--out-dir",
+            str(dist),
+            "--manifest",
+            str(manifest),
+            "--summary",
+            "",
+        ]
+    )
+
+    assert sorted(os.listdir(dist)) == ["pkg-1.0-cp312-none-any.whl", "pkg-1.0.tar.gz"]
+    files = [entry["file"] for entry in json.loads(manifest.read_text())["files"]]
+    assert files == sorted(os.listdir(dist))
+
+
+def test_find_sdist(wheels, tmp_path):
+    """Test that an sdist already in the output folder is reused."""
+    assert wheels.find_sdist(str(tmp_path / "missing")) is None
+    (tmp_path / "pkg-1.0-py3-none-any.whl").write_bytes(b"")
+    assert wheels.find_sdist(str(tmp_path)) is None
+    (tmp_path / "pkg-1.0.tar.gz").write_bytes(b"")
+    assert wheels.find_sdist(str(tmp_path)) == str(tmp_path / "pkg-1.0.tar.gz")
+
+
+def test_markdown_reports_speedup(wheels):
+    """Test that the summary compares the wall time with a serial build."""
+    timing = {"durations": {"3.12": 4.0, "3.13": 4.0}, "wall": 4.0}
+    report = wheels.markdown(timing, [])
+
+    assert "| 3.12 | 4.0 s |" in report
+    assert "**4.0 s** against **8.0 s**" in report
+    assert "(2.0x)" in report
@@ -75,3 +75,45 @@ def test_deptry_action_structure(action_path):
     assert deptry_step["run"].find("${{ inputs.options }}") != -1, (
         "Deptry step must use options input"
     )
+
+
+def test_deptry_action_caches_imports_and_outputs_json(action_path):
+    """Test the uv cache, the per-file import cache and the JSON output."""
+    with open(action_path("deptry")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["incremental"]["default"] == "true"
+    assert action["outputs"]["json"]["value"] == "${{ steps.deptry.outputs.json }}"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    assert steps["Set up uv/uvx"]["with"]["enable-cache"] is True
+    cache = steps["Restore deptry import cache"]
+    assert cache["with"]["path"] == "~/.cache/cradle-deptry"
+
+    run = steps["Run Deptry"]["run"]
+    assert "cradle_deptry.py" in run
+    assert "--cache-dir" in run
+    assert run.count('--json-output "$REPORT"') == 2
+    assert "json<<" in run
+
+
+def test_deptry_action_checks_out_only_the_source_folder(runner, action_path, tmp_path):
+    """Test that the sparse checkout defaults to the source folder."""
+    checkouts = []
+    for source, sparse, paths in [
+        ("src/pkg", "auto", "src/pkg"),
+        (".", "auto", ""),
+        ("src", "", ""),
+        ("src", "src\ndocs", "src\ndocs"),
+    ]:
+        run = runner.run_action(
+            os.path.dirname(action_path("deptry")),
+            tmp_path,
+            inputs={"source-folder": source, "sparse-checkout": sparse},
+            stubs={
+                "actions/checkout": lambda values, env: checkouts.append(values),
+                "Run Deptry": None,
+            },
+        )
+        assert run["status"] == "success"
+        assert checkouts.pop()["sparse-checkout"] == paths
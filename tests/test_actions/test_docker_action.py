@@ -95,3 +95,79 @@ def test_docker_action_structure(action_path):
     assert push_step["uses"] == "redhat-actions/push-to-registry@v2", (
         "Push step must use redhat-actions/push-to-registry@v2"
     )
+
+
+def test_docker_action_layer_cache(action_path):
+    """Test that the docker action can reuse layers from a registry or local cache."""
+    with open(action_path("docker")) as f:
+        action = yaml.safe_load(f)
+
+    inputs = action["inputs"]
+    for name in ("cache-from", "cache-to", "cache-dir"):
+        assert inputs[name]["default"] == "", f"{name} must default to no cache"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+
+    # The local cache is keyed on the Dockerfile(s) and the lockfiles
+    key = steps["Compute layer cache key"]["run"]
+    assert "inputs.dockerfiles" in key
+    assert "inputs.cache-dependency-glob" in key
+    restore = steps["Restore layer cache"]
+    assert restore["uses"].startswith("actions/cache@")
+    assert restore["with"]["path"] == "${{ inputs.cache-dir }}"
+
+    # Buildah keeps its layers and gets the cache source and destination
+    configure = steps["Configure layer cache"]["run"]
+    assert "--cache-from" in configure
+    assert "--cache-to" in configure
+    build = steps["Build image"]["with"]
+    assert build["layers"] == "${{ steps.layer-cache.outputs.layers }}"
+    assert build["extra-args"] == "${{ steps.layer-cache.outputs.args }}"
+
+    # The cache hits are reported per layer
+    assert 'cradle_docker.py" layers' in steps["Report layer cache hits"]["run"]
+
+
+def test_docker_action_parallel(action_path):
+    """Test that the docker action can build several images in parallel."""
+    with open(action_path("docker")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["parallel"]["default"] == "false"
+    assert action["outputs"]["images"]["value"] == (
+        "${{ steps.parallel-build.outputs.images }}"
+    )
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    assert steps["Build image"]["if"] == "inputs.parallel != 'true'"
+    assert steps["Push to container registry"]["if"].startswith(
+        "inputs.parallel != 'true'"
+    )
+
+    parallel = steps["Build and push images in parallel"]
+    assert parallel["if"] == "inputs.parallel == 'true'"
+    assert 'cradle_docker.py" build' in parallel["run"]
+    assert "steps.layer-cache.outputs.args" in parallel["run"]
+
+
+def test_docker_action_push_options(action_path):
+    """Test that the docker action can push with zstd, in parallel and with retries."""
+    with open(action_path("docker")) as f:
+        action = yaml.safe_load(f)
+
+    inputs = action["inputs"]
+    assert inputs["compression-format"]["default"] == ""
+    assert inputs["push-jobs"]["default"] == "0"
+    assert inputs["push-retries"]["default"] == "0"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+
+    # The registry action stays the default and the helper takes over when tuned
+    assert "inputs.push-retries == '0'" in steps["Push to container registry"]["if"]
+    tuned = steps["Push with compression and retries"]
+    assert "inputs.push-retries != '0'" in tuned["if"]
+    for option in ("--compression-format", "--jobs", "--retries", "--retry-delay"):
+        assert option in tuned["run"], f"Push step must pass {option}"
+        assert option in steps["Build and push images in parallel"]["run"]
+
+    assert "steps.push-tuned.outputs.digest" in action["outputs"]["digest"]["value"]
@@ -81,3 +81,74 @@ def test_environment_action_structure(action_path):
         None,
     )
     assert pyproject_step is not None, "Action must have a step for pyproject.toml"
+
+
+def test_environment_action_cache(action_path):
+    """Test that the environment action can cache the uv cache and the .venv."""
+    with open(action_path("environment")) as f:
+        action = yaml.safe_load(f)
+
+    # Check caching inputs
+    inputs = action["inputs"]
+    for name in [
+        "enable-cache",
+        "cache-suffix",
+        "cache-dependency-glob",
+        "prune-cache",
+    ]:
+        assert name in inputs, f"Action must have {name} input"
+    assert inputs["enable-cache"]["default"] == "false", (
+        "Caching must be opt-in (enable-cache defaults to false)"
+    )
+
+    # Check the cache-hit output
+    assert "cache-hit" in action.get("outputs", {}), "Action must have cache-hit output"
+    assert (
+        "steps.venv-check.outputs.cache-hit" in action["outputs"]["cache-hit"]["value"]
+    ), "cache-hit output must reference the venv-check step"
+
+    steps = action["runs"]["steps"]
+
+    # The uv cache is handed over to setup-uv, but only when caching is enabled
+    python_steps = {
+        step["if"]: step
+        for step in steps
+        if step.get("name", "").startswith("Set up Python")
+    }
+    assert python_steps["inputs.enable-cache != 'true'"]["with"] == {
+        "python-version": "${{ inputs.python-version }}"
+    }, "Without caching, setup-uv must keep its own cache defaults"
+    python_step = python_steps["inputs.enable-cache == 'true'"]
+    assert python_step["with"]["enable-cache"] is True, (
+        "setup-uv must cache when enable-cache is true"
+    )
+    assert python_step["with"]["prune-cache"] == "${{ inputs.prune-cache }}", (
+        "setup-uv must receive the prune-cache input"
+    )
+
+    # The .venv is restored with actions/cache, keyed on Python version and lockfile hash
+    restore_step = next(
+        (step for step in steps if step.get("id") == "venv-cache"), None
+    )
+    assert restore_step is not None, "Action must have a venv restore step"
+    assert restore_step["uses"].startswith("actions/cache@"), (
+        "Venv restore step must use actions/cache"
+    )
+    assert restore_step["with"]["path"] == ".venv", "Venv restore step must cache .venv"
+
+    key_step = next((step for step in steps if step.get("id") == "cache-key"), None)
+    assert key_step is not None, "Action must have a cache key step"
+    assert "inputs.python-version" in key_step["run"], (
+        "Cache key must include the Python version"
+    )
+    assert "uv.lock" in key_step["run"], "Cache key must default to the uv.lock hash"
+    assert "inputs.requirements-path" in key_step["run"], (
+        "Cache key must use requirements-path for requirements.txt environments"
+    )
+
+    # On an exact hit the installation steps are skipped
+    for step in steps:
+        if step.get("name", "").startswith(("Create a Python", "Setup venv")):
+            assert "steps.venv-check.outputs.cache-hit != 'true'" in step["if"], (
+                f"{step['name']} must be skipped on an exact cache hit"
+            )
@@ -77,3 +77,50 @@ def test_latex_action_structure(action_path):
         "Install step must use wtfjoke/setup-tectonic"
     )
     assert "tectonic" in compile_step["run"], "Compile step must use tectonic"
+
+
+def test_latex_action_cache(action_path):
+    """Test that the latex action caches the bundle and skips unchanged documents."""
+    with open(action_path("latex")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["enable-cache"]["default"] == "true"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+
+    # The compiled document and intermediates are keyed on the sources
+    restore = steps["Restore compiled document"]
+    assert restore["uses"].startswith("actions/cache@")
+    assert "hashFiles(" in restore["with"]["key"]
+    assert "restore-keys" in restore["with"], "Intermediates must be reused"
+
+    # The bundle is fetched once and kept in the cache
+    bundle = steps["Restore Tectonic bundle"]
+    assert bundle["with"]["path"] == "~/.cache/Tectonic"
+
+    # Nothing is installed or compiled when the sources did not change
+    skip = "steps.latex-cache.outputs.cache-hit != 'true'"
+    assert steps["Install Tectonic"]["if"] == skip
+    compile_step = steps["Compile LaTeX document"]
+    assert skip in compile_step["if"]
+    assert "--keep-intermediates" in compile_step["run"]
+    assert "tectonic -X build" in compile_step["run"]
+
+
+def test_latex_action_documents(action_path):
+    """Test that the latex action can compile several documents in parallel."""
+    with open(action_path("latex")) as f:
+        action = yaml.safe_load(f)
+
+    inputs = action["inputs"]
+    assert inputs["documents"]["default"] == ""
+    assert inputs["jobs"]["default"] == "0"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    assert "inputs.documents == ''" in steps["Compile LaTeX document"]["if"]
+
+    parallel = steps["Compile documents in parallel"]
+    assert parallel["if"] == "inputs.documents != ''"
+    assert "cradle_latex.py" in parallel["run"]
+    assert "--jobs" in parallel["run"]
+    assert steps["Restore compiled documents"]["with"]["path"] == "**/compiled"
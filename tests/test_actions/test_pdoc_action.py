@@ -6,6 +6,7 @@ API documentation from Python source code using pdoc.
 """
 
 import os
+import re
 
 import yaml
 
@@ -79,3 +80,38 @@ def test_pdoc_action_structure(action_path):
     assert build_step["run"].find("${{ inputs.source-folder }}") != -1, (
         "Build step must use source-folder input"
     )
+
+
+def test_pdoc_action_incremental(action_path):
+    """Test that the pdoc action reuses the pages of unchanged modules."""
+    with open(action_path("pdoc")) as f:
+        action = yaml.safe_load(f)
+
+    # The helper relies on pdoc internals, so it is opt-in
+    assert action["inputs"]["incremental"]["default"] == "false"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    restore = steps["Restore rendered modules"]
+    assert restore["uses"].startswith("actions/cache@")
+    assert restore["with"]["path"] == "~/.cache/cradle-pdoc"
+
+    build = steps["Install and build pdoc"]["run"]
+    assert "cradle_pdoc.py" in build
+    assert "--cache-dir $HOME/.cache/cradle-pdoc" in build
+    assert re.search(r'uv pip install "pdoc==\d+\.\d+\.\d+"', build), (
+        "The helper must run on the pdoc version it was written against"
+    )
+
+
+def test_pdoc_action_workers(action_path):
+    """Test that the pdoc action can render the modules in worker processes."""
+    with open(action_path("pdoc")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["workers"]["default"] == "1"
+    build = next(
+        step["run"]
+        for step in action["runs"]["steps"]
+        if step.get("name") == "Install and build pdoc"
+    )
+    assert "--workers ${{ inputs.workers }}" in build
@@ -76,3 +76,42 @@ def test_pre_commit_action_structure(action_path):
     assert pre_commit_step["with"]["extra_args"] == "--verbose --all-files", (
         "Pre-commit step must run on all files with verbose output"
     )
+
+
+def test_pre_commit_action_caches_and_checks_changed_files(action_path):
+    """Test the environment cache, the Node detection and the changed-only mode."""
+    with open(action_path("pre-commit")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["changed-only"]["default"] == "false"
+    assert action["inputs"]["install-node"]["default"] == "auto"
+
+    steps = action["runs"]["steps"]
+    # Only pre-commit/action saves the environments; the action restores its entry
+    assert not any(step.get("uses") == "actions/cache@v5" for step in steps)
+    cache = next(
+        step for step in steps if step.get("uses") == "actions/cache/restore@v5"
+    )
+    assert cache["with"]["path"] == "~/.cache/pre-commit"
+    assert cache["with"]["key"] == (
+        "pre-commit-3|${{ env.pythonLocation }}|"
+        "${{ hashFiles('.pre-commit-config.yaml') }}"
+    )
+
+    detect = next(step for step in steps if step.get("id") == "hooks")
+    assert "cradle_precommit.py" in detect["run"]
+    node = next(
+        step for step in steps if step.get("name", "").startswith("Install Node")
+    )
+    assert node["if"] == "steps.hooks.outputs.node == 'true'"
+    assert steps.index(cache) < steps.index(detect) < steps.index(node)
+
+    changed = [
+        step
+        for step in steps
+        if step.get("uses", "").startswith("pre-commit/action")
+        and "--from-ref" in step["with"]["extra_args"]
+    ]
+    assert len(changed) == 1
+    assert "--to-ref HEAD" in changed[0]["with"]["extra_args"]
+    assert "github.event_name == 'pull_request'" in changed[0]["if"]
@@ -0,0 +1,75 @@
+"""Tests for the profile GitHub Action.
+
+This module contains tests that verify the profile action has the expected structure,
+including its inputs, steps and the shared profiling hook that the other actions
+source in their bash steps.
+"""
+
+import os
+
+import yaml
+
+
+def test_profile_action_structure(action_path):
+    """Test that the profile action has the expected structure."""
+    # Path to the action.yml file
+    profile_action_path = action_path("profile")
+
+    # Ensure the file exists
+    assert os.path.exists(profile_action_path), (
+        f"Action file not found at {profile_action_path}"
+    )
+
+    # Load the action.yml file
+    with open(profile_action_path) as f:
+        action = yaml.safe_load(f)
+
+    # Check basic structure
+    assert "name" in action, "Action must have a name"
+    assert "description" in action, "Action must have a description"
+    assert "inputs" in action, "Action must have inputs"
+    assert "runs" in action, "Action must have runs section"
+
+    # Check inputs
+    inputs = action["inputs"]
+    assert inputs["mode"]["default"] == "report", "Mode input must default to report"
+    assert "artifact-name" in inputs, "Action must have artifact-name input"
+
+    # Check steps
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+    assert "CRADLE_PROFILE=true" in steps["Enable profiling"]["run"], (
+        "Enable profiling step must switch the hook on for the job"
+    )
+    assert "cradle_profile.py" in steps["Write profiling report"]["run"], (
+        "Report step must run the cradle_profile helper"
+    )
+    assert steps["Upload profiling report"]["with"]["path"] == (
+        "artifacts/profile/timings.json"
+    ), "Upload step must upload timings.json"
+
+
+def test_profile_hook_is_sourced(actions_dir, action_path):
+    """Test that the hook exists and the heavy steps of the actions source it."""
+    assert os.path.exists(os.path.join(actions_dir, "profile", "profile.sh")), (
+        "The profile action must ship the profile.sh hook"
+    )
+
+    hooked = {
+        "environment": "Setup venv using pyproject.toml",
+        "build": "Build package",
+        "coverage": "Run tests with coverage",
+        "deptry": "Run Deptry",
+        "latex": "Compile LaTeX document",
+        "pdoc": "Install and build pdoc",
+        "book": "Create minibook",
+        "test": "Run tests",
+    }
+    for action_name, step_name in hooked.items():
+        with open(action_path(action_name)) as f:
+            action = yaml.safe_load(f)
+        step = next(
+            step for step in action["runs"]["steps"] if step.get("name") == step_name
+        )
+        assert '"$GITHUB_ACTION_PATH/../profile/profile.sh"' in step["run"], (
+            f"{action_name} step '{step_name}' must source the profiling hook"
+        )
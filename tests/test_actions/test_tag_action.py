@@ -6,7 +6,9 @@ automatically bumps version numbers based on commit messages and creates release
 """
 
 import os
+import subprocess
 
+import pytest
 import yaml
 
 
@@ -78,3 +80,103 @@ def test_tag_action_structure(action_path):
     assert release_step["with"]["generate_release_notes"] is True, (
         "Release step must generate release notes"
     )
+
+
+def test_tag_action_engines(action_path):
+    """Test that the github engine is the default and each engine has its own steps."""
+    with open(action_path("tag")) as f:
+        action = yaml.safe_load(f)
+
+    # The local engine needs a checkout, so it is opt-in
+    assert action["inputs"]["engine"]["default"] == "github"
+    steps = {step["name"]: step for step in action["runs"]["steps"]}
+    for name in ("Bump version and tag", "Create GitHub release without artifacts"):
+        assert steps[name]["if"] == "inputs.engine == 'github'"
+    assert steps["Compute next version"]["id"] == "local-version"
+    assert "cradle_semver.py" in steps["Compute next version"]["run"]
+    assert "--filter=tree:0" in steps["Fetch tags and history"]["run"]
+    assert (
+        "steps.local-version.outputs.new_tag" in action["outputs"]["new_tag"]["value"]
+    )
+
+
+@pytest.mark.parametrize(
+    ("github", "tagged"),
+    [
+        ({"event_name": "push", "ref_name": "main"}, True),
+        ({"event_name": "push", "ref_name": "release/1.x"}, True),
+        ({"event_name": "push", "ref_name": "feature"}, False),
+        ({"event_name": "pull_request", "ref_name": "1/merge"}, False),
+        ({"event_name": "push", "ref_name": "main", "ref_type": "tag"}, False),
+    ],
+)
+def test_tag_action_local_engine(runner, action_path, tmp_path, github, tagged):
+    """Test the local engine offline, with a gh stand-in that logs its calls."""
+    workspace = tmp_path / "repo"
+    workspace.mkdir()
+    env = {
+        "GIT_AUTHOR_NAME": "test",
+        "GIT_AUTHOR_EMAIL": "test@example.com",
+        "GIT_COMMITTER_NAME": "test",
+        "GIT_COMMITTER_EMAIL": "test@example.com",
+    }
+
+    def git(*args):
+        return subprocess.run(
+            ["git", *args],
+            cwd=workspace,
+            env={**os.environ, **env},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    git("init", "-q")
+    git("commit", "-q", "--allow-empty", "-m", "feat: first")
+    git("tag", "v0.1.0")
+    git("commit", "-q", "--allow-empty", "-m", "fix: second")
+    head = git("rev-parse", "HEAD")
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    calls = tmp_path / "calls"
+    calls.touch()
+    (bin_dir / "gh").write_text(f'#!/bin/bash\necho "gh $*" >> {calls}\n')
+    (bin_dir / "gh").chmod(0o755)
+
+    run = runner.run_action(
+        os.path.dirname(action_path("tag")),
+        workspace,
+        inputs={
+            "github_token": "token",
+            "engine": "local",
+            "release-branches": "main, release/*",
+        },
+        stubs={"Fetch tags and history": None},
+        env={
+            "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}",
+            "HOME": str(tmp_path),
+        },
+        # The sha of the event differs from HEAD, like a pull request's merge commit
+        github={"repository": "owner/repo", "sha": "abc123", **github},
+    )
+
+    assert run["status"] == "success"
+    assert run["outputs"]["new_tag"] == "v0.1.1"
+    statuses = {step["name"]: step["status"] for step in run["steps"]}
+    assert statuses["Bump version and tag"] == "skipped"
+    release = statuses["Create GitHub release for the local tag"]
+    assert release == ("success" if tagged else "skipped")
+    assert (tmp_path / ".cache" / "cradle-semver" / "last-tag.json").exists()
+    if tagged:
+        assert calls.read_text().split() == [
+            "gh",
+            "api",
+            "repos/owner/repo/git/refs",
+            "-f",
+            "ref=refs/tags/v0.1.1",
+            "-f",
+            f"sha={head}",
+        ]
+    else:
+        assert calls.read_text() == ""
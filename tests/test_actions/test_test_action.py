@@ -5,6 +5,7 @@ including required inputs, steps, and other elements. The test action provides
 a simple way to run pytest tests with a configurable test directory.
 """
 
+import json
 import os
 
 import yaml
@@ -67,3 +68,179 @@ def test_test_action_structure(action_path):
     assert run_tests_step["run"].find("${{ inputs.tests-folder }}") != -1, (
         "Run tests step must use tests-folder input"
     )
+
+
+def test_test_action_parallel_and_sharding(action_path):
+    """Test that the test action supports xdist workers and deterministic shards."""
+    with open(action_path("test")) as f:
+        action = yaml.safe_load(f)
+
+    # Check inputs and their defaults (serial, single shard)
+    inputs = action["inputs"]
+    assert inputs["workers"]["default"] == "1", "Workers input must default to 1"
+    assert inputs["dist"]["default"] == "load", "Dist input must default to load"
+    assert inputs["shard-index"]["default"] == "0", (
+        "Shard-index input must default to 0"
+    )
+    assert inputs["shard-total"]["default"] == "1", (
+        "Shard-total input must default to 1"
+    )
+
+    run_tests_step = next(
+        step
+        for step in action["runs"]["steps"]
+        if step.get("name", "").startswith("Run tests")
+    )
+    run = run_tests_step["run"]
+
+    # pytest-xdist is only installed and used when running in parallel
+    assert "pytest-xdist" in run, "Run tests step must install pytest-xdist"
+    assert "-n {0} --dist {1}" in run, "Run tests step must pass workers and dist"
+
+    # The sharding plugin shipped with the action is loaded and importable
+    assert "-p cradle_pytest" in run, "Run tests step must load the shard plugin"
+    assert "--shard-index=${{ inputs.shard-index }}" in run
+    assert "--shard-total=${{ inputs.shard-total }}" in run
+    assert "github.action_path" in run_tests_step["env"]["PYTHONPATH"], (
+        "Run tests step must put the action folder on PYTHONPATH"
+    )
+
+
+def test_test_action_timings(action_path):
+    """Test that the test action can record and restore per-test durations."""
+    with open(action_path("test")) as f:
+        action = yaml.safe_load(f)
+
+    assert action["inputs"]["timings"]["default"] == "false", (
+        "Timings input must default to false"
+    )
+
+    steps = action["runs"]["steps"]
+    restore_step = next(
+        (step for step in steps if step.get("name", "") == "Restore test timings"),
+        None,
+    )
+    assert restore_step is not None, "Action must have a restore test timings step"
+    assert restore_step["uses"].startswith("actions/cache/restore@"), (
+        "Restore test timings step must use actions/cache/restore"
+    )
+    # Every shard of a run must balance with the same timings
+    assert "restore-keys" not in restore_step["with"], (
+        "Restore test timings step must not fall back to the newest timings"
+    )
+    assert restore_step["with"]["key"].endswith(
+        "${{ github.event.pull_request.base.sha || github.event.before }}"
+    ), "Restore test timings step must restore the timings of the base commit"
+
+    save_step = next(
+        (step for step in steps if step.get("name", "") == "Save test timings"),
+        None,
+    )
+    assert save_step is not None, "Action must have a save test timings step"
+    assert save_step["with"]["key"].endswith("${{ github.sha }}"), (
+        "Save test timings step must save the timings under the current commit"
+    )
+
+    upload_step = next(
+        (step for step in steps if step.get("name", "") == "Upload test timings"),
+        None,
+    )
+    assert upload_step is not None, "Action must have an upload test timings step"
+
+    run_tests_step = next(
+        step for step in steps if step.get("name", "").startswith("Run tests")
+    )
+    assert "--timings-file=artifacts/timings/timings.json" in run_tests_step["run"]
+    # Shards upload only their own durations, the snapshot merges all of them
+    assert (
+        "--timings-output=artifacts/timings-run/timings.json" in run_tests_step["run"]
+    )
+    assert upload_step["with"]["path"] == "artifacts/timings-run"
+    assert "inputs.merge-timings == 'true'" in save_step["if"], (
+        "Save test timings step must wait for the merge of all shards"
+    )
+
+
+def test_test_action_merges_timings_of_all_shards(runner, action_path, tmp_path):
+    """Test that the merge job saves the durations of every shard on the base."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    uv = bin_dir / "uv"
+    # Stands in for "uv run --no-project python ..."
+    uv.write_text('#!/bin/bash\nshift 3\nexec python3 "$@"\n')
+    uv.chmod(0o755)
+
+    def write(path, durations):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(durations))
+
+    def restore(values, env):
+        write(tmp_path / values["path"] / "timings.json", {"a": 1.0, "b": 1.0})
+
+    def download(values, env):
+        assert values["pattern"] == "timings-test-shard-*"
+        shards = tmp_path / values["path"]
+        write(shards / "timings-test-shard-0" / "timings.json", {"a": 2.0})
+        write(shards / "timings-test-shard-1" / "timings.json", {"c": 3.0})
+
+    saved = []
+    run = runner.run_action(
+        os.path.dirname(action_path("test")),
+        tmp_path,
+        inputs={
+            "timings": "true",
+            "merge-timings": "true",
+            "timings-job": "test",
+            "shard-total": "2",
+        },
+        stubs={
+            "Restore test timings": restore,
+            "actions/download-artifact": download,
+            "Save test timings": lambda values, env: saved.append(
+                (
+                    values["key"],
+                    json.loads(
+                        (tmp_path / values["path"] / "timings.json").read_text()
+                    ),
+                )
+            ),
+        },
+        env={"PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"},
+        github={"job": "merge", "sha": "abc"},
+    )
+
+    assert run["status"] == "success"
+    statuses = {step["name"]: step["status"] for step in run["steps"]}
+    assert statuses["Run tests"] == "skipped"
+    assert statuses["Upload test timings"] == "skipped"
+    key, durations = saved[0]
+    assert key.endswith("-test-abc")
+    assert durations == {"a": 2.0, "b": 1.0, "c": 3.0}
+
+
+def test_test_action_affected_only(action_path):
+    """Test that the test action can run only the tests affected by a change."""
+    with open(action_path("test")) as f:
+        action = yaml.safe_load(f)
+
+    inputs = action["inputs"]
+    assert inputs["affected-only"]["default"] == "false", (
+        "Affected-only input must default to false"
+    )
+    assert "base-ref" in inputs, "Action must have base-ref input"
+    assert "full-run-patterns" in inputs, "Action must have full-run-patterns input"
+
+    steps = {step.get("name", ""): step for step in action["runs"]["steps"]}
+
+    # Pull requests restore the map, the default branch builds and saves it
+    assert steps["Restore test impact map"]["uses"].startswith("actions/cache/restore@")
+    assert steps["Save test impact map"]["uses"].startswith("actions/cache/save@")
+    assert "cradle_affected.py" in steps["Select affected tests"]["run"]
+    assert "git diff --name-only" in steps["Select affected tests"]["run"]
+    assert 'cradle_affected.py" map' in steps["Build test impact map"]["run"]
+
+    # The run step records contexts or selects the affected tests
+    run = steps["Run tests"]["run"]
+    assert "--cov-context=test" in run, "Run tests step must record test contexts"
+    assert "--impact-map=artifacts/impact/map.json" in run
+    assert "--changed-files=artifacts/impact/changed.txt" in run